@@ -1,3 +1,145 @@
+"""
+Admin de Challenge e Analysis pensado para tabelas grandes (100k+ linhas)
+"""
+
+from typing import Optional
+
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+
+from . import fulltext
+from .models import Analysis, Challenge
+
+# Abaixo disso a contagem exata é barata; acima, sem filtros, usa estimativa
+EXACT_COUNT_LIMIT = 10000
+# Com filtros a contagem para aqui (a paginação mostra até este número)
+FILTERED_COUNT_LIMIT = 10000
+
+
+def estimated_row_count(model) -> Optional[int]:
+    """Estimativa do número de linhas sem COUNT(*) (None se o banco não oferece)"""
+    table = model._meta.db_table
+    connection = connections[model.objects.all().db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            # Faixa de rowids: duas buscas no B-tree; superestima só o que foi apagado.
+            # MIN e MAX em subconsultas separadas, senão o SQLite varre a tabela
+            cursor.execute(f"SELECT (SELECT MAX(rowid) FROM {table}) - (SELECT MIN(rowid) FROM {table}) + 1")
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginador que não faz COUNT(*) de tabela inteira.
+
+    Sem filtros, usa a estimativa do banco; com filtros, conta no máximo
+    FILTERED_COUNT_LIMIT linhas (SELECT COUNT(*) FROM (... LIMIT n)).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return queryset.order_by()[:FILTERED_COUNT_LIMIT].count()
+
+
+class ModelFilter(admin.SimpleListFilter):
+    """Filtro por modelo do LLM; o DISTINCT fica em cache em vez de rodar a cada página"""
+
+    title = "Modelo"
+    parameter_name = 'model'
+
+    def lookups(self, request, model_admin):
+        models = cache.get_or_set(
+            'admin:analysis_models',
+            lambda: list(Analysis.objects.order_by('model').values_list('model', flat=True).distinct()),
+            timeout=600,
+        )
+        return [(model, model) for model in models]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(model=self.value())
+        return queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Base: paginação estimada, sem contagem total e busca pelo índice de texto"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    date_hierarchy = 'created_at'
+    # Só colunas indexadas: ordenar por título varreria a tabela inteira
+    sortable_by = ('id', 'created_at')
+    # Campos pesados que a listagem não mostra
+    deferred_fields = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.deferred_fields and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*self.deferred_fields)
+        return queryset
+
+    def get_ordering(self, request):
+        # Na busca, ordenar por created_at ordena todos os resultados; o id cresce
+        # junto com a data e é percorrido direto na chave primária
+        if request.GET.get(SEARCH_VAR, '').strip():
+            return ('-pk',)
+        return super().get_ordering(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if search_term:
+            results = fulltext.search(queryset, search_term)
+            if results is not None:
+                return results, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+@admin.register(Challenge)
+class ChallengeAdmin(LargeTableAdmin):
+    list_display = ('id', 'title', 'language', 'created_at')
+    list_display_links = ('id', 'title')
+    search_fields = ('title',)
+    deferred_fields = ('description', 'objectives', 'constraints')
+
+
+@admin.register(Analysis)
+class AnalysisAdmin(LargeTableAdmin):
+    list_display = ('id', 'title', 'challenge_title', 'difficulty', 'stage', 'model', 'created_at')
+    list_display_links = ('id', 'title')
+    list_filter = ('difficulty', 'stage', ModelFilter)
+    # Sem JOIN: com ele o SQLite troca o índice de created_at por um sort da tabela
+    # toda; os títulos dos desafios da página vêm em uma consulta separada
+    list_select_related = False
+    search_fields = ('title',)
+    raw_id_fields = ('challenge',)
+    readonly_fields = ('created_at', 'time_class', 'space_class')
+    deferred_fields = (
+        'raw_data', 'recommended_solution', 'approaches', 'summary', 'assumptions', 'references',
+    )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.prefetch_related(
+                Prefetch('challenge', queryset=Challenge.objects.only('id', 'title'))
+            )
+        return queryset
 
-# Register your models here.
+    @admin.display(description="Desafio")
+    def challenge_title(self, analysis):
+        return analysis.challenge.title
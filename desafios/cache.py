@@ -0,0 +1,297 @@
+"""
+Backend de cache em dois níveis: LRU em memória na frente de um SQLite (WAL)
+compartilhado por todos os workers da máquina
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Estado global por LOCATION, como no LocMemCache: o Django cria uma instância
+# do backend por thread, mas o L1 e as estatísticas são do processo.
+_l1_stores = {}
+_stats = {}
+_locks = {}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed);
+CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires);
+"""
+
+
+class TwoTierCache(BaseCache):
+    """Cache com L1 em memória (LRU por tamanho) e L2 em arquivo SQLite compartilhado.
+
+    O L1 guarda cada entrada por no máximo L1_TIMEOUT segundos, para que
+    alterações feitas por outro worker no L2 apareçam rapidamente.
+
+    OPTIONS:
+        L1_MAX_SIZE: bytes em memória por processo (padrão 16 MB)
+        L1_TIMEOUT: segundos máximos de uma entrada no L1 (padrão 5)
+        MAX_SIZE: bytes no arquivo compartilhado (padrão 256 MB)
+        CULL_EVERY: escritas entre verificações de tamanho do L2 (padrão 100)
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = str(location)
+        self._l1_max_size = int(options.get('L1_MAX_SIZE', 16 * 1024 * 1024))
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 5))
+        self._max_size = int(options.get('MAX_SIZE', 256 * 1024 * 1024))
+        self._cull_every = int(options.get('CULL_EVERY', 100))
+
+        self._l1 = _l1_stores.setdefault(self._path, {'entries': OrderedDict(), 'size': 0})
+        self._stats = _stats.setdefault(self._path, {
+            'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'sets': 0, 'l1_evictions': 0, 'l2_evictions': 0,
+        })
+        self._lock = _locks.setdefault(self._path, threading.Lock())
+        self._local = threading.local()
+
+    # -- L2 (SQLite) ---------------------------------------------------------
+
+    def _connection(self):
+        # Conexões não atravessam threads nem o fork do gunicorn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=20, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _l2_get(self, key, now):
+        row = self._connection().execute(
+            "SELECT value, expires, accessed FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ? AND expires <= ?", (key, now))
+            return None
+        # LRU aproximado: evita transformar toda leitura em escrita
+        if now - accessed > 60:
+            self._connection().execute("UPDATE cache_entries SET accessed = ? WHERE key = ?", (now, key))
+        return value, expires
+
+    def _l2_set(self, key, pickled, expires, now, only_if_missing=False):
+        conn = self._connection()
+        if only_if_missing:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires <= ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, pickled, len(pickled), expires, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            stored = cursor.rowcount == 1
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, pickled, len(pickled), expires, now),
+            )
+            stored = True
+
+        with self._lock:
+            self._stats['sets'] += 1
+            should_cull = self._stats['sets'] % self._cull_every == 0
+        if should_cull:
+            self._cull_l2(now)
+        return stored
+
+    def _cull_l2(self, now):
+        """Remove expirados e, acima de MAX_SIZE, as entradas acessadas há mais tempo"""
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries WHERE expires <= ?", (now,))
+        if self._l2_size() <= self._max_size:
+            return
+        # Mantém as entradas mais recentes até 90% de MAX_SIZE
+        cursor = conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM cache_entries"
+            " ) WHERE running > ?"
+            ")",
+            (int(self._max_size * 0.9),),
+        )
+        with self._lock:
+            self._stats['l2_evictions'] += cursor.rowcount
+
+    def _l2_size(self):
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+
+    # -- L1 (memória) --------------------------------------------------------
+
+    def _l1_get(self, key, now):
+        with self._lock:
+            entry = self._l1['entries'].get(key)
+            if entry is None:
+                return None
+            pickled, expires = entry
+            if expires <= now:
+                self._l1_delete(key)
+                return None
+            self._l1['entries'].move_to_end(key)
+            return pickled
+
+    def _l1_set(self, key, pickled, expires, now):
+        l1_expires = now + self._l1_timeout
+        if expires is not None:
+            l1_expires = min(l1_expires, expires)
+        if len(pickled) > self._l1_max_size:
+            return
+        with self._lock:
+            self._l1_delete(key)
+            self._l1['entries'][key] = (pickled, l1_expires)
+            self._l1['size'] += len(pickled)
+            while self._l1['size'] > self._l1_max_size:
+                oldest = next(iter(self._l1['entries']))
+                self._l1_delete(oldest)
+                self._stats['l1_evictions'] += 1
+
+    def _l1_delete(self, key):
+        # Chamado com self._lock já adquirido
+        entry = self._l1['entries'].pop(key, None)
+        if entry is not None:
+            self._l1['size'] -= len(entry[0])
+        return entry is not None
+
+    # -- API do Django -------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+
+        pickled = self._l1_get(key, now)
+        if pickled is not None:
+            with self._lock:
+                self._stats['l1_hits'] += 1
+            return pickle.loads(pickled)
+
+        found = self._l2_get(key, now)
+        if found is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return default
+
+        pickled, expires = found
+        self._l1_set(key, pickled, expires, now)
+        with self._lock:
+            self._stats['l2_hits'] += 1
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        self._l2_set(key, pickled, expires, now)
+        self._l1_set(key, pickled, expires, now)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        stored = self._l2_set(key, pickled, expires, now, only_if_missing=True)
+        if stored:
+            self._l1_set(key, pickled, expires, now)
+        return stored
+
+    def incr(self, key, delta=1, version=None):
+        """Incremento atômico no L2 (o do BaseCache é get + set): contadores entre workers"""
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, now)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            pickled = pickle.dumps(value, self.pickle_protocol)
+            conn.execute(
+                "UPDATE cache_entries SET value = ?, size = ?, accessed = ? WHERE key = ?",
+                (pickled, len(pickled), now, key),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        # O valor só vive no L2: uma cópia no L1 ficaria para trás dos outros workers
+        with self._lock:
+            self._l1_delete(key)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE cache_entries SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (expires, key, now),
+        )
+        with self._lock:
+            self._l1_delete(key)
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            self._l1_delete(key)
+        cursor = self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        if self._l1_get(key, now) is not None:
+            return True
+        return self._connection().execute(
+            "SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, now)
+        ).fetchone() is not None
+
+    def clear(self):
+        with self._lock:
+            self._l1['entries'].clear()
+            self._l1['size'] = 0
+        self._connection().execute("DELETE FROM cache_entries")
+
+    def close(self, **kwargs):
+        # Mantém a conexão aberta entre requisições, como um pool de uma conexão
+        pass
+
+    def stats(self):
+        """Contadores do processo atual e taxa de acerto por nível"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['l1_entries'] = len(self._l1['entries'])
+            stats['l1_size'] = self._l1['size']
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else 0.0
+        stats['l1_hit_ratio'] = stats['l1_hits'] / lookups if lookups else 0.0
+        stats['l2_size'] = self._l2_size()
+        return stats
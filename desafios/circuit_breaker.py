@@ -0,0 +1,180 @@
+"""
+Circuit breaker das chamadas ao LLM, com estado compartilhado pelo cache
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+from resolve_desafios.hedging import LLMTimeoutError
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half-open'
+
+# Status HTTP que indicam indisponibilidade do provedor (e não erro da requisição)
+OUTAGE_STATUS = {401, 402, 403, 429, 500, 502, 503, 504}
+OUTAGE_ERRORS = {
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+    'AuthenticationError', 'PermissionDeniedError', 'OpenAIConnectionError',
+}
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada sem tocar no LLM porque o circuito está aberto"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuito '{name}' aberto; nova tentativa em {retry_after:.0f}s")
+
+
+def is_outage_error(error: Exception) -> bool:
+    """Indica se o erro sugere que o provedor está fora (conta para abrir o circuito)"""
+    if isinstance(error, (LLMTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, 'status_code', None) in OUTAGE_STATUS:
+        return True
+    if any(cls.__name__ in OUTAGE_ERRORS for cls in type(error).__mro__):
+        return True
+    return 'insufficient_quota' in str(error)
+
+
+class CircuitBreaker:
+    """Circuito closed/open/half-open guardado no cache padrão.
+
+    As falhas são contadas com cache.add + cache.incr numa chave por janela de
+    FAILURE_WINDOW segundos; no TwoTierCache o incr é atômico no L2, então
+    falhas de workers diferentes somam. O instante de abertura é visto pelos
+    outros workers com atraso de até L1_TIMEOUT. Em half-open só uma chamada
+    de teste passa por vez, reservada com cache.add.
+
+    CIRCUIT_BREAKER (settings):
+        FAILURE_THRESHOLD: falhas dentro da janela para abrir (padrão 5)
+        FAILURE_WINDOW: janela de contagem de falhas, em segundos (padrão 60)
+        RECOVERY_TIMEOUT: segundos aberto antes de testar de novo (padrão 30)
+    """
+
+    def __init__(self, name: str, cache=None):
+        self.name = name
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else default_cache
+
+    @property
+    def _options(self) -> Dict[str, float]:
+        options = getattr(settings, 'CIRCUIT_BREAKER', {})
+        return {
+            'failure_threshold': int(options.get('FAILURE_THRESHOLD', 5)),
+            'failure_window': float(options.get('FAILURE_WINDOW', 60)),
+            'recovery_timeout': float(options.get('RECOVERY_TIMEOUT', 30)),
+        }
+
+    @property
+    def _key(self) -> str:
+        return f"circuit:{self.name}"
+
+    def _failures_key(self, now: float) -> str:
+        return f"{self._key}:failures:{int(now // self._options['failure_window'])}"
+
+    def _opened_at(self) -> Optional[float]:
+        return self.cache.get(f"{self._key}:opened_at")
+
+    def _open(self, now: float) -> None:
+        self.cache.set(f"{self._key}:opened_at", now, timeout=None)
+        self.cache.delete(self._failures_key(now))
+        self.cache.delete(f"{self._key}:probe")
+
+    def state(self) -> str:
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return STATE_CLOSED
+        if time.time() - opened_at >= self._options['recovery_timeout']:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def before_call(self) -> None:
+        """Levanta CircuitOpenError se a chamada não deve chegar ao LLM"""
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return
+        recovery_timeout = self._options['recovery_timeout']
+        elapsed = time.time() - opened_at
+        if elapsed < recovery_timeout:
+            raise CircuitOpenError(self.name, recovery_timeout - elapsed)
+        # Half-open: só um processo faz a chamada de teste
+        if not self.cache.add(f"{self._key}:probe", True, timeout=recovery_timeout):
+            raise CircuitOpenError(self.name, recovery_timeout)
+
+    def record_success(self) -> None:
+        # Fechado, um sucesso não zera a janela: são FAILURE_THRESHOLD falhas em FAILURE_WINDOW
+        if self._opened_at() is not None:
+            self.cache.delete(f"{self._key}:opened_at")
+            self.cache.delete(self._failures_key(time.time()))
+            self.cache.delete(f"{self._key}:probe")
+
+    def record_failure(self) -> None:
+        options = self._options
+        now = time.time()
+        if self._opened_at() is not None:
+            # Falha no teste do half-open: abre de novo
+            self._open(now)
+            return
+        key = self._failures_key(now)
+        self.cache.add(key, 0, timeout=options['failure_window'] * 2)
+        try:
+            failures = self.cache.incr(key)
+        except ValueError:
+            # A janela expirou entre o add e o incr
+            self.cache.add(key, 1, timeout=options['failure_window'] * 2)
+            failures = 1
+        if failures >= options['failure_threshold']:
+            self._open(now)
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        self.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record_error(e)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.before_call()
+        try:
+            result = await fn()
+        except Exception as e:
+            self._record_error(e)
+            raise
+        self.record_success()
+        return result
+
+    def _record_error(self, error: Exception) -> None:
+        if is_outage_error(error):
+            self.record_failure()
+        else:
+            # O provedor respondeu: um erro de validação não indica indisponibilidade
+            self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual para o /health/"""
+        options = self._options
+        opened_at = self._opened_at()
+        state = self.state()
+        snapshot = {
+            'state': state,
+            'recent_failures': self.cache.get(self._failures_key(time.time()), 0),
+            'failure_threshold': options['failure_threshold'],
+        }
+        if state == STATE_OPEN:
+            snapshot['retry_after'] = round(options['recovery_timeout'] - (time.time() - opened_at), 1)
+        return snapshot
+
+
+llm_breaker = CircuitBreaker('llm')
@@ -0,0 +1,469 @@
+"""
+Parser de notação Big-O: converte textos livres como "O(n log n)", "O(V + E)"
+ou "O(n²) no pior caso" em uma classe canônica com posto ordenável, gravada
+em colunas indexadas de Analysis (filtros e ordenação de /analyses/)
+"""
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Analysis
+
+# Classes descritas por extenso (em português e inglês)
+WORD_CLASSES = {
+    'constante': '1', 'constant': '1',
+    'logaritmica': 'log n', 'logarithmic': 'log n',
+    'linear': 'n',
+    'linearitmica': 'n log n', 'linearithmic': 'n log n', 'quasilinear': 'n log n',
+    'quadratica': 'n^2', 'quadratic': 'n^2',
+    'cubica': 'n^3', 'cubic': 'n^3',
+    'exponencial': '2^n', 'exponential': '2^n',
+    'fatorial': 'n!', 'factorial': 'n!',
+}
+FUNCTIONS = {'log', 'lg', 'ln', 'sqrt'}
+SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+SUBSCRIPTS = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+# Expoente simbólico sem relação com a base (n^k): polinomial de grau desconhecido,
+# acima de qualquer grau numérico
+SYMBOLIC_DEGREE = 50
+
+# Faixas do posto: ((((nível * 1000 + base) * 10000 + grau) * 100 + log) * 10 + log log)
+# log vai de -5 a 4,9 (décimos, somado a LOG_OFFSET) e log log de -5 a 4 (somado a LOGLOG_OFFSET)
+LOG_OFFSET, LOGLOG_OFFSET = 50, 5
+TIER_POLYNOMIAL, TIER_EXPONENTIAL, TIER_FACTORIAL, TIER_TOWER = 0, 1, 2, 3
+CLASS_MAX_LENGTH = 100
+
+
+class ComplexityError(ValueError):
+    """Texto que não é uma notação Big-O reconhecível"""
+
+
+@dataclass
+class Term:
+    """Monômio sem constantes: n^a · log^b(...) · c^(...) · (...)!"""
+
+    powers: Dict[str, float] = field(default_factory=dict)
+    logs: Dict[str, float] = field(default_factory=dict)
+    exponentials: Dict[str, float] = field(default_factory=dict)
+    factorials: Dict[str, float] = field(default_factory=dict)
+    towers: Dict[str, float] = field(default_factory=dict)
+    symbolic: Dict[str, float] = field(default_factory=dict)
+
+    def times(self, other: 'Term') -> 'Term':
+        result = Term()
+        for name in ('powers', 'logs', 'factorials', 'towers', 'symbolic'):
+            merged = dict(getattr(self, name))
+            for key, value in getattr(other, name).items():
+                merged[key] = merged.get(key, 0) + value
+            setattr(result, name, merged)
+        # c^n · d^n = (cd)^n
+        result.exponentials = dict(self.exponentials)
+        for exponent, base in other.exponentials.items():
+            result.exponentials[exponent] = result.exponentials.get(exponent, 1) * base
+        return result
+
+    def power(self, exponent: float) -> 'Term':
+        return Term(
+            powers={k: v * exponent for k, v in self.powers.items()},
+            logs={k: v * exponent for k, v in self.logs.items()},
+            exponentials={k: v ** exponent for k, v in self.exponentials.items()},
+            factorials={k: v * exponent for k, v in self.factorials.items()},
+            towers={k: v * exponent for k, v in self.towers.items()},
+            symbolic={k: v * exponent for k, v in self.symbolic.items()},
+        )
+
+    @property
+    def is_constant(self) -> bool:
+        return not (self.powers or self.logs or self.exponentials or self.factorials or self.towers
+                    or self.symbolic)
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        names = set(self.powers)
+        for text in (*self.logs, *self.exponentials, *self.factorials, *self.towers, *self.symbolic):
+            names.update(re.findall(r'[A-Za-z_]\w*', text))
+        return tuple(sorted(names - FUNCTIONS))
+
+    @property
+    def key(self) -> Tuple[int, float, float, float, float]:
+        """Ordem de crescimento; variáveis diferentes contam como a mesma (n·m ~ n²)"""
+        if self.towers:
+            tier = TIER_TOWER
+        elif self.factorials:
+            tier = TIER_FACTORIAL
+        elif self.exponentials:
+            tier = TIER_EXPONENTIAL
+        else:
+            tier = TIER_POLYNOMIAL
+        base = math.prod(self.exponentials.values()) if tier == TIER_EXPONENTIAL else 0
+        degree = sum(self.powers.values()) + SYMBOLIC_DEGREE * sum(self.symbolic.values())
+        log_power = sum(v for k, v in self.logs.items() if not k.startswith('log '))
+        loglog_power = sum(v for k, v in self.logs.items() if k.startswith('log '))
+        return tier, base, degree, log_power, loglog_power
+
+    def notation(self) -> str:
+        parts = []
+        for name, exponent in sorted(self.powers.items()):
+            parts.append(name if exponent == 1 else f"{name}^{_number(exponent)}")
+        for argument, exponent in sorted(self.logs.items()):
+            base = f"log {argument}" if re.fullmatch(r'\w+|log \w+', argument) else f"log({argument})"
+            parts.append(base if exponent == 1 else f"{base.replace('log', f'log^{_number(exponent)}', 1)}")
+        for exponent, base in sorted(self.exponentials.items()):
+            wrapped = exponent if re.fullmatch(r'\w+', exponent) else f"({exponent})"
+            parts.append(f"{_number(base)}^{wrapped}")
+        for argument, exponent in sorted(self.factorials.items()):
+            wrapped = argument if re.fullmatch(r'\w+', argument) else f"({argument})"
+            parts.append(f"{wrapped}!" if exponent == 1 else f"({wrapped}!)^{_number(exponent)}")
+        for text, exponent in sorted({**self.symbolic, **self.towers}.items()):
+            parts.append(text if exponent == 1 else f"({text})^{_number(exponent)}")
+        return ' '.join(parts) or '1'
+
+
+@dataclass(frozen=True)
+class Complexity:
+    """Resultado do parser: notação canônica, posto ordenável e variáveis"""
+
+    notation: str
+    rank: int
+    variables: Tuple[str, ...]
+
+    def __str__(self):
+        return self.notation
+
+
+def _number(value: float) -> str:
+    return f"{value:g}"
+
+
+def _rank(key: Tuple[int, float, float, float, float]) -> int:
+    tier, base, degree, log_power, loglog_power = key
+    rank = tier
+    rank = rank * 1000 + min(max(round(base * 10), 0), 999)
+    rank = rank * 10000 + min(max(round(degree * 100), 0), 9999)
+    # Logs com deslocamento: expoentes negativos (n²/log n < n²) também ordenam
+    rank = rank * 100 + min(max(round(log_power * 10) + LOG_OFFSET, 0), 99)
+    return rank * 10 + min(max(round(loglog_power) + LOGLOG_OFFSET, 0), 9)
+
+
+def _simplify(terms: List[Term]) -> List[Term]:
+    """Soma: descarta constantes e termos dominados por outro com as mesmas variáveis"""
+    terms = [term for term in terms if not term.is_constant] or [Term()]
+    kept = []
+    for i, term in enumerate(terms):
+        # Em empate (n + n) fica o primeiro
+        dominated = any(
+            j != i and set(term.variables) <= set(other.variables)
+            and (other.key > term.key or (other.key == term.key and j < i))
+            for j, other in enumerate(terms)
+        )
+        if not dominated:
+            kept.append(term)
+    return kept
+
+
+class _Parser:
+    """Descida recursiva: soma de produtos de fatores com ^, ! e log/sqrt"""
+
+    TOKEN = re.compile(r'\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_]\w*)|(\S))')
+
+    def __init__(self, text: str):
+        self.tokens = []
+        for number, name, symbol in self.TOKEN.findall(text):
+            if number:
+                self.tokens.append(('num', float(number)))
+            elif name:
+                self.tokens.extend(self._names(name))
+            elif symbol:
+                self.tokens.append(('sym', symbol))
+        self.position = 0
+
+    def _names(self, name: str):
+        if name == 'sqrt':
+            return [('fn', 'sqrt')]
+        # log2, log_2, log10, lg, ln: a base do logaritmo não muda a classe ("log2n" = log n)
+        match = re.fullmatch(r'(?:log|lg|ln)_?\d*([A-Za-z_]\w*)?', name)
+        if match:
+            return [('fn', 'log')] + (self._names(match.group(1)) if match.group(1) else [])
+        # "nlogn", "nlog n", "mlgn": variáveis de uma letra coladas no log
+        match = re.fullmatch(r'([A-Za-z]{1,2})((?:log|lg)_?\d*[A-Za-z_]?\w*)', name)
+        if match:
+            return self._names(match.group(1)) + self._names(match.group(2))
+        # "nm", "mn", "nW": produto implícito de variáveis de uma letra
+        if len(name) == 2 and name.isalpha():
+            return [('var', letter) for letter in name]
+        return [('var', name)]
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        if self.take() != ('sym', symbol):
+            raise ComplexityError(f"esperado '{symbol}'")
+
+    def parse(self) -> List[Term]:
+        terms = self.sum()
+        if self.peek() != (None, None):
+            raise ComplexityError(f"token inesperado: {self.peek()[1]}")
+        return terms
+
+    def sum(self) -> List[Term]:
+        terms = self.product()
+        while self.peek() in (('sym', '+'), ('sym', '-')):
+            self.take()
+            terms = terms + self.product()
+        return terms
+
+    def product(self) -> List[Term]:
+        terms = self.factor()
+        while True:
+            kind, value = self.peek()
+            if (kind, value) in (('sym', '*'), ('sym', '/')):
+                self.take()
+                right = self.factor()
+                if value == '/':
+                    if len(right) != 1:
+                        raise ComplexityError("divisão por uma soma")
+                    right = [right[0].power(-1)] if not right[0].is_constant else [Term()]
+                terms = [a.times(b) for a in terms for b in right]
+            elif kind in ('num', 'var', 'fn') or (kind, value) == ('sym', '('):
+                # Multiplicação implícita: "n log n", "2n"
+                right = self.factor()
+                terms = [a.times(b) for a in terms for b in right]
+            else:
+                return terms
+
+    def factor(self) -> List[Term]:
+        terms, text, number = self.atom()
+        while True:
+            if self.peek() == ('sym', '!'):
+                self.take()
+                if number is not None:
+                    terms, number = [Term()], None
+                else:
+                    terms = [Term(factorials={text: 1})]
+                text = f"{text}!"
+            elif self.peek() == ('sym', '^'):
+                self.take()
+                exponent_terms, exponent_text, exponent_number = self.atom()
+                if exponent_number is not None:
+                    if number is not None:
+                        terms = [Term()]
+                    else:
+                        terms = [term.power(exponent_number) for term in terms]
+                elif number is not None:
+                    terms = [Term(exponentials={exponent_text: number})] if number > 1 else [Term()]
+                elif set(_names_in(exponent_text)) & set(_names_in(text)):
+                    # n^n
+                    terms = [Term(towers={f"{_wrap(text)}^{_wrap(exponent_text)}": 1})]
+                else:
+                    # n^k
+                    terms = [Term(symbolic={f"{_wrap(text)}^{_wrap(exponent_text)}": 1})]
+                text, number = f"{_wrap(text)}^{_wrap(exponent_text)}", None
+            else:
+                return terms
+
+    def atom(self) -> Tuple[List[Term], str, Optional[float]]:
+        """(termos, texto canônico, valor se for número)"""
+        kind, value = self.take()
+        if kind == 'num':
+            return [Term()], _number(value), value
+        if kind == 'var':
+            return [Term(powers={value: 1})], value, None
+        if kind == 'fn':
+            exponent = 1.0
+            if self.peek() == ('sym', '^'):
+                # log^2 n
+                self.take()
+                power_kind, exponent = self.take()
+                if power_kind != 'num':
+                    raise ComplexityError("expoente do log deve ser número")
+            if self.peek() == ('sym', '('):
+                argument_terms, argument_text, argument_number = self.atom()
+            else:
+                argument_terms, argument_text, argument_number = self.log_argument()
+            if value == 'sqrt':
+                return [t.power(0.5 * exponent) for t in argument_terms], f"sqrt({argument_text})", None
+            return self._log(argument_terms, argument_text, argument_number, exponent)
+        if (kind, value) == ('sym', '('):
+            terms = self.sum()
+            self.expect(')')
+            if all(term.is_constant for term in terms):
+                return [Term()], '1', 1.0
+            return terms, ' + '.join(term.notation() for term in _simplify(terms)), None
+        raise ComplexityError(f"token inesperado: {value}")
+
+    def log_argument(self):
+        # Sem parênteses o argumento é um fator: "log n^2" = log(n^2), "log log n" encadeia
+        terms = self.factor()
+        simplified = _simplify(terms)
+        return terms, ' + '.join(term.notation() for term in simplified), None
+
+    def _log(self, terms, text, number, exponent):
+        if number is not None or all(term.is_constant for term in terms):
+            return [Term()], '1', 1.0
+        dominant = max(_simplify(terms), key=lambda term: term.key)
+        if dominant.exponentials and not (dominant.factorials or dominant.towers):
+            # log(c^n) = n·log c ~ n
+            names = {name for exponent_text in dominant.exponentials for name in _names_in(exponent_text)}
+            result = Term(powers=dict.fromkeys(names, 1))
+            return [result.power(exponent)], f"log({text})", None
+        if dominant.factorials or dominant.towers:
+            # log(n!) ~ n log n; log(n^n) = n log n
+            names = dominant.variables or ('n',)
+            result = Term(powers={names[0]: 1}, logs={names[0]: 1})
+            return [result.power(exponent)], f"log({text})", None
+        if not dominant.powers and dominant.logs:
+            # log log n
+            inner = max(dominant.logs)
+            argument = inner if inner.startswith('log ') else f"log {inner}"
+            return [Term(logs={argument: exponent})], f"log {text}", None
+        # log(n^2) = 2 log n ~ log n; log(nm) = log n + log m, como um log só
+        argument = ' '.join(sorted(dominant.powers))
+        return [Term(logs={argument: exponent})], f"log {text}", None
+
+
+def _names_in(text: str) -> List[str]:
+    return [name for name in re.findall(r'[A-Za-z_]\w*', text) if name not in FUNCTIONS]
+
+
+def _wrap(text: str) -> str:
+    return text if re.fullmatch(r'\w+', text) else f"({text})"
+
+
+def _normalize(text: str) -> str:
+    # n² -> n^2, log₂ -> log2
+    text = re.sub('[⁰¹²³⁴⁵⁶⁷⁸⁹]+', lambda match: '^' + match.group().translate(SUPERSCRIPTS), text)
+    text = text.translate(SUBSCRIPTS)
+    text = text.replace('**', '^').replace('·', '*').replace('⋅', '*').replace('×', '*')
+    text = text.replace('√', 'sqrt ').replace('−', '-')
+    # |V| + |E| -> (V) + (E): cardinalidade de conjunto
+    text = re.sub(r'\|([^|]+)\|', r'(\1)', text)
+    # len(coins) -> coins
+    text = re.sub(r'\blen\s*\(\s*(\w+)\s*\)', r'\1', text)
+    return text
+
+
+def _groups(text: str) -> List[str]:
+    """Conteúdo de cada O(...), Θ(...), Ω(...) do texto (parênteses balanceados)"""
+    groups = []
+    # Só O maiúsculo: "o (pior caso)" em português não é notação
+    for match in re.finditer(r'(?<![A-Za-z])(?:O\s*|[ΘθΩ])\(', text):
+        depth, start = 0, match.end() - 1
+        for position in range(start, len(text)):
+            if text[position] == '(':
+                depth += 1
+            elif text[position] == ')':
+                depth -= 1
+                if depth == 0:
+                    groups.append(text[start + 1:position])
+                    break
+    return groups
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+@lru_cache(maxsize=4096)
+def parse(text: str) -> Complexity:
+    """Classe canônica do texto; com vários O(...) ("O(1) médio, O(n) pior") fica o maior"""
+    if not text or not text.strip():
+        raise ComplexityError("texto vazio")
+    raw = _normalize(text)
+    groups = _groups(raw)
+    if not groups:
+        words = re.findall(r'[a-z]+', _fold(text))
+        classes = [WORD_CLASSES[word] for word in words if word in WORD_CLASSES]
+        if classes:
+            groups = classes
+        elif re.fullmatch(r'[\w\s^*+/()!.\-]+', raw) and all(
+            len(name) <= 3 or name in FUNCTIONS for name in re.findall(r'[A-Za-z_]\w*', raw)
+        ):
+            # "n log n" sem o O(...)
+            groups = [raw]
+        else:
+            raise ComplexityError(f"sem notação Big-O: {text!r}")
+
+    best = None
+    for group in groups:
+        try:
+            terms = _simplify(_Parser(group).parse())
+        except (ValueError, TypeError, OverflowError, RecursionError):
+            continue
+        key = max(term.key for term in terms)
+        if best is None or key > best[0]:
+            best = (key, terms)
+    if best is None:
+        raise ComplexityError(f"notação Big-O inválida: {text!r}")
+
+    key, terms = best
+    variables = tuple(sorted({name for term in terms for name in term.variables}))
+    return Complexity(
+        notation=f"O({' + '.join(term.notation() for term in terms)})",
+        rank=_rank(key),
+        variables=variables,
+    )
+
+
+def try_parse(text: Optional[str]) -> Optional[Complexity]:
+    """parse() que devolve None para textos sem notação reconhecível"""
+    try:
+        return parse(text or '')
+    except ComplexityError:
+        return None
+
+
+def analysis_fields(complexity_time: str, complexity_space: str, approaches: Iterable) -> Dict[str, object]:
+    """Colunas normalizadas de Analysis a partir dos textos de complexidade"""
+    time, space = try_parse(complexity_time), try_parse(complexity_space)
+    approach_ranks = [
+        parsed.rank
+        for approach in approaches or []
+        if isinstance(approach, dict)
+        for parsed in [try_parse(approach.get('time_complexity'))]
+        if parsed is not None
+    ]
+    return {
+        'time_rank': time.rank if time else None,
+        'time_class': time.notation[:CLASS_MAX_LENGTH] if time else '',
+        'space_rank': space.rank if space else None,
+        'space_class': space.notation[:CLASS_MAX_LENGTH] if space else '',
+        'best_approach_time_rank': min(approach_ranks) if approach_ranks else None,
+    }
+
+
+def normalize(analysis) -> None:
+    """Preenche as colunas normalizadas de uma análise (antes de salvar)"""
+    for name, value in analysis_fields(
+        analysis.complexity_time, analysis.complexity_space, analysis.get_approaches_list()
+    ).items():
+        setattr(analysis, name, value)
+
+
+def backfill(batch_size: int = 2000) -> Tuple[int, int]:
+    """Recalcula as colunas de todas as análises; devolve (atualizadas, sem notação reconhecida)"""
+    fields = list(analysis_fields('', '', []))
+    updated = unparsed = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Analysis.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'complexity_time', 'complexity_space', 'approaches', *fields)[:batch_size]
+        )
+        if not batch:
+            return updated, unparsed
+        for analysis in batch:
+            normalize(analysis)
+            unparsed += analysis.time_rank is None
+        Analysis.objects.bulk_update(batch, fields)
+        updated += len(batch)
+        last_id = batch[-1].id
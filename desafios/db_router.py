@@ -0,0 +1,85 @@
+"""
+Roteamento de banco: leituras nas réplicas, escritas (e leituras logo após
+uma escrita) no primário
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+from asgiref.sync import iscoroutinefunction
+
+# Cookie com o instante até o qual o cliente lê do primário
+PIN_COOKIE = 'db_primary_until'
+
+# Por requisição (a middleware reinicia a cada uma) ou por thread fora delas
+_pinned = ContextVar('desafios_db_pinned', default=False)
+_wrote = ContextVar('desafios_db_wrote', default=False)
+
+
+def pin_primary() -> None:
+    """Faz as próximas leituras do contexto atual irem ao primário"""
+    _pinned.set(True)
+    _wrote.set(True)
+
+
+class ReplicaRouter:
+    """Envia leituras a uma das DATABASE_REPLICAS, a menos que o contexto esteja preso ao primário"""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        # Relações seguem o banco de onde a instância veio
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _start(request) -> None:
+    try:
+        pinned_until = float(request.COOKIES.get(PIN_COOKIE) or 0)
+    except ValueError:
+        pinned_until = 0
+    _pinned.set(pinned_until > time.time())
+    _wrote.set(False)
+
+
+def _finish(response):
+    # Depois de uma escrita o cliente lê do primário até a réplica alcançá-lo
+    if _wrote.get() and getattr(settings, 'DATABASE_REPLICAS', []):
+        tolerance = settings.REPLICA_LAG_TOLERANCE
+        response.set_cookie(
+            PIN_COOKIE, f"{time.time() + tolerance:.3f}",
+            max_age=max(1, int(tolerance + 0.999)), httponly=True, samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """Prende ao primário as leituras da requisição que escreveu e as do mesmo cliente logo depois"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            _start(request)
+            return _finish(await get_response(request))
+    else:
+        def middleware(request):
+            _start(request)
+            return _finish(get_response(request))
+    return middleware
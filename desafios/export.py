@@ -0,0 +1,108 @@
+"""
+Serialização em streaming (CSV/JSONL, opcionalmente gzip) para exportação de análises
+"""
+
+import csv
+import json
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .services import EXPORT_FIELDS
+
+# Junta linhas pequenas em blocos antes de enviá-las ao servidor
+CHUNK_SIZE = 64 * 1024
+
+
+class _Echo:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in EXPORT_FIELDS])
+
+
+async def acsv_lines(rows: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    async for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in EXPORT_FIELDS])
+
+
+def _csv_value(value):
+    # Listas (categorias, abordagens) viram JSON dentro da célula
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def jsonl_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield _jsonl_line(row)
+
+
+async def ajsonl_lines(rows: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield _jsonl_line(row)
+
+
+def _jsonl_line(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def encoded_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+async def aencoded_chunks(lines: AsyncIterable[str]) -> AsyncIterator[bytes]:
+    """Async version of encoded_chunks (no ASGI o Django consome iteradores sync com list())"""
+    buffer, size = [], 0
+    async for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = _gzip_compressor()
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def agzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    compressor = _gzip_compressor()
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _gzip_compressor():
+    return zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
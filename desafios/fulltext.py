@@ -0,0 +1,48 @@
+"""
+Busca de texto pelos índices criados na migração 0006 (FTS5 no SQLite, GIN no PostgreSQL)
+"""
+
+import re
+from typing import Optional
+
+from django.db import connections
+from django.db.models import BooleanField, QuerySet
+from django.db.models.expressions import RawSQL
+
+# Tabela -> colunas indexadas (as mesmas de FULLTEXT_TABLES na migração)
+FULLTEXT_COLUMNS = {
+    'desafios_analysis': ('title', 'summary'),
+    'desafios_challenge': ('title', 'description'),
+}
+
+
+def _fts5_query(term: str) -> str:
+    """Cada palavra vira um prefixo entre aspas: 'two su' -> "two"* "su"*"""
+    words = re.findall(r'\w+', term, re.UNICODE)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(queryset: QuerySet, term: str) -> Optional[QuerySet]:
+    """Filtra o queryset pelo índice de texto; None se o banco ou a tabela não tiver índice"""
+    table = queryset.model._meta.db_table
+    columns = FULLTEXT_COLUMNS.get(table)
+    vendor = connections[queryset.db].vendor
+    if columns is None or vendor not in ('sqlite', 'postgresql'):
+        return None
+    if vendor == 'sqlite':
+        match = _fts5_query(term)
+        if not match:
+            return queryset.none()
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s", (match,)
+        ))
+    # Mesma expressão do índice GIN, senão o PostgreSQL não o usa; filtrar pela
+    # própria expressão booleana a põe direto no WHERE
+    qn = connections[queryset.db].ops.quote_name
+    first, second = (f"{qn(table)}.{qn(column)}" for column in columns)
+    return queryset.filter(RawSQL(
+        f"to_tsvector('portuguese', coalesce({first}, '') || ' ' || coalesce({second}, '')) "
+        f"@@ plainto_tsquery('portuguese', %s)",
+        (term,),
+        output_field=BooleanField(),
+    ))
@@ -0,0 +1,35 @@
+"""
+Utilitários compartilhados pelos comandos de benchmark
+"""
+
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import override_settings
+
+
+@contextmanager
+def temporary_database():
+    """Cria um banco de teste descartável em arquivo para não sujar os dados reais"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(tmp_dir) / 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # As réplicas continuam apontando para os dados reais
+            with override_settings(DATABASE_REPLICAS=[]):
+                yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil simples (nearest-rank) de uma lista de números"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,20 @@
+"""
+Preenche os postos de complexidade das análises gravadas antes da migração 0007
+"""
+
+from django.core.management.base import BaseCommand
+
+from desafios import complexity
+
+
+class Command(BaseCommand):
+    help = "Recalcula time_rank/space_rank/classes de todas as análises a partir dos textos de complexidade"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        updated, unparsed = complexity.backfill(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} análises atualizadas ({unparsed} sem notação de tempo reconhecida)"
+        ))
@@ -0,0 +1,236 @@
+"""
+Backup online do SQLite: cópia pela API de backup em passos pequenos, sem
+parar os workers, comprimida com gzip; opcionalmente compacta o banco
+"""
+
+import datetime
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ._utils import percentile
+
+BACKUP_PREFIX = 'db_backup_'
+BACKUP_SUFFIX = '.sqlite3.gz'
+# Reinícios tolerados antes de copiar o resto em um único passo
+MAX_RESTARTS = 3
+
+
+class WriteStallProbe(threading.Thread):
+    """Mede quanto um writer esperaria pelo lock durante o backup.
+
+    BEGIN EXCLUSIVE pede o mesmo lock de um COMMIT (em WAL, o de escrita) e o
+    ROLLBACK não altera o arquivo, então a sonda não reinicia a cópia.
+    """
+
+    def __init__(self, path: str, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.stalls = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                connection.execute('BEGIN EXCLUSIVE')
+                self.stalls.append(time.perf_counter() - started)
+                connection.execute('ROLLBACK')
+                self._stop_event.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "Backup online do banco SQLite (API de backup em passos, sem bloquear escritas), "
+        "comprimido com gzip; --vacuum-into gera a cópia já compactada e --incremental-vacuum "
+        "devolve ao disco as páginas livres do banco em produção"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(Path(settings.BASE_DIR) / 'backups'),
+                            help="Diretório dos backups")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--pages', type=int, default=256, help="Páginas copiadas por passo")
+        parser.add_argument('--sleep', type=float, default=0.005,
+                            help="Pausa entre passos (s), quando os writers pegam o lock")
+        parser.add_argument('--vacuum-into', action='store_true',
+                            help="Snapshot com VACUUM INTO (já compactado, em uma única transação de leitura)")
+        parser.add_argument('--incremental-vacuum', type=int, default=0, metavar='PAGES',
+                            help="Depois do backup, libera páginas livres do banco em lotes de PAGES "
+                                 "(requer auto_vacuum=INCREMENTAL)")
+        parser.add_argument('--keep', type=int, default=0, help="Backups mantidos (0 = todos)")
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Segundos entre backups (0 = faz um e sai)")
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES[options['database']]
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("O banco não é SQLite; use o backup do próprio banco (ex.: pg_dump)")
+        source_path = str(database['NAME'])
+        if not os.path.exists(source_path):
+            raise CommandError(f"Banco não encontrado: {source_path}")
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+
+        while True:
+            self._run(source_path, output, options)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _run(self, source_path, output, options):
+        name = f"{BACKUP_PREFIX}{datetime.datetime.now():%Y%m%d_%H%M%S}"
+        snapshot = output / f".{name}.sqlite3"
+        probe = WriteStallProbe(source_path)
+        started = time.perf_counter()
+        probe.start()
+        try:
+            if options['vacuum_into']:
+                steps, restarts = self._vacuum_into(source_path, snapshot), 0
+            else:
+                steps, restarts = self._backup(source_path, snapshot, options['pages'], options['sleep'])
+        except BaseException:
+            snapshot.unlink(missing_ok=True)
+            raise
+        finally:
+            probe.stop()
+        copy_seconds = time.perf_counter() - started
+
+        try:
+            self._verify(snapshot)
+            target = self._compress(snapshot, output / f"{name}{BACKUP_SUFFIX}")
+        finally:
+            snapshot.unlink(missing_ok=True)
+        total_seconds = time.perf_counter() - started
+
+        stalls = probe.stalls or [0.0]
+        self.stdout.write(
+            f"{target} ({os.path.getsize(target) / 1024 / 1024:.1f} MB de "
+            f"{os.path.getsize(source_path) / 1024 / 1024:.1f} MB)\n"
+            f"cópia: {copy_seconds * 1000:.0f} ms em {steps} passos ({restarts} reinícios) | "
+            f"total com verificação e gzip: {total_seconds * 1000:.0f} ms\n"
+            f"espera de escrita durante a cópia: pior {max(stalls) * 1000:.1f} ms, "
+            f"p99 {percentile(stalls, 99) * 1000:.1f} ms ({len(probe.stalls)} sondas)"
+        )
+
+        if options['incremental_vacuum']:
+            self._incremental_vacuum(source_path, options['incremental_vacuum'], options['sleep'])
+        if options['keep']:
+            self._rotate(output, options['keep'])
+
+    def _backup(self, source_path, snapshot, pages, pause):
+        """API de backup em passos de `pages` páginas; devolve (passos, reinícios)"""
+        source = sqlite3.connect(source_path, timeout=60, isolation_level=None)
+        target = sqlite3.connect(str(snapshot), isolation_level=None)
+        # O snapshot é descartável até passar na verificação; sem fsync a cada passo
+        target.execute('PRAGMA synchronous=OFF')
+        steps, restarts = 0, 0
+        last_remaining = None
+
+        def progress(status, remaining, total):
+            nonlocal steps, restarts, last_remaining
+            steps += 1
+            # Uma escrita de outra conexão faz a cópia recomeçar do início
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+            last_remaining = remaining
+            if restarts >= MAX_RESTARTS:
+                raise _TooManyRestarts
+
+        wal = source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        try:
+            if wal:
+                # Em WAL, uma transação de leitura aberta na conexão de origem fixa o
+                # snapshot entre os passos (sem reinícios) e não bloqueia os writers
+                source.execute('BEGIN')
+                source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+            try:
+                source.backup(target, pages=pages, progress=progress, sleep=pause)
+            except _TooManyRestarts:
+                # Journal de rollback com escritas contínuas: os passos nunca alcançam o
+                # fim, então o resto vai em um passo só (os commits esperam por ele)
+                source.backup(target)
+                steps += 1
+        finally:
+            if source.in_transaction:
+                source.execute('COMMIT')
+            target.close()
+            source.close()
+        return steps, restarts
+
+    def _vacuum_into(self, source_path, snapshot):
+        source = sqlite3.connect(source_path, timeout=60)
+        try:
+            source.execute('VACUUM INTO ?', (str(snapshot),))
+        finally:
+            source.close()
+        return 1
+
+    def _verify(self, snapshot):
+        connection = sqlite3.connect(str(snapshot))
+        try:
+            # A cópia fica com o modo de journal do original; o snapshot é um arquivo só
+            connection.execute('PRAGMA journal_mode=DELETE')
+            result = connection.execute('PRAGMA quick_check').fetchone()[0]
+        finally:
+            connection.close()
+        if result != 'ok':
+            raise CommandError(f"Cópia corrompida ({result}); backup descartado")
+
+    def _compress(self, snapshot, target):
+        partial = target.with_name(f".{target.name}.partial")
+        with open(snapshot, 'rb') as raw, gzip.open(partial, 'wb', compresslevel=6) as compressed:
+            shutil.copyfileobj(raw, compressed, 1024 * 1024)
+        with open(partial, 'rb') as written:
+            os.fsync(written.fileno())
+        # Renomeação atômica: um backup pela metade nunca aparece com o nome final
+        os.replace(partial, target)
+        return target
+
+    def _incremental_vacuum(self, source_path, pages, pause):
+        """Libera páginas livres em transações curtas, com pausa entre lotes"""
+        connection = sqlite3.connect(source_path, timeout=60, isolation_level=None)
+        try:
+            if connection.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                self.stderr.write(
+                    "incremental_vacuum ignorado: auto_vacuum não é INCREMENTAL. Para ativar, numa janela "
+                    "de manutenção: PRAGMA auto_vacuum=INCREMENTAL; VACUUM; (reescreve o banco inteiro)"
+                )
+                return
+            before = connection.execute('PRAGMA freelist_count').fetchone()[0]
+            started = time.perf_counter()
+            while connection.execute('PRAGMA freelist_count').fetchone()[0]:
+                connection.execute(f'PRAGMA incremental_vacuum({int(pages)})')
+                time.sleep(pause)
+            self.stdout.write(
+                f"incremental_vacuum: {before} páginas livres devolvidas em "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        finally:
+            connection.close()
+
+    def _rotate(self, output, keep):
+        backups = sorted(output.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"))
+        for old in backups[:-keep]:
+            old.unlink()
+            self.stdout.write(f"removido: {old.name}")
+
+
+class _TooManyRestarts(Exception):
+    pass
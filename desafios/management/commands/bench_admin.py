@@ -0,0 +1,118 @@
+"""
+Benchmark do admin com tabelas grandes: tempo da changelist de Analysis e Challenge
+"""
+
+import datetime
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from desafios import complexity
+from desafios.models import Analysis, Challenge
+
+from ._utils import percentile, temporary_database
+
+WORDS = [
+    "two", "sum", "graph", "path", "tree", "array", "string", "prefix", "window", "interval",
+    "matrix", "subsequence", "palindrome", "heap", "queue", "stack", "bits", "prime", "coins", "knapsack",
+]
+DIFFICULTIES = [choice for choice, _ in Analysis.DIFFICULTY_CHOICES]
+MODELS = ["gpt-4o-mini", "gpt-4o", "gpt-4.1-mini"]
+
+URLS = [
+    ("analysis", "/admin/desafios/analysis/"),
+    ("analysis: dificuldade", "/admin/desafios/analysis/?difficulty__exact=MEDIO"),
+    ("analysis: modelo", "/admin/desafios/analysis/?model=gpt-4o"),
+    ("analysis: busca", "/admin/desafios/analysis/?q=palindrome+window"),
+    ("analysis: ano", "/admin/desafios/analysis/?created_at__year={year}"),
+    ("analysis: mês", "/admin/desafios/analysis/?created_at__year={year}&created_at__month={month}"),
+    ("analysis: página 50", "/admin/desafios/analysis/?p=50"),
+    ("challenge", "/admin/desafios/challenge/"),
+    ("challenge: busca", "/admin/desafios/challenge/?q=graph"),
+]
+
+
+class Command(BaseCommand):
+    help = "Popula um banco descartável com N análises e mede o tempo das changelists do admin"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Análises geradas (1000000 para 1M)")
+        parser.add_argument('--repeat', type=int, default=5, help="Requisições por URL")
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            started = time.perf_counter()
+            latest = self._seed(options['rows'])
+            self.stdout.write(f"{options['rows']} análises geradas em {time.perf_counter() - started:.1f}s\n")
+
+            user = get_user_model().objects.create_superuser('bench', 'bench@example.com', 'bench')
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+
+            self.stdout.write(f"{'página':<26}{'p50 (ms)':>10}{'máx (ms)':>10}{'consultas':>11}")
+            for label, url in URLS:
+                url = url.format(year=latest.year, month=latest.month)
+                timings, queries = [], 0
+                for _ in range(options['repeat']):
+                    with CaptureQueriesContext(connection) as captured:
+                        request_started = time.perf_counter()
+                        response = client.get(url)
+                        timings.append(time.perf_counter() - request_started)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} respondeu {response.status_code}")
+                    queries = len(captured)
+                self.stdout.write(
+                    f"{label:<26}{percentile(timings, 50) * 1000:>10.1f}{max(timings) * 1000:>10.1f}{queries:>11}"
+                )
+
+    def _seed(self, rows):
+        """Insere direto pelo cursor (o ORM levaria minutos para 1M linhas)"""
+        rng = random.Random(42)
+        now = timezone.now()
+        challenges = max(1, rows // 2)
+        adapt = connection.ops.adapt_datetimefield_value
+
+        def created_at(i, total):
+            # Espalhadas pelos últimos dois anos, em ordem crescente de id
+            return adapt(now - datetime.timedelta(days=730 * (1 - i / total)))
+
+        def title():
+            return " ".join(rng.choice(WORDS) for _ in range(3)).title()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO desafios_challenge (title, description, objectives, constraints, language, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [(title(), "Enunciado de benchmark " * 40, "", "", "pt-BR", created_at(i, challenges))
+                 for i in range(challenges)],
+            )
+            first_challenge = Challenge.objects.order_by('id').values_list('id', flat=True).first()
+            approaches = json.dumps([{"name": "Hash Map", "algorithms": ["Hash Map"], "steps": ["a", "b"]}])
+            raw_data = json.dumps({"notes": "x" * 2000})
+            complexity_columns = complexity.analysis_fields("O(n)", "O(n)", json.loads(approaches)).values()
+            batch = 10000
+            for start in range(0, rows, batch):
+                cursor.executemany(
+                    "INSERT INTO desafios_analysis (challenge_id, title, summary, categories, difficulty, approaches, "
+                    "recommended_approach, recommended_solution, complexity_time, complexity_space, assumptions, "
+                    "\"references\", model, raw_data, stage, created_at, time_rank, time_class, space_rank, "
+                    "space_class, best_approach_time_rank) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    [
+                        (first_challenge + i % challenges, title(), "Resumo de benchmark " + title(),
+                         '["Arrays"]', rng.choice(DIFFICULTIES), approaches, "Hash Map", "def solve(): pass\n" * 50,
+                         "O(n)", "O(n)", "", "", rng.choice(MODELS), raw_data, Analysis.STAGE_COMPLETE,
+                         created_at(i, rows), *complexity_columns)
+                        for i in range(start, min(rows, start + batch))
+                    ],
+                )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return timezone.localtime(now)
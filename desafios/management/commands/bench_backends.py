@@ -0,0 +1,99 @@
+"""
+Benchmark do pool de backends: vazão do adapter do OpenAI contra servidores
+stub locais, variando o tamanho do pool, com um backend lento e um falhando
+"""
+
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+from resolve_desafios.backend_pool import BackendConfig
+from resolve_desafios.llm_adapter import OpenAILLMAdapter
+from resolve_desafios.stub_server import start_stub_server
+
+from ._utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a vazão de análises com 1, 2, 4... backends stub compatíveis com OpenAI "
+        "(cada um com capacidade limitada, como o rate limit de uma chave)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,2,4', help="Tamanhos do pool, separados por vírgula")
+        parser.add_argument('--calls', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=32, help="Análises simultâneas")
+        parser.add_argument('--latency', type=float, default=0.25, help="Latência de cada stub (s)")
+        parser.add_argument('--capacity', type=int, default=2, help="Requisições simultâneas por stub")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        largest = max(sizes)
+        scenarios = [(f"{size} backend{'s' if size > 1 else ''}", [{}] * size) for size in sizes]
+        if largest > 1:
+            scenarios.append((f"{largest}, 1 lento (3x)", [{'latency': options['latency'] * 3}] + [{}] * (largest - 1)))
+            scenarios.append((f"{largest}, 1 falhando", [{'fail_rate': 1.0}] + [{}] * (largest - 1)))
+
+        self.stdout.write(
+            f"{options['calls']} análises, {options['concurrency']} simultâneas; cada stub: "
+            f"{options['latency'] * 1000:.0f} ms, {options['capacity']} por vez\n"
+        )
+        self.stdout.write(f"{'pool':<20}{'req/s':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'erros':>7}"
+                          f"{'hedges':>8}  requisições por backend (ejeções)")
+        baseline = None
+        for label, overrides in scenarios:
+            stats = self._run(overrides, options)
+            baseline = baseline or stats['rps']
+            distribution = " ".join(
+                f"{backend['requests']}({backend['ejections']})" for backend in stats['backends']
+            )
+            self.stdout.write(
+                f"{label:<20}{stats['rps']:>8.1f}{stats['p50'] * 1000:>10.0f}{stats['p95'] * 1000:>10.0f}"
+                f"{stats['errors']:>7}{stats['hedged']:>8}  {distribution}  [{stats['rps'] / baseline:.1f}x]"
+            )
+
+    def _run(self, overrides, options):
+        servers = [
+            start_stub_server(**{'latency': options['latency'], 'capacity': options['capacity'], **override})
+            for override in overrides
+        ]
+        try:
+            adapter = OpenAILLMAdapter([
+                BackendConfig(base_url, 'stub', 'stub', f"stub-{i + 1}")
+                for i, (_, base_url) in enumerate(servers)
+            ])
+            latencies, errors = asyncio.run(self._drive(adapter, options))
+        finally:
+            for process, _ in servers:
+                process.terminate()
+                process.wait()
+        wall = latencies.pop()
+        return {
+            'rps': options['calls'] / wall,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'errors': errors,
+            'hedged': adapter.hedge_metrics.snapshot()['hedged'],
+            'backends': adapter.pool.snapshot(),
+        }
+
+    async def _drive(self, adapter, options):
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies, errors = [], 0
+
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await adapter.aanalyze_challenge(f"Desafio {i}", "Enunciado", "Objetivos", "Restrições", "")
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(options['calls'])))
+        # O tempo total vai no fim da lista para o chamador separar
+        return latencies + [time.perf_counter() - started], errors
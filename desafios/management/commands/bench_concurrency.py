@@ -0,0 +1,85 @@
+"""
+Benchmark de capacidade concorrente: workers sync (gunicorn) vs caminho async (ASGI)
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from desafios.services import AnalysisService
+from resolve_desafios.fake_llm_adapter import FakeLLMAdapter
+
+from ._utils import percentile, temporary_database
+
+
+class Command(BaseCommand):
+    help = "Compara a capacidade de requisições concorrentes do caminho sync e do caminho async de /analyze/"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help="Requisições simultâneas disparadas")
+        parser.add_argument('--latency', type=float, default=1.0, help="Latência simulada do LLM (s)")
+        parser.add_argument('--workers', type=int, default=3,
+                            help="Workers sync do gunicorn (resolve-desafios.service usa 3)")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        latency = options['latency']
+        workers = options['workers']
+
+        with temporary_database():
+            sync_stats = self._run_sync(total, latency, workers)
+            async_stats = self._run_async(total, latency)
+
+        self.stdout.write(f"{total} requisições, latência simulada do LLM {latency:.2f}s\n")
+        self.stdout.write(f"{'modo':<22}{'total (s)':>12}{'req/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}{'concorrência':>14}")
+        for label, stats in ((f"sync ({workers} workers)", sync_stats), ("async (1 processo)", async_stats)):
+            self.stdout.write(
+                f"{label:<22}{stats['wall']:>12.2f}{stats['rps']:>10.1f}"
+                f"{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['concurrency']:>14.1f}"
+            )
+
+    def _run_sync(self, total, latency, workers):
+        """Cada thread emula um worker sync: uma requisição por vez"""
+        service = AnalysisService(llm_adapter=FakeLLMAdapter(latency))
+
+        def handle_request(i, submitted_at):
+            try:
+                service.analyze_challenge(title=f"Sync {i}", description="Desafio de benchmark")
+                return time.perf_counter() - submitted_at
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(handle_request, i, time.perf_counter()) for i in range(total)]
+            latencies = [future.result() for future in futures]
+        return self._stats(latencies, time.perf_counter() - started, latency)
+
+    def _run_async(self, total, latency):
+        """Todas as requisições aguardam o LLM no mesmo event loop"""
+        service = AnalysisService(llm_adapter=FakeLLMAdapter(latency))
+
+        async def handle_request(i):
+            submitted_at = time.perf_counter()
+            await service.aanalyze_challenge(title=f"Async {i}", description="Desafio de benchmark")
+            return time.perf_counter() - submitted_at
+
+        async def run_all():
+            return await asyncio.gather(*(handle_request(i) for i in range(total)))
+
+        started = time.perf_counter()
+        latencies = asyncio.run(run_all())
+        return self._stats(latencies, time.perf_counter() - started, latency)
+
+    def _stats(self, latencies, wall, latency):
+        return {
+            'wall': wall,
+            'rps': len(latencies) / wall if wall else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            # Número médio de esperas pelo LLM em andamento ao mesmo tempo
+            'concurrency': len(latencies) * latency / wall if wall else 0.0,
+        }
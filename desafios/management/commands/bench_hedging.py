@@ -0,0 +1,72 @@
+"""
+Benchmark de hedging: latência de cauda de chamadas simuladas ao LLM com e sem hedge
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from resolve_desafios.hedging import Deadline, HedgeMetrics, LLMTimeoutError, run_hedged
+
+from ._utils import percentile
+
+
+class Command(BaseCommand):
+    help = "Compara p50/p95/p99 de chamadas com cauda lenta, com e sem requisição hedge"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', type=float, default=0.05, help="Latência típica simulada (s)")
+        parser.add_argument('--slow-rate', type=float, default=0.05, help="Fração de chamadas lentas")
+        parser.add_argument('--slow-factor', type=float, default=10.0, help="Quantas vezes mais lenta")
+        parser.add_argument('--deadline', type=float, default=2.0, help="Prazo por chamada (s)")
+        parser.add_argument('--warmup', type=int, default=50, help="Chamadas para estimar o p95 antes de medir")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+
+        def call():
+            latency = options['latency'] * random.uniform(0.8, 1.3)
+            if random.random() < options['slow_rate']:
+                latency *= options['slow_factor']
+            time.sleep(latency)
+            return latency
+
+        self.stdout.write(f"{'modo':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}"
+                          f"{'hedge':>8}{'vitórias':>10}{'timeouts':>10}")
+        for mode in ('direto', 'hedge'):
+            metrics = HedgeMetrics()
+            if mode == 'hedge':
+                # Em produção o p95 vem do tráfego real; aqui é estimado antes de medir
+                tracker = metrics.tracker('bench')
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                    for latency in pool.map(lambda _: call(), range(options['warmup'])):
+                        tracker.record(latency)
+            latencies = self._run(mode, call, metrics, options)
+            snapshot = metrics.snapshot()
+            self.stdout.write(
+                f"{mode:<10}{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}"
+                f"{percentile(latencies, 99) * 1000:>10.1f}{max(latencies) * 1000:>10.1f}"
+                f"{snapshot['hedge_rate']:>8.1%}{snapshot['win_rate']:>10.1%}{snapshot['timeouts']:>10}"
+            )
+
+    def _run(self, mode, call, metrics, options):
+        latencies = []
+
+        def one(_):
+            started = time.perf_counter()
+            try:
+                if mode == 'hedge':
+                    run_hedged(call, 'bench', metrics, Deadline(options['deadline']))
+                else:
+                    call()
+            except LLMTimeoutError:
+                pass
+            latencies.append(time.perf_counter() - started)
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(one, range(options['calls'])))
+        return latencies
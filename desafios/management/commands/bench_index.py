@@ -0,0 +1,69 @@
+"""
+Benchmark da página inicial: tempo até o histórico aparecer, com e sem o payload embutido
+"""
+
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from desafios.models import Analysis, Challenge
+from desafios.services import AnalysisService
+from resolve_desafios.fake_llm_adapter import FakeLLMAdapter
+
+from ._utils import temporary_database
+
+
+class Command(BaseCommand):
+    help = "Estima o time-to-interactive da página inicial (tempo de servidor + idas e voltas de rede)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rtt', type=float, default=0.3, help="Ida e volta simulada da rede móvel (s)")
+        parser.add_argument('--analyses', type=int, default=500)
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rtt = options['rtt']
+        with temporary_database():
+            self._seed(options['analyses'])
+            client = Client(HTTP_HOST='localhost')
+
+            no_slash = client.get('/analyses', {'limit': 20})
+            self.stdout.write(f"GET /analyses?limit=20 -> {no_slash.status_code} (sem redirect)\n")
+
+            # Antes: HTML sem histórico, depois fetch('/analyses?limit=20') -> 301 -> /analyses/?limit=20,
+            # com a consulta feita a cada requisição
+            before = []
+            for _ in range(options['runs']):
+                cache.clear()
+                server = self._timed(client, '/') + self._timed(client, '/analyses/', {'limit': 20})
+                before.append(server + 3 * rtt)
+
+            # Depois: o histórico vem no próprio HTML, servido do cache
+            after = [self._timed(client, '/') + rtt for _ in range(options['runs'])]
+
+        self.stdout.write(f"RTT simulado: {rtt * 1000:.0f} ms, {options['analyses']} análises\n")
+        self.stdout.write(f"{'modo':<28}{'idas e voltas':>14}{'TTI mediano (ms)':>18}")
+        self.stdout.write(f"{'antes (fetch + redirect)':<28}{3:>14}{statistics.median(before) * 1000:>18.1f}")
+        self.stdout.write(f"{'depois (embutido)':<28}{1:>14}{statistics.median(after) * 1000:>18.1f}")
+
+    def _timed(self, client, path, params=None):
+        started = time.perf_counter()
+        response = client.get(path, params or {})
+        assert response.status_code == 200, (path, response.status_code)
+        return time.perf_counter() - started
+
+    def _seed(self, count):
+        result = FakeLLMAdapter(latency=0).analyze_challenge(
+            title="Bench", description="", objectives="", constraints="", taxonomy_summary="",
+        )
+        service = AnalysisService(llm_adapter=FakeLLMAdapter(latency=0))
+        challenges = Challenge.objects.bulk_create(
+            [Challenge(title=f"Bench {i}", description="Desafio de benchmark") for i in range(count)]
+        )
+        Analysis.objects.bulk_create(
+            [Analysis(**service._analysis_fields(challenge, result)) for challenge in challenges],
+            batch_size=500,
+        )
@@ -0,0 +1,110 @@
+"""
+Benchmark de inicialização: tempo de import e memória por worker
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Executado em um processo Python limpo para medir o custo real de import
+PROBE = r'''
+import json, os, sys, time
+
+def memory():
+    """RSS e memória privada (kB) do processo atual, via /proc no Linux"""
+    stats = {}
+    for path in ('/proc/self/smaps_rollup', '/proc/self/status'):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty', 'VmRSS'):
+                        stats[key] = int(value.split()[0])
+        except OSError:
+            pass
+    if 'Rss' not in stats:
+        import resource
+        stats['Rss'] = stats.get('VmRSS') or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats['Private'] = stats.get('Private_Clean', 0) + stats.get('Private_Dirty', 0)
+    return stats
+
+mode, workers = sys.argv[1], int(sys.argv[2])
+started = time.perf_counter()
+if mode == 'lazy':
+    import django
+    django.setup()
+    import desafios.services
+else:
+    import resolve_desafios_web.wsgi
+elapsed = time.perf_counter() - started
+result = {'import_time': elapsed, 'memory': memory(), 'llm_loaded': 'langchain_openai' in sys.modules, 'workers': []}
+
+if mode == 'preload':
+    # Simula o gunicorn --preload: os workers nascem de um fork do master já aquecido
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            import desafios.services
+            desafios.services.warm_up()
+            os.write(write_fd, json.dumps(memory()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            result['workers'].append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = "Mede o tempo de import e a memória (RSS/privada) por worker na inicialização"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=3,
+                            help="Workers simulados no modo preload (resolve-desafios.service usa 3)")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+
+        rows = [
+            ("import do app (lazy)", self._probe('lazy', workers, env)),
+            ("wsgi + warm_up", self._probe('wsgi', workers, env)),
+        ]
+        preload = self._probe('preload', workers, env) if hasattr(os, 'fork') else None
+
+        self.stdout.write(f"{'cenário':<24}{'import (s)':>12}{'RSS (MB)':>10}{'privada (MB)':>14}{'LLM':>6}")
+        for label, result in rows:
+            self._write_row(label, result['import_time'], result['memory'], result['llm_loaded'])
+
+        if preload:
+            self.stdout.write(f"\ngunicorn --preload com {workers} workers:")
+            self._write_row("master", preload['import_time'], preload['memory'], preload['llm_loaded'])
+            for index, memory in enumerate(preload['workers'], start=1):
+                self._write_row(f"worker {index}", None, memory, True)
+
+    def _probe(self, mode, workers, env):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, mode, str(workers)],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def _write_row(self, label, import_time, memory, llm_loaded):
+        elapsed = f"{import_time:>12.3f}" if import_time is not None else f"{'-':>12}"
+        private = f"{memory['Private'] / 1024:>14.1f}" if memory.get('Private') else f"{'-':>14}"
+        self.stdout.write(
+            f"{label:<24}{elapsed}{memory['Rss'] / 1024:>10.1f}{private}"
+            f"{'sim' if llm_loaded else 'não':>6}"
+        )
@@ -0,0 +1,97 @@
+"""
+Benchmark de escrita no SQLite: escritas diretas concorrentes vs fila com writer único
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from desafios.models import Analysis
+from desafios.services import AnalysisService
+from desafios.write_queue import WriteQueue
+from resolve_desafios.fake_llm_adapter import FakeLLMAdapter
+
+from ._utils import percentile, temporary_database
+
+
+class Command(BaseCommand):
+    help = "Mede a vazão de escrita com 1/4/16 submissores concorrentes, com e sem a fila de escrita"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submitters', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--writes', type=int, default=50, help="Escritas por submissor")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'modo':<8}{'submissores':>12}{'escritas/s':>12}{'p95 (ms)':>10}"
+            f"{'erros':>7}{'leitura máx (ms)':>18}"
+        )
+        for submitters in options['submitters']:
+            for mode in ('direto', 'fila'):
+                with temporary_database():
+                    stats = self._run(mode, submitters, options['writes'])
+                self.stdout.write(
+                    f"{mode:<8}{submitters:>12}{stats['wps']:>12.1f}{stats['p95'] * 1000:>10.1f}"
+                    f"{stats['errors']:>7}{stats['max_read'] * 1000:>18.1f}"
+                )
+
+    def _run(self, mode, submitters, writes):
+        service = AnalysisService(llm_adapter=FakeLLMAdapter(latency=0))
+        write_queue = WriteQueue() if mode == 'fila' else None
+        latencies, errors = [], []
+        stop_reading = threading.Event()
+        read_latencies = []
+
+        def write(i):
+            result = service.llm_adapter.analyze_challenge(
+                title=f"Bench {i}", description="Desafio de benchmark",
+                objectives="", constraints="", taxonomy_summary="",
+            )
+            return service._save_analysis(f"Bench {i}", "Desafio de benchmark", None, None, result)
+
+        def submitter(worker):
+            try:
+                for n in range(writes):
+                    job = lambda i=worker * writes + n: write(i)
+                    started = time.perf_counter()
+                    try:
+                        if write_queue:
+                            write_queue.submit(job).result()
+                        else:
+                            with transaction.atomic():
+                                job()
+                    except OperationalError as e:
+                        errors.append(e)
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+
+        def reader():
+            # Leituras em paralelo às escritas: com WAL não devem esperar o writer
+            try:
+                while not stop_reading.is_set():
+                    started = time.perf_counter()
+                    Analysis.objects.order_by('-id').values_list('id', flat=True).first()
+                    read_latencies.append(time.perf_counter() - started)
+                    time.sleep(0.001)
+            finally:
+                connections.close_all()
+
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=submitters) as pool:
+            list(pool.map(submitter, range(submitters)))
+        wall = time.perf_counter() - started
+        stop_reading.set()
+        reader_thread.join()
+
+        return {
+            'wps': (len(latencies) - len(errors)) / wall if wall else 0.0,
+            'p95': percentile(latencies, 95),
+            'errors': len(errors),
+            'max_read': max(read_latencies, default=0.0),
+        }
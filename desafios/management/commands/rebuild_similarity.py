@@ -0,0 +1,15 @@
+"""
+Recalcula o grafo de desafios similares a partir das análises
+"""
+
+from django.core.management.base import BaseCommand
+
+from desafios import similarity
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero assinaturas, buckets LSH e arestas de desafios similares"
+
+    def handle(self, *args, **options):
+        edges = similarity.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{edges} arestas de similaridade recalculadas"))
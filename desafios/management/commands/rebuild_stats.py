@@ -0,0 +1,15 @@
+"""
+Recalcula os contadores de estatísticas a partir das análises
+"""
+
+from django.core.management.base import BaseCommand
+
+from desafios import stats
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero os contadores do painel de estatísticas (corrige desvios)"
+
+    def handle(self, *args, **options):
+        counters = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{counters} contadores recalculados"))
@@ -0,0 +1,123 @@
+"""
+Soak test de memória: milhares de /analyze/ contra o LLM simulado, medindo o
+crescimento do processo por requisição
+"""
+
+import copy
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+import desafios.services
+from desafios.memory_profiler import current_rss
+from resolve_desafios.fake_llm_adapter import FakeLLMAdapter
+
+from ._utils import temporary_database
+
+MB = 1024 * 1024
+
+
+def _slope(points):
+    """Inclinação (mínimos quadrados) de bytes por requisição"""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance if variance else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Repete /analyze/ (e /analyses/<id>/) milhares de vezes contra o LLM simulado e mede o "
+        "crescimento de memória por requisição (RSS e tracemalloc)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=200,
+                            help="Requisições antes da linha de base (imports, caches, pools)")
+        parser.add_argument('--report-every', type=int, default=250)
+        parser.add_argument('--challenges', type=int, default=50,
+                            help="Títulos distintos repetidos ao longo do teste")
+        parser.add_argument('--latency', type=float, default=0.0, help="Latência simulada do LLM (s)")
+        parser.add_argument('--top', type=int, default=10, help="Locais com maior crescimento exibidos")
+        parser.add_argument('--no-trace', action='store_true',
+                            help="Só RSS, sem tracemalloc (mais rápido, sem os locais de alocação)")
+
+    def handle(self, *args, **options):
+        adapter = FakeLLMAdapter(options['latency'])
+        with tempfile.TemporaryDirectory() as tmp_dir, temporary_database(), \
+                override_settings(CACHES=self._isolated_caches(tmp_dir)), \
+                mock.patch.object(desafios.services, 'get_llm_adapter', lambda: adapter):
+            self._soak(Client(HTTP_HOST='localhost'), options)
+
+    def _isolated_caches(self, tmp_dir):
+        # O cache em arquivo não pode receber análises do banco descartável
+        caches = copy.deepcopy(settings.CACHES)
+        for alias, config in caches.items():
+            if config.get('LOCATION') and 'locmem' not in config['BACKEND']:
+                config['LOCATION'] = str(Path(tmp_dir) / f"cache-{alias}.sqlite3")
+        return caches
+
+    def _request(self, client, i, challenges):
+        payload = {
+            'title': f"Soak {i % challenges}",
+            'description': "Dado um vetor de inteiros, encontre o par com soma igual ao alvo. " * 20,
+        }
+        response = client.post('/analyze/', json.dumps(payload), content_type='application/json')
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze/ respondeu {response.status_code}: {response.content[:200]!r}")
+        client.get(f"/analyses/{response.json()['id']}/")
+
+    def _soak(self, client, options):
+        total, warmup, every = options['requests'], options['warmup'], options['report_every']
+        trace = not options['no_trace']
+
+        for i in range(warmup):
+            self._request(client, i, options['challenges'])
+        gc.collect()
+        if trace:
+            tracemalloc.start()
+            baseline = tracemalloc.take_snapshot()
+        rss_start = current_rss()
+
+        self.stdout.write(f"{'requisições':>12}{'RSS (MB)':>10}{'Δ RSS (MB)':>12}{'traced (MB)':>13}{'req/s':>8}")
+        points = [(0, rss_start)]
+        started = time.perf_counter()
+        for i in range(1, total + 1):
+            self._request(client, warmup + i, options['challenges'])
+            if i % every == 0 or i == total:
+                gc.collect()
+                rss = current_rss()
+                points.append((i, rss))
+                traced = tracemalloc.get_traced_memory()[0] / MB if trace else 0.0
+                self.stdout.write(
+                    f"{i:>12}{rss / MB:>10.1f}{(rss - rss_start) / MB:>12.2f}"
+                    f"{traced:>13.2f}{i / (time.perf_counter() - started):>8.0f}"
+                )
+
+        self.stdout.write(
+            f"\nCrescimento: {_slope(points):.0f} bytes/requisição (RSS, regressão linear) | "
+            f"total {(points[-1][1] - rss_start) / MB:.2f} MB em {total} requisições"
+        )
+        if trace:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            growth = [stat for stat in snapshot.compare_to(baseline, 'lineno') if stat.size_diff > 0]
+            self.stdout.write(f"\nLocais com maior crescimento (tracemalloc, após {warmup} de aquecimento):")
+            for stat in growth[:options['top']]:
+                frame = stat.traceback[0]
+                self.stdout.write(
+                    f"  {stat.size_diff / 1024:>9.1f} KB  {stat.size_diff / total:>8.1f} B/req  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
@@ -0,0 +1,52 @@
+"""
+Copia o banco SQLite primário para as réplicas SQLite (teste local do roteamento)
+"""
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia o SQLite primário para as réplicas SQLite de DATABASE_REPLICA_URLS; com --interval "
+        "repete a cópia, simulando uma réplica com atraso"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Segundos entre cópias (0 = copia uma vez e sai)")
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replicas = {
+            alias: settings.DATABASES[alias]
+            for alias in settings.DATABASE_REPLICAS
+            if settings.DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3'
+        }
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("O primário não é SQLite; use a replicação do próprio banco")
+        if not replicas:
+            raise CommandError("Nenhuma réplica SQLite em DATABASE_REPLICA_URLS")
+
+        while True:
+            for alias, replica in replicas.items():
+                started = time.perf_counter()
+                self._copy(str(primary['NAME']), str(replica['NAME']))
+                self.stdout.write(f"{alias}: copiado em {(time.perf_counter() - started) * 1000:.0f} ms")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _copy(self, source_path: str, target_path: str) -> None:
+        # API de backup: cópia consistente mesmo com escritas em andamento
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path, timeout=20)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,245 @@
+"""
+Perfil de memória por requisição (opt-in): tracemalloc em uma amostra das
+requisições, agregado por endpoint
+"""
+
+import json
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+# Alocações do próprio tracemalloc e do import system não interessam
+_TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+# Requisições que não casam com nenhuma rota (scanners, 404) vão para um só
+# balde; acima de MAX_ENDPOINTS os novos endpoints também são agregados juntos
+UNRESOLVED_ENDPOINT = "<unresolved>"
+OTHER_ENDPOINTS = "<other>"
+
+
+def _options() -> Dict[str, Any]:
+    options = getattr(settings, 'MEMORY_PROFILING', {})
+    return {
+        'enabled': bool(options.get('ENABLED', False)),
+        'sample_rate': float(options.get('SAMPLE_RATE', 0.01)),
+        'frames': int(options.get('FRAMES', 1)),
+        'top': int(options.get('TOP', 10)),
+        'dump_dir': options.get('DUMP_DIR'),
+        'dump_every': int(options.get('DUMP_EVERY', 50)),
+        'token': options.get('TOKEN'),
+        'max_endpoints': int(options.get('MAX_ENDPOINTS', 100)),
+    }
+
+
+def current_rss() -> int:
+    """RSS atual do processo em bytes (pico do processo fora do Linux)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == 'Darwin' else maxrss * 1024
+
+
+class MemoryProfile:
+    """Agregado por endpoint das requisições amostradas deste processo.
+
+    tracemalloc só fica ligado durante a requisição amostrada, então o
+    snapshot do fim contém apenas os blocos alocados nela que continuam vivos:
+    o que a requisição deixou retido. O rastreamento é global ao processo:
+    alocações de outras threads ou corrotinas no meio da amostra (ASGI, gthread)
+    entrariam na conta. Por isso só se amostra uma requisição que está sozinha
+    no processo, e a amostra é descartada (contada em discarded) se outra
+    requisição começar antes de ela terminar. Trabalho fora de requisições
+    (fila de escrita, threads do hedging) ainda pode entrar na amostra.
+    """
+
+    def __init__(self, max_endpoints: int = 100):
+        self.max_endpoints = max_endpoints
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._sampling = False
+        self._overlapped = False
+        self.started_at = time.time()
+        self.requests = 0
+        self.discarded = 0
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def enter(self) -> None:
+        """Uma requisição começou; invalida a amostra em andamento, se houver"""
+        with self._lock:
+            self._in_flight += 1
+            if self._sampling:
+                self._overlapped = True
+
+    def leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def start(self, frames: int) -> bool:
+        """Liga o tracemalloc se nenhuma outra requisição estiver em andamento"""
+        with self._lock:
+            if self._sampling or self._in_flight > 1 or tracemalloc.is_tracing():
+                return False
+            self._sampling, self._overlapped = True, False
+        tracemalloc.start(frames)
+        return True
+
+    def stop(self, endpoint: str, rss_before: int, top: int) -> None:
+        try:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            with self._lock:
+                overlapped = self._overlapped
+                self._sampling = self._overlapped = False
+                self.discarded += overlapped
+        if overlapped:
+            return
+        rss_delta = current_rss() - rss_before
+        stats = snapshot.statistics('traceback')
+        retained = sum(stat.size for stat in stats)
+
+        with self._lock:
+            if endpoint not in self.endpoints and len(self.endpoints) >= self.max_endpoints:
+                endpoint = OTHER_ENDPOINTS
+            entry = self.endpoints.setdefault(endpoint, {
+                'sampled': 0, 'retained_bytes': 0, 'peak_bytes_max': 0,
+                'rss_delta_bytes': 0, 'rss_delta_max': 0, 'sites': Counter(),
+            })
+            entry['sampled'] += 1
+            entry['retained_bytes'] += retained
+            entry['peak_bytes_max'] = max(entry['peak_bytes_max'], peak)
+            entry['rss_delta_bytes'] += rss_delta
+            entry['rss_delta_max'] = max(entry['rss_delta_max'], rss_delta)
+            for stat in stats[:top]:
+                site = " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback)
+                entry['sites'][site] += stat.size
+
+    def count(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Médias por requisição amostrada e os locais que mais retiveram memória"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, entry in sorted(self.endpoints.items(), key=lambda item: -item[1]['retained_bytes']):
+                sampled = entry['sampled']
+                endpoints[endpoint] = {
+                    'sampled': sampled,
+                    'retained_bytes_avg': entry['retained_bytes'] // sampled,
+                    'peak_bytes_max': entry['peak_bytes_max'],
+                    'rss_delta_bytes_avg': entry['rss_delta_bytes'] // sampled,
+                    'rss_delta_bytes_max': entry['rss_delta_max'],
+                    'top_sites': [
+                        {'site': site, 'retained_bytes_avg': size // sampled}
+                        for site, size in entry['sites'].most_common(top)
+                    ],
+                }
+            return {
+                'pid': os.getpid(),
+                'uptime': round(time.time() - self.started_at, 1),
+                'requests': self.requests,
+                'discarded': self.discarded,
+                'rss_bytes': current_rss(),
+                'endpoints': endpoints,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+            self.requests = 0
+            self.discarded = 0
+            self.started_at = time.time()
+
+    def dump(self, directory: str, top: int) -> Path:
+        """Grava o relatório deste worker em <directory>/memory-<pid>.json"""
+        path = Path(directory) / f"memory-{os.getpid()}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.report(top), indent=2))
+        tmp_path.replace(path)
+        return path
+
+
+# Cada worker do gunicorn tem o seu (o estado não sobrevive ao fork do master)
+profile = MemoryProfile()
+
+
+def _endpoint(request) -> str:
+    # Nunca o path cru: cada URL inexistente viraria uma entrada nova
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_ENDPOINT
+    return f"{request.method} /{match.route}"
+
+
+def _before(options) -> Optional[int]:
+    """RSS inicial se esta requisição for amostrada, senão None"""
+    if not options['enabled']:
+        return None
+    profile.enter()
+    if random.random() >= options['sample_rate'] or not profile.start(options['frames']):
+        return None
+    return current_rss()
+
+
+def _after(request, options, rss_before: Optional[int]) -> None:
+    if not options['enabled']:
+        return
+    try:
+        requests = profile.count()
+        if rss_before is not None:
+            profile.max_endpoints = options['max_endpoints']
+            profile.stop(_endpoint(request), rss_before, options['top'])
+    finally:
+        profile.leave()
+    if options['dump_dir'] and requests % options['dump_every'] == 0:
+        profile.dump(options['dump_dir'], options['top'])
+
+
+@sync_and_async_middleware
+def memory_profiling_middleware(get_response):
+    """Amostra SAMPLE_RATE das requisições com tracemalloc quando MEMORY_PROFILING['ENABLED']"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            options = _options()
+            rss_before = _before(options)
+            try:
+                return await get_response(request)
+            finally:
+                _after(request, options, rss_before)
+    else:
+        def middleware(request):
+            options = _options()
+            rss_before = _before(options)
+            try:
+                return get_response(request)
+            finally:
+                _after(request, options, rss_before)
+    return middleware
+
+
+def is_authorized(request) -> bool:
+    """/debug/memory/ exige MEMORY_PROFILING['TOKEN'] no header X-Debug-Token"""
+    token = _options()['token']
+    return bool(token) and request.headers.get('X-Debug-Token') == token
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0002_analysis_recommended_solution'),
+    ]
+
+    operations = [
+        # Análises existentes foram geradas de uma só vez e já estão completas
+        migrations.AddField(
+            model_name='analysis',
+            name='stage',
+            field=models.CharField(choices=[('CLASSIFICADA', 'Classificada'), ('COMPLETA', 'Completa')], default='COMPLETA', max_length=12, verbose_name='Etapa'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='analysis',
+            name='stage',
+            field=models.CharField(choices=[('CLASSIFICADA', 'Classificada'), ('COMPLETA', 'Completa')], default='CLASSIFICADA', max_length=12, verbose_name='Etapa'),
+        ),
+    ]
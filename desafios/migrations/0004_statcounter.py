@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0003_analysis_stage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('day', 'Dia'), ('difficulty', 'Dificuldade'), ('category', 'Categoria'), ('approach', 'Abordagem Recomendada')], max_length=20, verbose_name='Dimensão')),
+                ('key', models.CharField(max_length=200, verbose_name='Chave')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+            ],
+            options={
+                'verbose_name': 'Contador de Estatística',
+                'verbose_name_plural': 'Contadores de Estatísticas',
+                'indexes': [models.Index(fields=['dimension', '-count'], name='statcounter_top')],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key'), name='statcounter_dimension_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0004_statcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('features', models.JSONField(default=dict, verbose_name='Features')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('analysis', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='desafios.analysis', verbose_name='Análise')),
+                ('challenge', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='signature', to='desafios.challenge', verbose_name='Desafio')),
+            ],
+            options={
+                'verbose_name': 'Assinatura de Desafio',
+                'verbose_name_plural': 'Assinaturas de Desafios',
+            },
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band_key', models.CharField(max_length=40, verbose_name='Banda')),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='desafios.challenge', verbose_name='Desafio')),
+            ],
+            options={
+                'verbose_name': 'Bucket LSH',
+                'verbose_name_plural': 'Buckets LSH',
+                'constraints': [models.UniqueConstraint(fields=('band_key', 'challenge'), name='lshbucket_band_challenge')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarChallenge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Similaridade')),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_edges', to='desafios.challenge', verbose_name='Desafio')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='desafios.challenge', verbose_name='Desafio Similar')),
+                ('similar_analysis', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='desafios.analysis', verbose_name='Análise do Similar')),
+            ],
+            options={
+                'verbose_name': 'Desafio Similar',
+                'verbose_name_plural': 'Desafios Similares',
+                'indexes': [models.Index(fields=['challenge', '-score'], name='similarchallenge_top')],
+                'constraints': [models.UniqueConstraint(fields=('challenge', 'similar'), name='similarchallenge_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:35
+
+from django.db import migrations, models
+
+# Índices de texto da busca do admin (desafios.fulltext): FTS5 no SQLite,
+# GIN sobre to_tsvector no PostgreSQL; outros bancos usam icontains.
+FULLTEXT_TABLES = {
+    'desafios_analysis': ('title', 'summary'),
+    'desafios_challenge': ('title', 'description'),
+}
+
+
+def create_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, (first, second) in FULLTEXT_TABLES.items():
+        if vendor == 'sqlite':
+            fts = f'{table}_fts'
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({first}, {second}, content='{table}', "
+                f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {first}, {second}) VALUES (new.id, new.{first}, new.{second}); END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {first}, {second}) "
+                f"VALUES ('delete', old.id, old.{first}, old.{second}); END"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {first}, {second} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {first}, {second}) "
+                f"VALUES ('delete', old.id, old.{first}, old.{second}); "
+                f"INSERT INTO {fts}(rowid, {first}, {second}) VALUES (new.id, new.{first}, new.{second}); END"
+            )
+            schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        elif vendor == 'postgresql':
+            schema_editor.execute(
+                f"CREATE INDEX {table}_fts ON {table} USING GIN "
+                f"(to_tsvector('portuguese', coalesce({first}, '') || ' ' || coalesce({second}, '')))"
+            )
+
+
+def drop_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in FULLTEXT_TABLES:
+        if vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        elif vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0005_similarity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['-created_at'], name='analysis_created'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['difficulty', '-created_at'], name='analysis_difficulty_created'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['model', '-created_at'], name='analysis_model_created'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['stage', '-created_at'], name='analysis_stage_created'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['-created_at'], name='challenge_created'),
+        ),
+        migrations.RunPython(create_fulltext, drop_fulltext),
+    ]
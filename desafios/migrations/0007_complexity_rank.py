@@ -0,0 +1,50 @@
+# Generated by Django 5.1.15 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0006_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysis',
+            name='best_approach_time_rank',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Posto da Abordagem Mais Rápida'),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='space_class',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Classe de Espaço'),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='space_rank',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Posto (Espaço)'),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='time_class',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Classe de Tempo'),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='time_rank',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Posto (Tempo)'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['time_rank', '-created_at'], name='analysis_time_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['space_rank', '-created_at'], name='analysis_space_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['best_approach_time_rank', '-created_at'], name='analysis_approach_time_rank'),
+        ),
+    ]
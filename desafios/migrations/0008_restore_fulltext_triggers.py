@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# No SQLite o AddField da 0007 recria desafios_analysis (copia e renomeia a
+# tabela), o que apaga os gatilhos que mantêm o índice FTS5 da 0006: análises
+# novas ficavam fora da busca. Recria os gatilhos e reconstrói o índice.
+# Vale para qualquer migração futura que reconstrua essas tabelas no SQLite.
+# O índice GIN do PostgreSQL não depende de gatilhos.
+FULLTEXT_TABLES = {
+    'desafios_analysis': ('title', 'summary'),
+    'desafios_challenge': ('title', 'description'),
+}
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, (first, second) in FULLTEXT_TABLES.items():
+        fts = f'{table}_fts'
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {first}, {second}) VALUES (new.id, new.{first}, new.{second}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {first}, {second}) "
+            f"VALUES ('delete', old.id, old.{first}, old.{second}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {first}, {second} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {first}, {second}) "
+            f"VALUES ('delete', old.id, old.{first}, old.{second}); "
+            f"INSERT INTO {fts}(rowid, {first}, {second}) VALUES (new.id, new.{first}, new.{second}); END"
+        )
+        # Inclui as linhas gravadas enquanto os gatilhos não existiam
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0007_complexity_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
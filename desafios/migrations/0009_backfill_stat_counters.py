@@ -0,0 +1,50 @@
+import json
+from collections import Counter
+
+from django.db import migrations
+from django.utils import timezone
+
+# A 0004 criou StatCounter vazio: instalações com análises anteriores abriam
+# o painel zerado até alguém rodar rebuild_stats. Mesmas dimensões de
+# desafios.stats.analysis_dimensions, sobre os modelos históricos.
+
+
+def _categories(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value or []
+
+
+def backfill_counters(apps, schema_editor):
+    Analysis = apps.get_model('desafios', 'Analysis')
+    StatCounter = apps.get_model('desafios', 'StatCounter')
+    if StatCounter.objects.exists():
+        return
+    totals = Counter()
+    fields = ('created_at', 'difficulty', 'categories', 'recommended_approach')
+    for analysis in Analysis.objects.only(*fields).iterator(chunk_size=2000):
+        totals['day', timezone.localdate(analysis.created_at).isoformat()] += 1
+        totals['difficulty', analysis.difficulty] += 1
+        for category in {str(c).strip() for c in _categories(analysis.categories)}:
+            if category:
+                totals['category', category[:200]] += 1
+        if analysis.recommended_approach:
+            totals['approach', analysis.recommended_approach.strip()[:200]] += 1
+    StatCounter.objects.bulk_create(
+        [StatCounter(dimension=dimension, key=key, count=count) for (dimension, key), count in totals.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0008_restore_fulltext_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
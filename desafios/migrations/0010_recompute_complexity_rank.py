@@ -0,0 +1,40 @@
+from django.db import migrations
+
+from desafios import complexity
+
+
+# O posto passou a codificar expoentes negativos de log (O(n²/log n) < O(n²)):
+# os postos gravados pela 0007/backfill_complexity ficam na escala antiga e
+# precisam ser recalculados, ou os filtros de /analyses/ comparariam escalas
+# diferentes. Usa o parser atual; rodar backfill_complexity tem o mesmo efeito.
+def recompute_ranks(apps, schema_editor):
+    Analysis = apps.get_model('desafios', 'Analysis')
+    fields = list(complexity.analysis_fields('', '', []))
+    batch_size = 2000
+    last_id = 0
+    while True:
+        batch = list(
+            Analysis.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'complexity_time', 'complexity_space', 'approaches', *fields)[:batch_size]
+        )
+        if not batch:
+            return
+        for analysis in batch:
+            approaches = analysis.approaches if isinstance(analysis.approaches, list) else []
+            for name, value in complexity.analysis_fields(
+                analysis.complexity_time, analysis.complexity_space, approaches
+            ).items():
+                setattr(analysis, name, value)
+        Analysis.objects.bulk_update(batch, fields)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('desafios', '0009_backfill_stat_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_ranks, migrations.RunPython.noop),
+    ]
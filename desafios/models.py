@@ -27,6 +27,9 @@ class Challenge(models.Model):
         verbose_name = "Desafio"
         verbose_name_plural = "Desafios"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='challenge_created'),
+        ]
     
     def __str__(self):
         return self.title
@@ -41,6 +44,14 @@ class Analysis(models.Model):
         ('DIFICIL', 'Difícil'),
     ]
     
+    # Etapas da geração: a classificação é imediata, a solução é gerada sob demanda
+    STAGE_CLASSIFIED = 'CLASSIFICADA'
+    STAGE_COMPLETE = 'COMPLETA'
+    STAGE_CHOICES = [
+        (STAGE_CLASSIFIED, 'Classificada'),
+        (STAGE_COMPLETE, 'Completa'),
+    ]
+    
     challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='analyses', verbose_name="Desafio")
     title = models.CharField(max_length=200, verbose_name="Título")
     summary = models.TextField(verbose_name="Resumo")
@@ -51,20 +62,46 @@ class Analysis(models.Model):
     recommended_solution = models.TextField(default="Solução não disponível", verbose_name="Solução Recomendada")
     complexity_time = models.CharField(max_length=50, verbose_name="Complexidade de Tempo")
     complexity_space = models.CharField(max_length=50, verbose_name="Complexidade de Espaço")
+    # Derivados dos textos acima por desafios.complexity (posto ordenável, None se não reconhecido)
+    time_rank = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Posto (Tempo)")
+    time_class = models.CharField(max_length=100, blank=True, default='', editable=False,
+                                  verbose_name="Classe de Tempo")
+    space_rank = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Posto (Espaço)")
+    space_class = models.CharField(max_length=100, blank=True, default='', editable=False,
+                                   verbose_name="Classe de Espaço")
+    best_approach_time_rank = models.BigIntegerField(null=True, blank=True, editable=False,
+                                                     verbose_name="Posto da Abordagem Mais Rápida")
     assumptions = models.TextField(blank=True, null=True, verbose_name="Suposições")
     references = models.TextField(blank=True, null=True, verbose_name="Referências")
     model = models.CharField(max_length=100, default='gpt-4o-mini', verbose_name="Modelo")
     raw_data = models.JSONField(default=dict, verbose_name="Dados Brutos")
+    stage = models.CharField(max_length=12, choices=STAGE_CHOICES, default=STAGE_CLASSIFIED, verbose_name="Etapa")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     
     class Meta:
         verbose_name = "Análise"
         verbose_name_plural = "Análises"
         ordering = ['-created_at']
+        # Ordenação e filtros do admin (e das listagens) sem varrer a tabela
+        indexes = [
+            models.Index(fields=['-created_at'], name='analysis_created'),
+            models.Index(fields=['difficulty', '-created_at'], name='analysis_difficulty_created'),
+            models.Index(fields=['model', '-created_at'], name='analysis_model_created'),
+            models.Index(fields=['stage', '-created_at'], name='analysis_stage_created'),
+            # Filtros e ordenação por complexidade (/analyses/?max_time=...&order=time)
+            models.Index(fields=['time_rank', '-created_at'], name='analysis_time_rank'),
+            models.Index(fields=['space_rank', '-created_at'], name='analysis_space_rank'),
+            models.Index(fields=['best_approach_time_rank', '-created_at'], name='analysis_approach_time_rank'),
+        ]
     
     def __str__(self):
         return f"Análise: {self.title}"
     
+    @property
+    def is_complete(self):
+        """Indica se a solução e as referências já foram geradas"""
+        return self.stage == self.STAGE_COMPLETE
+    
     def get_difficulty_display_color(self):
         """Retorna a cor CSS para a dificuldade"""
         colors = {
@@ -90,4 +127,91 @@ class Analysis(models.Model):
                 return json.loads(self.categories)
             except:
                 return []
-        return self.categories or []
\ No newline at end of file
+        return self.categories or []
+
+
+class StatCounter(models.Model):
+    """Contador agregado de análises, mantido incrementalmente (ver desafios.stats)"""
+    
+    DIMENSION_DAY = 'day'
+    DIMENSION_DIFFICULTY = 'difficulty'
+    DIMENSION_CATEGORY = 'category'
+    DIMENSION_APPROACH = 'approach'
+    DIMENSION_CHOICES = [
+        (DIMENSION_DAY, 'Dia'),
+        (DIMENSION_DIFFICULTY, 'Dificuldade'),
+        (DIMENSION_CATEGORY, 'Categoria'),
+        (DIMENSION_APPROACH, 'Abordagem Recomendada'),
+    ]
+    
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES, verbose_name="Dimensão")
+    key = models.CharField(max_length=200, verbose_name="Chave")
+    count = models.IntegerField(default=0, verbose_name="Quantidade")
+    
+    class Meta:
+        verbose_name = "Contador de Estatística"
+        verbose_name_plural = "Contadores de Estatísticas"
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='statcounter_dimension_key'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', '-count'], name='statcounter_top'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}:{self.key} = {self.count}"
+
+
+class ChallengeSignature(models.Model):
+    """Features e assinatura MinHash de um desafio (ver desafios.similarity)"""
+    
+    challenge = models.OneToOneField(Challenge, on_delete=models.CASCADE, related_name='signature', verbose_name="Desafio")
+    analysis = models.ForeignKey(Analysis, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name="Análise")
+    features = models.JSONField(default=dict, verbose_name="Features")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Assinatura de Desafio"
+        verbose_name_plural = "Assinaturas de Desafios"
+    
+    def __str__(self):
+        return f"Assinatura: {self.challenge_id}"
+
+
+class LSHBucket(models.Model):
+    """Banda LSH de um desafio: desafios que compartilham uma banda são candidatos"""
+    
+    band_key = models.CharField(max_length=40, verbose_name="Banda")
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='lsh_buckets', verbose_name="Desafio")
+    
+    class Meta:
+        verbose_name = "Bucket LSH"
+        verbose_name_plural = "Buckets LSH"
+        constraints = [
+            models.UniqueConstraint(fields=['band_key', 'challenge'], name='lshbucket_band_challenge'),
+        ]
+    
+    def __str__(self):
+        return f"{self.band_key} -> {self.challenge_id}"
+
+
+class SimilarChallenge(models.Model):
+    """Aresta pré-calculada do grafo de desafios similares"""
+    
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='similar_edges', verbose_name="Desafio")
+    similar = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='+', verbose_name="Desafio Similar")
+    similar_analysis = models.ForeignKey(Analysis, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name="Análise do Similar")
+    score = models.FloatField(verbose_name="Similaridade")
+    
+    class Meta:
+        verbose_name = "Desafio Similar"
+        verbose_name_plural = "Desafios Similares"
+        constraints = [
+            models.UniqueConstraint(fields=['challenge', 'similar'], name='similarchallenge_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['challenge', '-score'], name='similarchallenge_top'),
+        ]
+    
+    def __str__(self):
+        return f"{self.challenge_id} ~ {self.similar_id} ({self.score:.2f})"
@@ -2,41 +2,178 @@
 Serviços Django para análise de desafios - Arquitetura MTV
 """
 
-import sys
-from pathlib import Path
-from typing import Dict, Any, List
+import json
+import os
+from typing import Dict, Any, AsyncIterator, Iterator, List
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
 
-# Adiciona o diretório src ao path para importar os módulos
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from resolve_desafios.llm_adapter import OpenAILLMAdapter
+from resolve_desafios.llm_adapter import OpenAILLMAdapter, import_llm_stack
 from resolve_desafios.taxonomy_adapter import FileTaxonomyAdapter
+from . import complexity
+from .circuit_breaker import CircuitOpenError, llm_breaker
 from .models import Challenge, Analysis
+from .write_queue import arun_write, run_write
+
+
+# Adapters compartilhados por processo. O PID evita reaproveitar, depois do
+# fork do gunicorn, um cliente HTTP criado no processo master.
+_llm_adapter = None
+_llm_adapter_pid = None
+_taxonomy_adapter = FileTaxonomyAdapter()
+
+
+def get_llm_adapter() -> OpenAILLMAdapter:
+    """Retorna o adapter do LLM do processo atual, criando-o na primeira chamada"""
+    global _llm_adapter, _llm_adapter_pid
+    if _llm_adapter is None or _llm_adapter_pid != os.getpid():
+        _llm_adapter = OpenAILLMAdapter()
+        _llm_adapter_pid = os.getpid()
+    return _llm_adapter
+
+
+def llm_metrics() -> Dict[str, Any]:
+    """Métricas do adapter do LLM deste processo (None se ainda não foi criado)"""
+    if _llm_adapter is None or _llm_adapter_pid != os.getpid():
+        return None
+    return {
+        'hedging': _llm_adapter.hedge_metrics.snapshot(),
+        'structured_output': dict(_llm_adapter.output_stats),
+        'prompt_budget': dict(_llm_adapter.prompt_stats),
+        'backends': _llm_adapter.pool.snapshot(),
+    }
+
+
+def get_taxonomy_adapter() -> FileTaxonomyAdapter:
+    """Retorna o adapter de taxonomia compartilhado (carregado uma vez por processo)"""
+    return _taxonomy_adapter
+
+
+# Colunas exportadas por /analyses/export/ (raw_data fica de fora)
+EXPORT_FIELDS = [
+    'id', 'challenge_id', 'challenge__title', 'title', 'difficulty', 'categories', 'summary',
+    'approaches', 'recommended_approach', 'recommended_solution', 'complexity_time',
+    'complexity_space', 'assumptions', 'references', 'model', 'stage', 'created_at',
+]
+# Linhas lidas do banco por vez durante a exportação
+EXPORT_CHUNK_ROWS = 2000
+
+
+# Filtros de /analyses/ por complexidade (?max_time=O(n log n)) -> lookup no posto indexado
+COMPLEXITY_FILTERS = {
+    'max_time': 'time_rank__lte',
+    'min_time': 'time_rank__gte',
+    'max_space': 'space_rank__lte',
+    'min_space': 'space_rank__gte',
+    'max_approach_time': 'best_approach_time_rank__lte',
+}
+# ?order=: cada ordem segue um índice (posto, -created_at); a inversa o percorre de trás
+# para frente, por isso o desempate também se inverte
+COMPLEXITY_ORDERINGS = {
+    'time': ('time_rank', '-created_at'),
+    '-time': ('-time_rank', 'created_at'),
+    'space': ('space_rank', '-created_at'),
+    '-space': ('-space_rank', 'created_at'),
+    'approach_time': ('best_approach_time_rank', '-created_at'),
+}
+
+
+# Histórico da página inicial: embutido no HTML e servido por /analyses/
+RECENT_ANALYSES_CACHE_KEY = "analyses:recent"
+RECENT_ANALYSES_LIMIT = 20
+
+
+def analysis_cache_key(analysis_id: int) -> str:
+    """Chave de cache de uma análise completa (invalidada por signals ao editar ou apagar)"""
+    return f"analysis:{analysis_id}"
+
+
+def warm_up() -> None:
+    """Carrega a pilha do LLM e a taxonomia antes do fork dos workers (gunicorn --preload)"""
+    import_llm_stack()
+    _taxonomy_adapter.canonical_terms()
+
+    from . import suggest
+    suggest.warm_up()
 
 
 class AnalysisService:
     """Serviço Django para análise de desafios"""
     
-    def __init__(self):
-        self.llm_adapter = OpenAILLMAdapter()
-        self.taxonomy_adapter = FileTaxonomyAdapter()
+    def __init__(self, llm_adapter=None, taxonomy_adapter=None):
+        self._llm_adapter = llm_adapter
+        self.taxonomy_adapter = taxonomy_adapter or _taxonomy_adapter
+    
+    @property
+    def llm_adapter(self):
+        # Criado sob demanda: listagens e buscas não precisam do LLM
+        if self._llm_adapter is None:
+            self._llm_adapter = get_llm_adapter()
+        return self._llm_adapter
     
     def analyze_challenge(self, title: str, description: str, objectives: str = None, 
-                         constraints: str = None, language: str = 'pt-BR') -> Analysis:
+                         constraints: str = None, language: str = 'pt-BR', deadline=None) -> Analysis:
         """Analisa um desafio e retorna um objeto Analysis"""
         
         # Carregar taxonomia
         taxonomy_summary = self.taxonomy_adapter.summarize_taxonomy_for_prompt()
         
-        # Analisar com LLM
-        result = self.llm_adapter.analyze_challenge(
-            title=title,
-            description=description,
-            objectives=objectives or "",
-            constraints=constraints or "",
-            taxonomy_summary=taxonomy_summary
+        # Analisar com LLM (com o circuito aberto, serve a última análise do desafio)
+        try:
+            result = llm_breaker.call(lambda: self.llm_adapter.analyze_challenge(
+                title=title,
+                description=description,
+                objectives=objectives or "",
+                constraints=constraints or "",
+                taxonomy_summary=taxonomy_summary,
+                deadline=deadline,
+            ))
+        except CircuitOpenError as e:
+            return self._degraded_analysis(title, e)
+        
+        return run_write(lambda: self._save_analysis(title, description, objectives, constraints, result))
+    
+    async def aanalyze_challenge(self, title: str, description: str, objectives: str = None,
+                                 constraints: str = None, language: str = 'pt-BR', deadline=None) -> Analysis:
+        """Versão assíncrona de analyze_challenge para servidores ASGI"""
+        
+        taxonomy_summary = self.taxonomy_adapter.summarize_taxonomy_for_prompt()
+        
+        # A espera pelo LLM não ocupa nenhuma thread
+        try:
+            result = await llm_breaker.acall(lambda: self.llm_adapter.aanalyze_challenge(
+                title=title,
+                description=description,
+                objectives=objectives or "",
+                constraints=constraints or "",
+                taxonomy_summary=taxonomy_summary,
+                deadline=deadline,
+            ))
+        except CircuitOpenError as e:
+            return await sync_to_async(self._degraded_analysis)(title, e)
+        
+        return await arun_write(lambda: self._save_analysis(title, description, objectives, constraints, result))
+    
+    def _degraded_analysis(self, title: str, error: CircuitOpenError) -> Analysis:
+        """Análise anterior mais recente do mesmo desafio, marcada como degradada.
+        
+        Sem nenhuma análise anterior, repassa o CircuitOpenError (falha rápida).
+        """
+        analysis = (
+            Analysis.objects.filter(challenge__title=title).order_by('-created_at').first()
+            or Analysis.objects.filter(challenge__title__iexact=(title or '').strip()).order_by('-created_at').first()
         )
+        if analysis is None:
+            raise error
+        analysis.degraded = True
+        return analysis
+    
+    def _save_analysis(self, title: str, description: str, objectives: str,
+                       constraints: str, result: Dict[str, Any]) -> Analysis:
+        """Persiste o desafio e a análise (executado pela fila de escrita)"""
         
         # Criar ou buscar desafio
         challenge, created = Challenge.objects.get_or_create(
@@ -48,45 +185,204 @@ class AnalysisService:
             }
         )
         
-        # Criar análise
-        analysis = Analysis.objects.create(
-            challenge=challenge,
-            title=result['title'],
-            difficulty=result['difficulty'],
-            categories=result['categories'],
-            summary=result['summary'],
-            approaches=result['approaches'],
-            recommended_approach=result['recommended_approach'],
-            recommended_solution=result['recommended_solution'],
-            complexity_time=result['complexity_time'],
-            complexity_space=result['complexity_space'],
-            assumptions=result['assumptions'],
-            references=result['references'],
-            model="gpt-4o-mini",  # TODO: Get from settings
-            raw_data=result
-        )
+        # Criar análise (a solução é gerada sob demanda por ensure_solution)
+        return Analysis.objects.create(**self._analysis_fields(challenge, result))
+    
+    def _analysis_fields(self, challenge: Challenge, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta os campos de Analysis a partir do resultado do LLM"""
+        return {
+            'challenge': challenge,
+            'title': result['title'],
+            'difficulty': result['difficulty'],
+            'categories': result['categories'],
+            'summary': result['summary'],
+            'approaches': result['approaches'],
+            'recommended_approach': result['recommended_approach'],
+            'complexity_time': result['complexity_time'],
+            'complexity_space': result['complexity_space'],
+            'assumptions': result['assumptions'],
+            # Backend do pool que respondeu; sem ele fica o padrão do campo
+            'model': result.get('model') or Analysis._meta.get_field('model').get_default(),
+            'raw_data': result,
+            'stage': Analysis.STAGE_CLASSIFIED,
+        }
+    
+    def ensure_solution(self, analysis: Analysis, deadline=None) -> Analysis:
+        """Gera e persiste a solução e as referências na primeira vez em que são pedidas"""
+        if analysis.is_complete:
+            return analysis
+        
+        challenge = analysis.challenge
+        solution = llm_breaker.call(lambda: self.llm_adapter.generate_solution(
+            title=challenge.title,
+            description=challenge.description,
+            objectives=challenge.objectives or "",
+            constraints=challenge.constraints or "",
+            classification=analysis.raw_data,
+            deadline=deadline,
+        ))
         
+        # Só grava se ninguém completou a análise enquanto o LLM respondia
+        fields = self._solution_fields(analysis, solution)
+        run_write(lambda: Analysis.objects.filter(id=analysis.id, stage=Analysis.STAGE_CLASSIFIED).update(**fields))
+        analysis.refresh_from_db(using=DEFAULT_DB_ALIAS)
+        cache.set(analysis_cache_key(analysis.id), analysis)
         return analysis
     
+    async def aensure_solution(self, analysis: Analysis, deadline=None) -> Analysis:
+        """Versão assíncrona de ensure_solution para servidores ASGI"""
+        if analysis.is_complete:
+            return analysis
+        
+        challenge = await Challenge.objects.aget(id=analysis.challenge_id)
+        solution = await llm_breaker.acall(lambda: self.llm_adapter.agenerate_solution(
+            title=challenge.title,
+            description=challenge.description,
+            objectives=challenge.objectives or "",
+            constraints=challenge.constraints or "",
+            classification=analysis.raw_data,
+            deadline=deadline,
+        ))
+        
+        fields = self._solution_fields(analysis, solution)
+        await arun_write(lambda: Analysis.objects.filter(id=analysis.id, stage=Analysis.STAGE_CLASSIFIED).update(**fields))
+        await analysis.arefresh_from_db(using=DEFAULT_DB_ALIAS)
+        await cache.aset(analysis_cache_key(analysis.id), analysis)
+        return analysis
+    
+    def _solution_fields(self, analysis: Analysis, solution: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta os campos atualizados pela etapa de solução"""
+        return {
+            'recommended_solution': solution['recommended_solution'],
+            'references': solution['references'],
+            'raw_data': {**analysis.raw_data, **solution},
+            'stage': Analysis.STAGE_COMPLETE,
+        }
+    
     def get_analysis(self, analysis_id: int) -> Analysis:
-        """Obtém uma análise por ID"""
+        """Obtém uma análise por ID (análises completas vêm do cache)"""
+        analysis = cache.get(analysis_cache_key(analysis_id))
+        if analysis is not None:
+            return analysis
         try:
-            return Analysis.objects.get(id=analysis_id)
+            analysis = Analysis.objects.get(id=analysis_id)
         except Analysis.DoesNotExist:
             return None
+        if analysis.is_complete:
+            cache.set(analysis_cache_key(analysis_id), analysis)
+        return analysis
+    
+    async def aget_analysis(self, analysis_id: int) -> Analysis:
+        """Versão assíncrona de get_analysis"""
+        analysis = await cache.aget(analysis_cache_key(analysis_id))
+        if analysis is not None:
+            return analysis
+        try:
+            analysis = await Analysis.objects.aget(id=analysis_id)
+        except Analysis.DoesNotExist:
+            return None
+        if analysis.is_complete:
+            await cache.aset(analysis_cache_key(analysis_id), analysis)
+        return analysis
     
     def list_analyses(self, limit: int = 10) -> List[Analysis]:
         """Lista análises recentes"""
         return Analysis.objects.select_related('challenge').order_by('-created_at')[:limit]
     
+    def recent_analyses(self, limit: int = RECENT_ANALYSES_LIMIT) -> List[Dict[str, Any]]:
+        """Resumo das análises recentes (payload do histórico), em cache até a próxima gravação"""
+        if limit > RECENT_ANALYSES_LIMIT:
+            return [self._history_item(analysis) for analysis in self.list_analyses(limit)]
+        items = cache.get(RECENT_ANALYSES_CACHE_KEY)
+        if items is None:
+            items = [self._history_item(analysis) for analysis in self.list_analyses(RECENT_ANALYSES_LIMIT)]
+            cache.set(RECENT_ANALYSES_CACHE_KEY, items)
+        return items[:max(limit, 0)]
+    
+    def _history_item(self, analysis: Analysis) -> Dict[str, Any]:
+        """Serializa uma análise para a lista do histórico"""
+        return {
+            'id': analysis.id,
+            'challenge_id': analysis.challenge_id,
+            'title': analysis.title,
+            'difficulty': analysis.get_difficulty_display(),
+            'categories': analysis.get_categories_list(),
+            'summary': analysis.summary,
+            'complexity_time': analysis.complexity_time,
+            'complexity_space': analysis.complexity_space,
+            'time_class': analysis.time_class,
+            'space_class': analysis.space_class,
+            'created_at': analysis.created_at.isoformat(),
+        }
+    
+    def analyses_by_complexity(self, filters: Dict[str, str], order: str = None,
+                               limit: int = RECENT_ANALYSES_LIMIT, term: str = None) -> List[Dict[str, Any]]:
+        """Histórico filtrado/ordenado pelos postos de complexidade (ComplexityError se o texto for inválido)"""
+        analyses = Analysis.objects.only(
+            'id', 'challenge_id', 'title', 'difficulty', 'categories', 'summary', 'complexity_time',
+            'complexity_space', 'time_class', 'space_class', 'created_at',
+        )
+        if term:
+            analyses = analyses.filter(self.history_term_filter(term))
+        analyses = self.filter_by_complexity(analyses, filters, order, default_order='-created_at')
+        return [self._history_item(analysis) for analysis in analyses[:max(limit, 0)]]
+    
+    def history_term_filter(self, term: str) -> Q:
+        """Termo da busca do histórico: título, categoria, abordagem (técnica) ou algoritmo"""
+        # O JSONField do SQLite grava acentos como \uXXXX; o jsonb do PostgreSQL não
+        matches = Q()
+        for text in {term, json.dumps(term)[1:-1]}:
+            matches |= (
+                Q(title__icontains=text) | Q(categories__icontains=text) |
+                Q(recommended_approach__icontains=text) | Q(approaches__icontains=text)
+            )
+        return matches
+    
+    def filter_by_complexity(self, analyses, filters: Dict[str, str] = None, order: str = None,
+                             default_order: str = 'id'):
+        """Aplica os filtros de COMPLEXITY_FILTERS e a ordem de COMPLEXITY_ORDERINGS a um queryset"""
+        if order is not None and order not in COMPLEXITY_ORDERINGS:
+            raise ValueError(f"Ordem inválida: {order}. Use {', '.join(COMPLEXITY_ORDERINGS)}")
+        for param, value in (filters or {}).items():
+            analyses = analyses.filter(**{COMPLEXITY_FILTERS[param]: complexity.parse(value).rank})
+        if not order:
+            return analyses.order_by(default_order)
+        ordering = COMPLEXITY_ORDERINGS[order]
+        # Sem posto (texto não reconhecido) a análise não tem lugar na ordem
+        return analyses.filter(**{f"{ordering[0].lstrip('-')}__isnull": False}).order_by(*ordering)
+    
     def get_analyses_by_challenge(self, challenge_id: int) -> List[Analysis]:
         """Obtém análises por desafio"""
         return Analysis.objects.filter(challenge_id=challenge_id).order_by('-created_at')
     
     def search_analyses(self, query: str) -> List[Analysis]:
         """Busca análises por título ou resumo"""
-        from django.db import models
-        return Analysis.objects.filter(
-            models.Q(challenge__title__icontains=query) | 
-            models.Q(summary__icontains=query)
-        ).order_by('-created_at')
+        return self.filter_analyses(query).order_by('-created_at')
+    
+    def filter_analyses(self, query: str = None):
+        """Queryset de análises com os filtros aceitos por busca e exportação"""
+        analyses = Analysis.objects.all()
+        if query:
+            analyses = analyses.filter(
+                Q(challenge__title__icontains=query) |
+                Q(summary__icontains=query)
+            )
+        return analyses
+    
+    def export_rows(self, query: str = None, limit: int = None, filters: Dict[str, str] = None,
+                    order: str = None) -> Iterator[Dict[str, Any]]:
+        """Itera as análises para exportação sem carregar a tabela em memória"""
+        return self._export_queryset(query, limit, filters, order).iterator(chunk_size=EXPORT_CHUNK_ROWS)
+    
+    def aexport_rows(self, query: str = None, limit: int = None, filters: Dict[str, str] = None,
+                     order: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Versão async de export_rows, para o StreamingHttpResponse não ser bufferizado no ASGI"""
+        return self._export_queryset(query, limit, filters, order).aiterator(chunk_size=EXPORT_CHUNK_ROWS)
+    
+    def _export_queryset(self, query: str = None, limit: int = None, filters: Dict[str, str] = None,
+                         order: str = None):
+        # Mesmos filtros e ordens de list_analyses; erros de parâmetro saem aqui, antes do streaming
+        analyses = self.filter_by_complexity(self.filter_analyses(query), filters, order).values(*EXPORT_FIELDS)
+        if limit:
+            analyses = analyses[:limit]
+        return analyses
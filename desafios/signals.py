@@ -0,0 +1,86 @@
+"""
+Sinais do app desafios
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import complexity, similarity, stats, suggest
+from .models import Analysis
+from .services import RECENT_ANALYSES_CACHE_KEY, analysis_cache_key
+
+
+@receiver(pre_save, sender=Analysis)
+def normalize_complexity(sender, instance, **kwargs):
+    """Mantém os postos de complexidade em dia com os textos (criação e edição no admin)"""
+    complexity.normalize(instance)
+
+
+@receiver(post_save, sender=Analysis)
+@receiver(post_delete, sender=Analysis)
+def invalidate_analysis_cache(sender, instance, created=False, **kwargs):
+    """Remove do cache uma análise editada (pelo admin) ou apagada, depois do commit"""
+    # Uma análise nova ainda não está no cache. Os L1 dos outros workers do
+    # TwoTierCache ainda servem a cópia antiga por até L1_TIMEOUT segundos
+    if not created:
+        key = analysis_cache_key(instance.id)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_save, sender=Analysis)
+@receiver(post_delete, sender=Analysis)
+def invalidate_recent_analyses(sender, instance, **kwargs):
+    """O histórico embutido na página inicial muda a cada análise criada, editada ou apagada"""
+    # Edições pelo admin também contam: título, categorias e complexidades aparecem no histórico.
+    # Só depois do commit: antes dele uma leitura concorrente (ou da réplica)
+    # recolocaria no cache o histórico antigo por todo o TIMEOUT
+    transaction.on_commit(lambda: cache.delete(RECENT_ANALYSES_CACHE_KEY))
+
+
+@receiver(pre_save, sender=Analysis)
+def remember_counted_dimensions(sender, instance, raw=False, **kwargs):
+    """Guarda os pares contados antes de uma edição, para mover a contagem no post_save"""
+    if raw or instance.pk is None:
+        return
+    previous = Analysis.objects.filter(pk=instance.pk).only(
+        'created_at', 'difficulty', 'categories', 'recommended_approach'
+    ).first()
+    instance._counted_dimensions = list(stats.analysis_dimensions(previous)) if previous else None
+
+
+@receiver(post_save, sender=Analysis)
+def count_new_analysis(sender, instance, created, raw=False, **kwargs):
+    """Atualiza os contadores do painel de estatísticas"""
+    # Na mesma transação do save, como na criação e na remoção: um rollback
+    # desfaz os dois juntos e os contadores não desviam
+    if created:
+        stats.record_analysis(instance, +1)
+    elif not raw:
+        previous = getattr(instance, '_counted_dimensions', None)
+        if previous is not None:
+            stats.record_change(previous, instance)
+        instance._counted_dimensions = None
+
+
+@receiver(post_save, sender=Analysis)
+def update_similar_challenges(sender, instance, created, **kwargs):
+    """Recalcula as arestas do grafo de similares para o desafio da nova análise"""
+    # Depois do commit: fora da transação (e do lock) da fila de escrita, e um
+    # erro aqui não desfaz a análise salva
+    if created:
+        transaction.on_commit(lambda: similarity.update_challenge(instance), robust=True)
+
+
+@receiver(post_save, sender=Analysis)
+def index_suggestions(sender, instance, created, **kwargs):
+    """Inclui título e algoritmos da nova análise nas sugestões da busca"""
+    if created:
+        suggest.on_analysis_saved(instance)
+
+
+@receiver(post_delete, sender=Analysis)
+def uncount_deleted_analysis(sender, instance, **kwargs):
+    """Desconta uma análise apagada dos contadores"""
+    stats.record_analysis(instance, -1)
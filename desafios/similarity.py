@@ -0,0 +1,213 @@
+"""
+Grafo de desafios similares - Jaccard ponderado sobre categorias e algoritmos,
+com candidatos encontrados por MinHash LSH e arestas pré-calculadas
+"""
+
+import hashlib
+import struct
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+
+from .models import Analysis, ChallengeSignature, LSHBucket, SimilarChallenge
+
+# Categorias pesam mais que algoritmos: duas DPs com técnicas diferentes ainda são parecidas
+CATEGORY_WEIGHT = 2.0
+ALGORITHM_WEIGHT = 1.0
+
+# 16 bandas de 2 linhas: pares com similaridade ~0.25 já têm boa chance de colidir
+BANDS = 16
+ROWS = 2
+TOP_K = 5
+MIN_SCORE = 0.1
+# Candidatos lidos por banda (os desafios mais recentes): bandas de categorias
+# comuns reúnem boa parte da tabela e o custo de um save não pode crescer com ela
+MAX_BUCKET_CANDIDATES = 100
+
+
+def analysis_features(analysis: Analysis, taxonomy_adapter=None) -> Dict[str, float]:
+    """Features ponderadas de uma análise, normalizadas pela taxonomia"""
+    if taxonomy_adapter is None:
+        from .services import get_taxonomy_adapter
+        taxonomy_adapter = get_taxonomy_adapter()
+
+    features = {}
+    for category in analysis.get_categories_list():
+        if str(category).strip():
+            features[f"cat:{taxonomy_adapter.normalize_term(category)}"] = CATEGORY_WEIGHT
+    for approach in analysis.get_approaches_list():
+        algorithms = approach.get('algorithms', []) if isinstance(approach, dict) else []
+        for algorithm in algorithms:
+            if str(algorithm).strip():
+                features.setdefault(f"alg:{taxonomy_adapter.normalize_term(algorithm)}", ALGORITHM_WEIGHT)
+    return features
+
+
+def weighted_jaccard(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """Σ min(pesos) / Σ max(pesos)"""
+    keys = a.keys() | b.keys()
+    if not keys:
+        return 0.0
+    upper = sum(max(a.get(k, 0.0), b.get(k, 0.0)) for k in keys)
+    lower = sum(min(a.get(k, 0.0), b.get(k, 0.0)) for k in keys)
+    return lower / upper if upper else 0.0
+
+
+def _hash(seed: int, feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8, salt=struct.pack('<Q', seed)).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def band_keys(features: Dict[str, float]) -> List[str]:
+    """Chaves das bandas LSH da assinatura MinHash (sobre o conjunto de features)"""
+    if not features:
+        return []
+    signature = [min(_hash(seed, feature) for feature in features) for seed in range(BANDS * ROWS)]
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<{ROWS}Q', *rows), digest_size=12).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def update_challenge(analysis: Analysis) -> None:
+    """Atualiza a assinatura do desafio da análise e as arestas que o envolvem.
+
+    Roda depois do commit que salvou a análise, em transação própria; o número
+    de consultas é fixo e o trabalho é limitado a MAX_BUCKET_CANDIDATES por banda.
+    """
+    challenge_id = analysis.challenge_id
+    features = analysis_features(analysis)
+    keys = band_keys(features)
+
+    with transaction.atomic():
+        ChallengeSignature.objects.update_or_create(
+            challenge_id=challenge_id, defaults={'analysis': analysis, 'features': features}
+        )
+        LSHBucket.objects.filter(challenge_id=challenge_id).delete()
+        LSHBucket.objects.bulk_create([LSHBucket(band_key=key, challenge_id=challenge_id) for key in keys])
+
+        scores = _score_candidates(features, _candidates(keys, challenge_id))
+
+        # Arestas de saída: os TOP_K melhores candidatos
+        SimilarChallenge.objects.filter(challenge_id=challenge_id).delete()
+        SimilarChallenge.objects.bulk_create([
+            SimilarChallenge(challenge_id=challenge_id, similar_id=other_id,
+                             similar_analysis_id=analysis_id, score=score)
+            for other_id, (score, analysis_id) in _top(scores)
+        ])
+
+        # Arestas de entrada: o desafio pode ter entrado (ou saído) do top-k dos candidatos
+        SimilarChallenge.objects.filter(similar_id=challenge_id).exclude(challenge_id__in=list(scores)).delete()
+        _offer_edges(challenge_id, analysis.id, scores)
+
+
+def _candidates(keys: List[str], challenge_id: int) -> set:
+    # Uma busca por banda no índice (band_key, challenge), limitada aos mais recentes
+    candidates = set()
+    for key in keys:
+        candidates.update(
+            LSHBucket.objects.filter(band_key=key).exclude(challenge_id=challenge_id)
+            .order_by('-challenge_id').values_list('challenge_id', flat=True)[:MAX_BUCKET_CANDIDATES]
+        )
+    return candidates
+
+
+def _score_candidates(features: Dict[str, float], candidate_ids: Iterable[int]) -> Dict[int, tuple]:
+    scores = {}
+    for other_id, analysis_id, other_features in ChallengeSignature.objects.filter(
+        challenge_id__in=candidate_ids
+    ).values_list('challenge_id', 'analysis_id', 'features'):
+        score = weighted_jaccard(features, other_features)
+        if score >= MIN_SCORE:
+            scores[other_id] = (score, analysis_id)
+    return scores
+
+
+def _top(scores: Dict[int, tuple]) -> List[tuple]:
+    return sorted(scores.items(), key=lambda item: (-item[1][0], item[0]))[:TOP_K]
+
+
+def _offer_edges(similar_id: int, analysis_id: int, scores: Dict[int, tuple]) -> None:
+    """Põe similar_id no top-k de cada candidato: uma leitura e escritas em lote"""
+    current: Dict[int, List[SimilarChallenge]] = {}
+    for edge in SimilarChallenge.objects.filter(challenge_id__in=list(scores)):
+        current.setdefault(edge.challenge_id, []).append(edge)
+
+    to_create, to_update, to_delete = [], [], []
+    for challenge_id, (score, _) in scores.items():
+        edges = current.get(challenge_id, [])
+        offered = next((edge for edge in edges if edge.similar_id == similar_id), None)
+        if offered is None:
+            offered = SimilarChallenge(challenge_id=challenge_id, similar_id=similar_id)
+            edges.append(offered)
+        offered.score, offered.similar_analysis_id = score, analysis_id
+        # Poda para manter só as TOP_K arestas de maior score
+        ranked = sorted(edges, key=lambda edge: (-edge.score, edge.similar_id))
+        to_delete.extend(edge.pk for edge in ranked[TOP_K:] if edge.pk)
+        if offered in ranked[:TOP_K]:
+            (to_update if offered.pk else to_create).append(offered)
+
+    if to_delete:
+        SimilarChallenge.objects.filter(pk__in=to_delete).delete()
+    SimilarChallenge.objects.bulk_update(to_update, ['score', 'similar_analysis'], batch_size=500)
+    SimilarChallenge.objects.bulk_create(to_create, batch_size=500)
+
+
+def get_similar(challenge_id: int, limit: int = TOP_K) -> List[SimilarChallenge]:
+    """Desafios similares já calculados (uma consulta pelo índice challenge, -score)"""
+    return list(
+        SimilarChallenge.objects.filter(challenge_id=challenge_id)
+        .select_related('similar')
+        .order_by('-score')[:limit]
+    )
+
+
+def rebuild(taxonomy_adapter=None) -> int:
+    """Recalcula assinaturas, buckets e arestas a partir da última análise de cada desafio"""
+    latest: Dict[int, Analysis] = {}
+    fields = ('id', 'challenge_id', 'categories', 'approaches')
+    for analysis in Analysis.objects.only(*fields).order_by('created_at', 'id').iterator(chunk_size=2000):
+        latest[analysis.challenge_id] = analysis
+
+    features = {cid: analysis_features(a, taxonomy_adapter) for cid, a in latest.items()}
+    buckets: Dict[str, List[int]] = {}
+    for challenge_id, challenge_features in features.items():
+        for key in band_keys(challenge_features):
+            buckets.setdefault(key, []).append(challenge_id)
+
+    edges = []
+    for challenge_id, challenge_features in features.items():
+        # Mesmo limite de update_challenge: os mais recentes de cada banda
+        candidates = {
+            other for key in band_keys(challenge_features)
+            for other in sorted(buckets[key])[-MAX_BUCKET_CANDIDATES - 1:]
+        }
+        candidates.discard(challenge_id)
+        scores = {}
+        for other_id in candidates:
+            score = weighted_jaccard(challenge_features, features[other_id])
+            if score >= MIN_SCORE:
+                scores[other_id] = (score, latest[other_id].id)
+        edges.extend(
+            SimilarChallenge(challenge_id=challenge_id, similar_id=other_id,
+                             similar_analysis_id=analysis_id, score=score)
+            for other_id, (score, analysis_id) in _top(scores)
+        )
+
+    with transaction.atomic():
+        SimilarChallenge.objects.all().delete()
+        LSHBucket.objects.all().delete()
+        ChallengeSignature.objects.all().delete()
+        ChallengeSignature.objects.bulk_create(
+            [ChallengeSignature(challenge_id=cid, analysis_id=latest[cid].id, features=f)
+             for cid, f in features.items()],
+            batch_size=1000,
+        )
+        LSHBucket.objects.bulk_create(
+            [LSHBucket(band_key=key, challenge_id=cid) for key, ids in buckets.items() for cid in ids],
+            batch_size=1000,
+        )
+        SimilarChallenge.objects.bulk_create(edges, batch_size=1000)
+    return len(edges)
@@ -0,0 +1,101 @@
+"""
+Estatísticas agregadas de análises - rollups mantidos incrementalmente
+"""
+
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Analysis, StatCounter
+
+
+def analysis_dimensions(analysis: Analysis) -> Iterable[Tuple[str, str]]:
+    """Pares (dimensão, chave) contados para uma análise"""
+    yield StatCounter.DIMENSION_DAY, timezone.localdate(analysis.created_at).isoformat()
+    yield StatCounter.DIMENSION_DIFFICULTY, analysis.difficulty
+    for category in {str(c).strip() for c in analysis.get_categories_list()}:
+        if category:
+            yield StatCounter.DIMENSION_CATEGORY, category[:200]
+    if analysis.recommended_approach:
+        yield StatCounter.DIMENSION_APPROACH, analysis.recommended_approach.strip()[:200]
+
+
+def record_analysis(analysis: Analysis, delta: int) -> None:
+    """Soma delta (+1 ao criar, -1 ao apagar) aos contadores da análise"""
+    for dimension, key in analysis_dimensions(analysis):
+        _bump(dimension, key, delta)
+
+
+def record_change(previous: Iterable[Tuple[str, str]], analysis: Analysis) -> None:
+    """Move a contagem de uma análise editada dos pares antigos para os novos"""
+    before, after = Counter(previous), Counter(analysis_dimensions(analysis))
+    for (dimension, key), count in (before - after).items():
+        _bump(dimension, key, -count)
+    for (dimension, key), count in (after - before).items():
+        _bump(dimension, key, count)
+
+
+def _bump(dimension: str, key: str, delta: int) -> None:
+    counters = StatCounter.objects.filter(dimension=dimension, key=key)
+    if counters.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(dimension=dimension, key=key, count=delta)
+    except IntegrityError:
+        # Outro writer criou o contador entre o update e o create
+        counters.update(count=F('count') + delta)
+
+
+def get_dashboard(days: int = 30, top: int = 10) -> Dict[str, Any]:
+    """Lê o painel a partir dos contadores (custo independente do número de análises)"""
+    today = timezone.localdate()
+    day_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+    def top_counts(dimension):
+        return [
+            {'name': key, 'count': count}
+            for key, count in StatCounter.objects.filter(dimension=dimension, count__gt=0)
+            .order_by('-count', 'key').values_list('key', 'count')[:top]
+        ]
+
+    per_day = dict(
+        StatCounter.objects.filter(dimension=StatCounter.DIMENSION_DAY, key__gte=day_keys[0])
+        .values_list('key', 'count')
+    )
+    difficulty = dict(
+        StatCounter.objects.filter(dimension=StatCounter.DIMENSION_DIFFICULTY)
+        .values_list('key', 'count')
+    )
+    labels = dict(Analysis.DIFFICULTY_CHOICES)
+
+    return {
+        'total': sum(difficulty.values()),
+        'per_day': [{'day': day, 'count': per_day.get(day, 0)} for day in day_keys],
+        'difficulty': [
+            {'difficulty': labels[code], 'count': difficulty.get(code, 0)}
+            for code, _ in Analysis.DIFFICULTY_CHOICES
+        ],
+        'top_categories': top_counts(StatCounter.DIMENSION_CATEGORY),
+        'top_approaches': top_counts(StatCounter.DIMENSION_APPROACH),
+    }
+
+
+def rebuild() -> int:
+    """Recalcula todos os contadores a partir das análises (corrige desvios)"""
+    totals = Counter()
+    fields = ('created_at', 'difficulty', 'categories', 'recommended_approach')
+    for analysis in Analysis.objects.only(*fields).iterator(chunk_size=2000):
+        totals.update(analysis_dimensions(analysis))
+
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(
+            [StatCounter(dimension=dimension, key=key, count=count) for (dimension, key), count in totals.items()],
+            batch_size=1000,
+        )
+    return len(totals)
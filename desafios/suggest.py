@@ -0,0 +1,227 @@
+"""
+Sugestões da busca (typeahead): índice de prefixos em memória sobre títulos,
+categorias/técnicas da taxonomia e algoritmos das abordagens salvas
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Subquery
+
+from .models import Analysis
+from .services import get_taxonomy_adapter
+
+KIND_CATEGORY = 'category'
+KIND_TECHNIQUE = 'technique'
+KIND_ALGORITHM = 'algorithm'
+KIND_TITLE = 'title'
+# Em empate, termos da taxonomia aparecem antes dos títulos
+KIND_ORDER = {KIND_CATEGORY: 0, KIND_TECHNIQUE: 1, KIND_ALGORITHM: 2, KIND_TITLE: 3}
+
+# Limite de rótulos distintos; acima dele os títulos e algoritmos vistos há
+# mais tempo saem do índice (os termos da taxonomia ficam sempre)
+MAX_LABELS = 10000
+# Análises lidas do banco por carga: as mais recentes, não a tabela inteira
+MAX_LOAD_ANALYSES = 5000
+# Cada título é indexado também pelo início das palavras seguintes ("sum" acha "Two Sum")
+MAX_WORD_STARTS = 6
+# Entradas examinadas por consulta antes de ordenar (prefixos curtos casam com muitas)
+SCAN_LIMIT = 256
+# Intervalo para buscar no banco as análises gravadas por outros workers
+REFRESH_INTERVAL = 30
+
+
+def fold(text: str) -> str:
+    """Minúsculas, sem acentos e com pontuação virando espaço"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def _keys_for(label: str, kind: str) -> List[str]:
+    words = fold(label).split()
+    if not words:
+        return []
+    starts = range(min(len(words), MAX_WORD_STARTS)) if kind == KIND_TITLE else range(len(words))
+    return list(dict.fromkeys(' '.join(words[i:]) for i in starts))
+
+
+class SuggestionIndex:
+    """Lista ordenada de (chave, tipo, rótulo) consultada com bisect.
+
+    A busca de um prefixo é O(log n) mais as entradas examinadas (no máximo
+    SCAN_LIMIT). A análise mais recente de cada título fica em um dict à parte,
+    então uma nova análise de um título conhecido não mexe na lista. Rótulos
+    vindos das análises (títulos e algoritmos) formam um LRU limitado a
+    max_labels rótulos no total.
+    """
+
+    def __init__(self, max_labels: int = MAX_LABELS):
+        self.max_labels = max_labels
+        self._entries: List[Tuple[str, str, str]] = []
+        # (tipo, rótulo) -> (análise mais recente, chave do rótulo inteiro)
+        self._refs: Dict[Tuple[str, str], Tuple[Any, str]] = {}
+        # Rótulos que podem sair do índice, do visto há mais tempo ao mais recente
+        self._evictable: 'OrderedDict[Tuple[str, str], None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._built = False
+        self._last_analysis_id = 0
+        self._last_refresh = 0.0
+        # Em carga em lote as entradas são só anexadas e ordenadas no fim
+        self._bulk = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, kind: str, label: str, ref: Any = None, pinned: bool = False) -> None:
+        label = label.strip()
+        if not label:
+            return
+        keys = _keys_for(label, kind)
+        if not keys:
+            return
+        known = (kind, label) in self._refs
+        self._refs[(kind, label)] = (ref, keys[0])
+        if pinned:
+            self._evictable.pop((kind, label), None)
+        elif (kind, label) in self._evictable or not known:
+            self._evictable[(kind, label)] = None
+            self._evictable.move_to_end((kind, label))
+        if known:
+            return
+        for key in keys:
+            entry = (key, kind, label)
+            if self._bulk:
+                self._entries.append(entry)
+            else:
+                self._entries.insert(bisect_left(self._entries, entry), entry)
+        while len(self._refs) > self.max_labels and self._evictable:
+            evicted_kind, evicted_label = self._evictable.popitem(last=False)[0]
+            if self._bulk:
+                self._refs.pop((evicted_kind, evicted_label), None)
+            else:
+                self._remove(evicted_kind, evicted_label)
+
+    def _remove(self, kind: str, label: str) -> None:
+        self._refs.pop((kind, label), None)
+        for key in _keys_for(label, kind):
+            entry = (key, kind, label)
+            position = bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+
+    def _load(self, rows) -> None:
+        """Carga em lote: uma ordenação no fim em vez de uma inserção ordenada por entrada"""
+        self._bulk = True
+        try:
+            self._add_analyses(rows)
+        finally:
+            self._bulk = False
+            # Descarta as entradas dos rótulos despejados durante a carga
+            self._entries = sorted({entry for entry in self._entries if (entry[1], entry[2]) in self._refs})
+
+    def _add_analyses(self, rows) -> None:
+        for analysis_id, title, approaches in rows:
+            self._add(KIND_TITLE, title or '', analysis_id)
+            for approach in approaches or []:
+                if isinstance(approach, dict):
+                    for algorithm in approach.get('algorithms') or []:
+                        self._add(KIND_ALGORITHM, str(algorithm))
+            self._last_analysis_id = max(self._last_analysis_id, analysis_id)
+
+    def _analysis_rows(self):
+        # Só as MAX_LOAD_ANALYSES mais recentes ainda não vistas, em ordem de id
+        # para que as mais novas fiquem no fim do LRU; lê só as três colunas usadas
+        recent = (
+            Analysis.objects.filter(id__gt=self._last_analysis_id)
+            .order_by('-id').values('id')[:MAX_LOAD_ANALYSES]
+        )
+        return (
+            Analysis.objects.filter(id__in=Subquery(recent)).order_by('id')
+            .values_list('id', 'challenge__title', 'approaches').iterator(chunk_size=2000)
+        )
+
+    def build(self) -> None:
+        """Carrega a taxonomia e as análises recentes (feito uma vez por processo)"""
+        with self._lock:
+            if self._built:
+                return
+            taxonomy = get_taxonomy_adapter().load_taxonomy()
+            categories = taxonomy.get('categories', {})
+            if not isinstance(categories, dict):
+                categories = dict.fromkeys(categories, [])
+            for category, techniques in categories.items():
+                self._add(KIND_CATEGORY, category, pinned=True)
+                for technique in techniques or []:
+                    self._add(KIND_TECHNIQUE, technique, pinned=True)
+            for algorithm in taxonomy.get('algorithms', []):
+                self._add(KIND_ALGORITHM, algorithm, pinned=True)
+            self._load(self._analysis_rows())
+            self._built = True
+            self._last_refresh = time.monotonic()
+
+    def refresh(self) -> None:
+        """Busca as análises novas gravadas por outros workers desde o último refresh"""
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            self._load(self._analysis_rows())
+
+    def add_analysis(self, analysis: Analysis) -> None:
+        """Inclui uma análise recém-gravada neste processo"""
+        with self._lock:
+            if self._built:
+                self._add_analyses([(analysis.id, analysis.challenge.title, analysis.approaches)])
+
+    def lookup(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Melhores rótulos cuja chave (ou início de palavra) começa com a consulta"""
+        prefix = fold(query)
+        if not prefix:
+            return []
+        matches = {}
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            for key, kind, label in self._entries[position:position + SCAN_LIMIT]:
+                if not key.startswith(prefix):
+                    break
+                ref, label_key = self._refs[(kind, label)]
+                # Casar com o início do rótulo vale mais que com uma palavra do meio
+                rank = (key != label_key, KIND_ORDER[kind], len(label))
+                if (kind, label) not in matches or rank < matches[(kind, label)][0]:
+                    matches[(kind, label)] = (rank, ref)
+        best = sorted(matches.items(), key=lambda item: item[1][0])[:limit]
+        return [
+            {'label': label, 'kind': kind, **({'analysis_id': ref} if kind == KIND_TITLE else {})}
+            for (kind, label), (rank, ref) in best
+        ]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """lookup() garantindo o índice construído e atualizado com os outros workers"""
+        if not self._built:
+            self.build()
+        elif time.monotonic() - self._last_refresh > REFRESH_INTERVAL:
+            self.refresh()
+        return self.lookup(query, limit)
+
+
+# Um por processo: construído no warm_up (antes do fork, com --preload) ou na primeira consulta
+index = SuggestionIndex()
+
+
+def warm_up() -> None:
+    """Constrói o índice no início do processo; sem banco migrado, fica para a primeira consulta"""
+    try:
+        index.build()
+    except DatabaseError:
+        pass
+    # Conexões abertas no master não podem ser herdadas pelos workers
+    connections.close_all()
+
+
+def on_analysis_saved(analysis: Analysis) -> None:
+    # Só depois do commit: uma transação desfeita não deixa sugestão órfã
+    transaction.on_commit(lambda: index.add_analysis(analysis))
@@ -0,0 +1,107 @@
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from desafios import cache as cache_module
+from desafios.cache import TwoTierCache
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = str(Path(tmp_dir.name) / 'cache.sqlite3')
+        # O BaseCache calcula o expires com o relógio real
+        self.now = time.time()
+        patcher = mock.patch.object(cache_module, 'time', SimpleNamespace(time=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def worker_cache(self, **options):
+        """Cliente como o de um worker: L2 compartilhado pelo arquivo, L1 próprio"""
+        client = TwoTierCache(self.path, {'OPTIONS': options})
+        client._l1 = {'entries': OrderedDict(), 'size': 0}
+        return client
+
+    def test_l1_is_bounded_by_size(self):
+        value = 'x' * 100
+        size = len(pickle.dumps(value, TwoTierCache.pickle_protocol))
+        cache = self.worker_cache(L1_MAX_SIZE=size * 3)
+        for key in 'abcde':
+            cache.set(key, value, timeout=None)
+        stats = cache.stats()
+        self.assertEqual(stats['l1_entries'], 3)
+        self.assertLessEqual(stats['l1_size'], size * 3)
+        self.assertEqual(stats['l1_evictions'], 2)
+        self.assertEqual(list(cache._l1['entries']), [cache.make_key(k) for k in 'cde'])
+        # O despejado do L1 continua no L2
+        self.assertEqual(cache.get('a'), value)
+        self.assertEqual(cache.stats()['l2_hits'], 1)
+
+    def test_l1_copy_expires_after_l1_timeout(self):
+        first, second = self.worker_cache(L1_TIMEOUT=5), self.worker_cache(L1_TIMEOUT=5)
+        first.set('chave', 'antigo', timeout=None)
+        self.assertEqual(first.get('chave'), 'antigo')
+        second.set('chave', 'novo', timeout=None)
+        self.now += 4
+        self.assertEqual(first.get('chave'), 'antigo')
+        self.now += 2
+        self.assertEqual(first.get('chave'), 'novo')
+
+    def test_l2_cull_keeps_the_most_recently_accessed(self):
+        value = 'x' * 200
+        size = len(pickle.dumps(value, TwoTierCache.pickle_protocol))
+        cache = self.worker_cache(MAX_SIZE=int(size * 5.5), CULL_EVERY=1, L1_TIMEOUT=5)
+        for key in 'abcd':
+            cache.set(key, value, timeout=None)
+            self.now += 1
+        # Lida do L2 bem depois: "a" passa a ser das mais recentes
+        self.now += 100
+        self.assertEqual(cache.get('a'), value)
+        for key in 'ef':
+            self.now += 1
+            cache.set(key, value, timeout=None)
+
+        self.now += 10
+        remaining = {key for key in 'abcdef' if cache.has_key(key)}
+        self.assertEqual(remaining, {'a', 'd', 'e', 'f'})
+        self.assertEqual(cache.stats()['l2_evictions'], 2)
+
+    def test_incr_is_atomic_across_workers(self):
+        self.worker_cache().set('contador', 0, timeout=None)
+        workers, increments = 4, 50
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def worker():
+            cache = self.worker_cache()
+            barrier.wait()
+            try:
+                for _ in range(increments):
+                    cache.incr('contador')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.worker_cache().get('contador'), workers * increments)
+
+    def test_incr_of_missing_or_expired_key_raises(self):
+        cache = self.worker_cache()
+        with self.assertRaises(ValueError):
+            cache.incr('ausente')
+        cache.set('curta', 1, timeout=10)
+        self.now += 11
+        with self.assertRaises(ValueError):
+            cache.incr('curta')
@@ -0,0 +1,67 @@
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from desafios.cache import TwoTierCache
+from desafios.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, CircuitOpenError
+
+
+def worker_cache(path):
+    """Cliente do cache como o de outro worker: mesmo L2, L1 próprio"""
+    client = TwoTierCache(path, {})
+    client._l1 = {'entries': OrderedDict(), 'size': 0}
+    return client
+
+
+@override_settings(CIRCUIT_BREAKER={'FAILURE_THRESHOLD': 4, 'FAILURE_WINDOW': 60, 'RECOVERY_TIMEOUT': 30})
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = str(Path(tmp_dir.name) / 'cache.sqlite3')
+        self.first = CircuitBreaker('llm', cache=worker_cache(path))
+        self.second = CircuitBreaker('llm', cache=worker_cache(path))
+
+    def test_failures_from_two_workers_add_up(self):
+        for breaker in (self.first, self.second, self.first):
+            breaker.record_failure()
+            # O /health/ de cada worker lê o estado (e o põe no L1) entre as falhas
+            self.assertEqual(breaker.state(), STATE_CLOSED)
+        self.assertEqual(self.second.snapshot()['recent_failures'], 3)
+        self.second.record_failure()
+        self.assertEqual(self.first.state(), STATE_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.first.before_call()
+
+    def test_success_while_closed_keeps_the_window(self):
+        for _ in range(3):
+            self.first.record_failure()
+        self.second.record_success()
+        self.second.record_failure()
+        self.assertEqual(self.first.state(), STATE_OPEN)
+
+    def test_half_open_allows_a_single_probe(self):
+        for _ in range(4):
+            self.first.record_failure()
+        self.first.cache.set('circuit:llm:opened_at', 0, timeout=None)
+        self.assertEqual(self.second.state(), STATE_HALF_OPEN)
+        self.second.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.first.before_call()
+        self.second.record_success()
+        self.assertEqual(self.second.state(), STATE_CLOSED)
+        # O outro worker vê o fechamento quando a cópia no L1 expira (até L1_TIMEOUT)
+        self.first.cache._l1['entries'].clear()
+        self.assertEqual(self.first.state(), STATE_CLOSED)
+        self.assertEqual(self.first.snapshot()['recent_failures'], 0)
+
+    def test_incr_is_atomic_in_l2(self):
+        self.first.cache.add('counter', 0)
+        self.assertEqual(self.first.cache.get('counter'), 0)
+        self.second.cache.incr('counter')
+        self.second.cache.incr('counter', 2)
+        self.assertEqual(self.first.cache.incr('counter'), 4)
+        with self.assertRaises(ValueError):
+            self.first.cache.incr('missing')
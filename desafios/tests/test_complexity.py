@@ -0,0 +1,79 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase
+
+from desafios import complexity
+from desafios.models import Analysis, Challenge
+
+recompute_migration = import_module('desafios.migrations.0010_recompute_complexity_rank')
+
+
+class ComplexityParserTests(SimpleTestCase):
+    def assertSameClass(self, spellings, notation):
+        for text in spellings:
+            with self.subTest(text=text):
+                self.assertEqual(complexity.parse(text).notation, notation)
+
+    def test_glued_log_spellings(self):
+        self.assertSameClass(
+            ["O(n log n)", "O(nlogn)", "O(nlog n)", "O(n logn)", "O(n*logn)", "O(n log₂ n)",
+             "O(nlog2n)", "O(nlgn)", "n log n"],
+            "O(n log n)",
+        )
+        self.assertSameClass(["O(logn)", "O(log n)", "O(lg n)"], "O(log n)")
+        self.assertSameClass(["O(mlogn)", "O(m log n)"], "O(m log n)")
+        self.assertSameClass(["O(n²logn)", "O(n^2 log n)"], "O(n^2 log n)")
+
+    def test_set_cardinality_bars(self):
+        self.assertSameClass(["O(|V| + |E|)", "O(|V|+|E|)", "O(V + E)"], "O(V + E)")
+        self.assertSameClass(["O(|V| log |V|)", "O(V log V)"], "O(V log V)")
+        self.assertSameClass(["O((|V| + |E|) log |V|)"], "O(V log V + E log V)")
+
+    def test_relative_order(self):
+        ordered = [
+            ["O(1)"],
+            ["O(logn)", "O(log n)"],
+            ["O(n)", "O(|V| + |E|)"],
+            ["O(nlogn)", "O(n log n)", "O(nlog n)", "O(|V| log |V|)"],
+            ["O(n^2)", "O(n²)"],
+            ["O(2^n)"],
+            ["O(n!)"],
+        ]
+        ranks = []
+        for spellings in ordered:
+            with self.subTest(spellings=spellings):
+                group = {complexity.parse(text).rank for text in spellings}
+                self.assertEqual(len(group), 1)
+                ranks.append(group.pop())
+        self.assertEqual(ranks, sorted(set(ranks)))
+
+    def test_division_by_log_ranks_below_the_polynomial(self):
+        ordered = ["O(sqrt n)", "O(n / log n)", "O(n)", "O(n log n / log log n)", "O(n log n)",
+                   "O(n^2 / log n)", "O(n^2)", "O(n^2 log n)"]
+        ranks = [complexity.parse(text).rank for text in ordered]
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(len(set(ranks)), len(ranks))
+
+    def test_unrecognized_text(self):
+        for text in ["", "depende da entrada", "O(n"]:
+            with self.subTest(text=text):
+                self.assertIsNone(complexity.try_parse(text))
+
+
+class RecomputeRankMigrationTests(TestCase):
+    def test_stored_ranks_move_to_the_new_scale(self):
+        challenge = Challenge.objects.create(title="Primos", description="Enunciado")
+        analysis = Analysis.objects.create(
+            challenge=challenge, title="Crivo", summary="Resumo", difficulty='MEDIO',
+            recommended_approach="Crivo", complexity_time="O(n / log n)", complexity_space="O(n)",
+            approaches=[{'name': "Crivo", 'time_complexity': "O(n^2 / log n)"}],
+        )
+        # Postos na escala antiga, com o log negativo cortado em zero
+        Analysis.objects.filter(id=analysis.id).update(time_rank=100000, space_rank=100000,
+                                                       best_approach_time_rank=200000)
+        recompute_migration.recompute_ranks(apps, None)
+        analysis.refresh_from_db()
+        self.assertEqual(analysis.time_rank, complexity.parse("O(n / log n)").rank)
+        self.assertEqual(analysis.space_rank, complexity.parse("O(n)").rank)
+        self.assertEqual(analysis.best_approach_time_rank, complexity.parse("O(n^2 / log n)").rank)
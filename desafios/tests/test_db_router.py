@@ -0,0 +1,108 @@
+import contextvars
+import time
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from desafios.db_router import PIN_COOKIE, ReplicaRouter, pin_primary, replica_pinning_middleware
+from desafios.models import Analysis, Challenge
+
+
+def in_new_context(function):
+    """Roda como no início de uma thread/requisição: ContextVars nos valores padrão"""
+    return contextvars.Context().run(function)
+
+
+def read_alias():
+    return Analysis.objects.all().db
+
+
+def mock_outside_atomic():
+    """Leitura como fora do atomic() que envolve cada TestCase (só para as leituras)"""
+    return mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', False)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_LAG_TOLERANCE=5)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.challenge = Challenge.objects.create(title="Two Sum", description="Enunciado")
+
+    def request(self, view, cookies=None):
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies or {})
+        return in_new_context(lambda: replica_pinning_middleware(view)(request))
+
+    def test_reads_go_to_the_replica(self):
+        with mock_outside_atomic():
+            self.assertEqual(in_new_context(read_alias), 'replica_1')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_goes_to_default(self):
+        self.assertEqual(in_new_context(read_alias), 'default')
+
+    def test_pin_is_per_context(self):
+        def pinned_read():
+            pin_primary()
+            return read_alias()
+
+        with mock_outside_atomic():
+            self.assertEqual(in_new_context(pinned_read), 'default')
+            # O pin de um contexto (outra requisição, outra thread) não vaza para os demais
+            self.assertEqual(in_new_context(read_alias), 'replica_1')
+
+    def test_reads_inside_atomic_go_to_default(self):
+        def atomic_read():
+            with transaction.atomic():
+                return read_alias()
+
+        # O TestCase já abre um atomic(); fora dele a leitura iria à réplica
+        self.assertEqual(in_new_context(atomic_read), 'default')
+        with mock_outside_atomic():
+            self.assertEqual(in_new_context(read_alias), 'replica_1')
+
+    def test_read_after_write_in_the_same_request_goes_to_default(self):
+        def view(request):
+            with mock_outside_atomic():
+                before = read_alias()
+            analysis = Analysis.objects.create(
+                challenge=self.challenge, title="Two Sum", summary="Resumo", difficulty='FACIL',
+                recommended_approach="Hash Map", complexity_time="O(n)", complexity_space="O(n)",
+            )
+            with mock_outside_atomic():
+                after = read_alias()
+                # ensure_solution relê a análise de que acabou de gravar
+                related = Analysis.objects.filter(id=analysis.id).select_related('challenge').db
+            return HttpResponse(f"{before},{after},{related}")
+
+        response = self.request(view)
+        self.assertEqual(response.content.decode(), "replica_1,default,default")
+        pinned_until = float(response.cookies[PIN_COOKIE].value)
+        self.assertAlmostEqual(pinned_until, time.time() + 5, delta=1)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+    def test_pin_cookie_keeps_the_client_on_default(self):
+        view = lambda request: HttpResponse(read_alias())
+        with mock_outside_atomic():
+            pinned = self.request(view, {PIN_COOKIE: f"{time.time() + 5:.3f}"})
+            expired = self.request(view, {PIN_COOKIE: f"{time.time() - 1:.3f}"})
+            invalid = self.request(view, {PIN_COOKIE: "amanhã"})
+        self.assertEqual(pinned.content, b'default')
+        self.assertEqual(expired.content, b'replica_1')
+        self.assertEqual(invalid.content, b'replica_1')
+        # Só leituras: nenhum cookie novo
+        self.assertNotIn(PIN_COOKIE, expired.cookies)
+
+    def test_related_reads_follow_the_instance(self):
+        router = ReplicaRouter()
+        self.challenge._state.db = 'replica_1'
+        with mock_outside_atomic():
+            alias = in_new_context(lambda: router.db_for_read(Challenge, instance=self.challenge))
+        self.assertEqual(alias, 'replica_1')
+
+    def test_migrations_skip_the_replicas(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'desafios'))
+        self.assertFalse(router.allow_migrate('replica_1', 'desafios'))
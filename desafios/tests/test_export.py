@@ -0,0 +1,106 @@
+import gzip
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory, TestCase
+
+from desafios import export, services, views
+from desafios.models import Analysis, Challenge
+
+
+def create_analyses(count):
+    challenge = Challenge.objects.create(title="Two Sum", description="Enunciado")
+    Analysis.objects.bulk_create([
+        Analysis(
+            challenge=challenge, title=f"Análise {i}", summary="Resumo", difficulty='MEDIO',
+            recommended_approach="Hash Map", complexity_time="O(n)", complexity_space="O(n)",
+        )
+        for i in range(count)
+    ])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        create_analyses(30)
+        self.factory = RequestFactory()
+
+    def test_sync_export_lists_every_analysis(self):
+        response = views.export_analyses(self.factory.get('/analyses/export/', {'format': 'jsonl'}))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 30)
+        self.assertEqual(json.loads(lines[0])['title'], "Análise 0")
+
+    async def test_async_export_is_an_async_stream(self):
+        response = await views.export_analyses_async(self.factory.get('/analyses/export/', {'format': 'csv'}))
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 31)
+        self.assertTrue(body.startswith('id,challenge_id,'))
+
+    async def test_async_gzip_matches_sync_output(self):
+        request = self.factory.get('/analyses/export/', {'format': 'jsonl', 'gzip': '1'})
+        async_response = await views.export_analyses_async(request)
+        async_body = gzip.decompress(b''.join([chunk async for chunk in async_response.streaming_content]))
+        self.assertEqual(async_response['Content-Disposition'], 'attachment; filename="analyses.jsonl.gz"')
+        sync_body = await sync_to_async(
+            lambda: gzip.decompress(b''.join(views.export_analyses(request).streaming_content))
+        )()
+        self.assertEqual(async_body, sync_body)
+
+    async def test_first_chunk_arrives_before_queryset_is_exhausted(self):
+        pulled = []
+        real_rows = services.AnalysisService.aexport_rows
+
+        def counting_rows(service, *args, **kwargs):
+            async def rows():
+                async for row in real_rows(service, *args, **kwargs):
+                    pulled.append(row['id'])
+                    yield row
+            return rows()
+
+        with mock.patch.object(services.AnalysisService, 'aexport_rows', counting_rows), \
+                mock.patch.object(services, 'EXPORT_CHUNK_ROWS', 5), \
+                mock.patch.object(export, 'CHUNK_SIZE', 1):
+            response = await views.export_analyses_async(self.factory.get('/analyses/export/', {'format': 'jsonl'}))
+            stream = aiter(response.streaming_content)
+            first = await anext(stream)
+            self.assertEqual(json.loads(first)['title'], "Análise 0")
+            self.assertLess(len(pulled), 30)
+            rest = [chunk async for chunk in stream]
+        self.assertEqual(len(rest), 29)
+        self.assertEqual(len(pulled), 30)
+
+
+class ExportFilterTests(TestCase):
+    def setUp(self):
+        challenge = Challenge.objects.create(title="Ordenação", description="Enunciado")
+        for title, time in (("Quadrática", "O(n^2)"), ("Constante", "O(1)"), ("Linearítmica", "O(n log n)")):
+            # create (e não bulk_create) para o pre_save calcular os postos
+            Analysis.objects.create(
+                challenge=challenge, title=title, summary="Resumo", difficulty='MEDIO',
+                recommended_approach="Ordenar", complexity_time=time, complexity_space="O(1)",
+            )
+        self.factory = RequestFactory()
+
+    def export_titles(self, response):
+        return [json.loads(line)['title'] for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_complexity_filter_and_order_match_the_listing(self):
+        params = {'format': 'jsonl', 'max_time': 'O(n log n)', 'order': '-time'}
+        response = views.export_analyses(self.factory.get('/analyses/export/', params))
+        self.assertEqual(self.export_titles(response), ["Linearítmica", "Constante"])
+        listing = json.loads(views.list_analyses(self.factory.get('/analyses/', params)).content)
+        self.assertEqual([item['title'] for item in listing], ["Linearítmica", "Constante"])
+
+    async def test_async_export_applies_the_filter(self):
+        request = self.factory.get('/analyses/export/', {'format': 'jsonl', 'min_time': 'O(n)'})
+        response = await views.export_analyses_async(request)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual([json.loads(line)['title'] for line in body.splitlines()], ["Quadrática", "Linearítmica"])
+
+    def test_invalid_filter_is_rejected_before_streaming(self):
+        response = views.export_analyses(self.factory.get('/analyses/export/', {'max_time': 'rápido'}))
+        self.assertEqual(response.status_code, 400)
+        response = views.export_analyses(self.factory.get('/analyses/export/', {'order': 'title'}))
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,75 @@
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import TestCase
+
+from desafios import fulltext
+from desafios.models import Analysis, Challenge
+
+restore_migration = import_module('desafios.migrations.0008_restore_fulltext_triggers')
+
+
+def create_analysis(title, summary="Resumo"):
+    challenge = Challenge.objects.create(title=title, description="Enunciado")
+    return Analysis.objects.create(
+        challenge=challenge, title=title, summary=summary, difficulty='MEDIO',
+        recommended_approach="A", complexity_time="O(n)", complexity_space="O(n)",
+    )
+
+
+class FulltextSearchTests(TestCase):
+    def test_sqlite_uses_the_fts5_index(self):
+        match = Challenge.objects.create(title="Two Sum", description="Ache o par com a soma")
+        Challenge.objects.create(title="Graph Coloring", description="Pinte os vértices")
+        self.assertEqual(list(fulltext.search(Challenge.objects.all(), "two su")), [match])
+        self.assertEqual(list(fulltext.search(Challenge.objects.all(), "!!")), [])
+
+    def test_postgresql_filters_by_the_gin_expression(self):
+        postgres = PostgresWrapper({**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'})
+        with mock.patch.object(fulltext, 'connections', {'default': postgres}):
+            queryset = fulltext.search(Challenge.objects.all(), "two sum")
+        sql, params = queryset.query.get_compiler(connection=postgres).as_sql()
+        self.assertIn(
+            "WHERE (to_tsvector('portuguese', coalesce(\"desafios_challenge\".\"title\", '') || ' ' || "
+            "coalesce(\"desafios_challenge\".\"description\", '')) @@ plainto_tsquery('portuguese', %s))",
+            sql,
+        )
+        self.assertEqual(params, ("two sum",))
+
+
+class FulltextTriggerTests(TestCase):
+    def triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_triggers_survive_the_migrations(self):
+        for table in fulltext.FULLTEXT_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                self.assertIn(f"{table}_fts_{suffix}", self.triggers())
+
+    def test_saved_analyses_are_searchable(self):
+        analysis = create_analysis("Two Sum")
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "two")), [analysis])
+        analysis.title = "Longest Substring"
+        analysis.save()
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "two")), [])
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "substr")), [analysis])
+        analysis.delete()
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "substr")), [])
+
+    def test_restore_indexes_rows_saved_without_triggers(self):
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER desafios_analysis_fts_{suffix}")
+        analysis = create_analysis("Two Sum")
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "two")), [])
+        # O schema_editor do SQLite não abre dentro da transação do teste; a
+        # migração só usa connection e execute()
+        with connection.cursor() as cursor:
+            restore_migration.restore_triggers(None, SimpleNamespace(connection=connection, execute=cursor.execute))
+        self.assertEqual(list(fulltext.search(Analysis.objects.all(), "two")), [analysis])
+        self.assertIn("desafios_analysis_fts_ai", self.triggers())
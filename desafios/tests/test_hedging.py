@@ -0,0 +1,188 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from resolve_desafios import hedging
+from resolve_desafios.hedging import Deadline, HedgeMetrics, LLMTimeoutError, arun_hedged, run_hedged
+
+HEDGE_DELAY = 0.05
+# Tempo máximo de espera dos eventos: só é atingido se o teste falhar
+WAIT = 5
+
+
+class FakeBackend:
+    """Backend falso: cada chamada executa o próximo comportamento da lista"""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            behaviour = self.behaviours[self.calls]
+            self.calls += 1
+        return behaviour()
+
+
+@mock.patch.object(hedging, 'DEFAULT_HEDGE_DELAY', HEDGE_DELAY)
+class RunHedgedTests(SimpleTestCase):
+    def setUp(self):
+        self.metrics = HedgeMetrics()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def blocked(self, value):
+        def behaviour():
+            self.release.wait(WAIT)
+            return value
+        return behaviour
+
+    def test_fast_call_is_not_hedged(self):
+        backend = FakeBackend(lambda: 'primário')
+        self.assertEqual(run_hedged(backend, 'etapa', self.metrics), 'primário')
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(self.metrics.hedged, 0)
+
+    def test_hedge_fires_after_the_delay_and_wins(self):
+        backend = FakeBackend(self.blocked('primário'), lambda: 'hedge')
+        self.assertEqual(run_hedged(backend, 'etapa', self.metrics), 'hedge')
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual((self.metrics.hedged, self.metrics.hedge_wins), (1, 1))
+
+    def test_first_success_is_returned_without_waiting_for_the_loser(self):
+        hedge_started = threading.Event()
+
+        def primary():
+            hedge_started.wait(WAIT)
+            return 'primário'
+
+        def hedge():
+            hedge_started.set()
+            self.release.wait(WAIT)
+            return 'hedge'
+
+        self.assertEqual(run_hedged(FakeBackend(primary, hedge), 'etapa', self.metrics), 'primário')
+        # O hedge continua bloqueado: a thread perdedora é abandonada
+        self.assertFalse(self.release.is_set())
+        self.assertEqual((self.metrics.hedged, self.metrics.hedge_wins), (1, 0))
+
+    def test_deadline_raises_timeout(self):
+        backend = FakeBackend(self.blocked('primário'))
+        with self.assertRaises(LLMTimeoutError) as raised:
+            run_hedged(backend, 'etapa', self.metrics, Deadline(0.1))
+        self.assertEqual(raised.exception.stage, 'etapa')
+        # Sem folga para um segundo pedido (MIN_HEDGE_BUDGET)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(self.metrics.timeouts, 1)
+
+    def test_expired_deadline_does_not_call(self):
+        backend = FakeBackend()
+        with self.assertRaises(LLMTimeoutError):
+            run_hedged(backend, 'etapa', self.metrics, Deadline(0))
+        self.assertEqual(backend.calls, 0)
+
+    def test_error_in_one_attempt_does_not_mask_a_later_success(self):
+        hedge_started = threading.Event()
+
+        def primary():
+            hedge_started.wait(WAIT)
+            raise ConnectionError("backend caiu")
+
+        def hedge():
+            hedge_started.set()
+            return 'hedge'
+
+        self.assertEqual(run_hedged(FakeBackend(primary, hedge), 'etapa', self.metrics), 'hedge')
+
+    def test_error_is_raised_when_every_attempt_fails(self):
+        def failing():
+            self.release.wait(HEDGE_DELAY * 2)
+            raise ConnectionError("backend caiu")
+
+        with self.assertRaises(ConnectionError):
+            run_hedged(FakeBackend(failing, failing), 'etapa', self.metrics)
+
+    def test_hedge_delay_follows_the_stage_p95(self):
+        tracker = self.metrics.tracker('etapa')
+        for _ in range(hedging.MIN_SAMPLES):
+            tracker.record(10.0)
+        # Com p95 de 10s, um primário que demora 0,2s não dispara hedge
+        backend = FakeBackend(lambda: self.release.wait(0.2) or 'primário')
+        self.assertEqual(run_hedged(backend, 'etapa', self.metrics), 'primário')
+        self.assertEqual(backend.calls, 1)
+
+
+@mock.patch.object(hedging, 'DEFAULT_HEDGE_DELAY', HEDGE_DELAY)
+class AsyncRunHedgedTests(SimpleTestCase):
+    def setUp(self):
+        self.metrics = HedgeMetrics()
+        self.cancelled = []
+        self.cancellation = asyncio.Event()
+
+    def blocked(self, name, release, value=None):
+        async def behaviour():
+            try:
+                await asyncio.wait_for(release.wait(), WAIT)
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                self.cancellation.set()
+                raise
+            return value
+        return behaviour
+
+    async def test_hedge_fires_after_the_delay_and_the_loser_is_cancelled(self):
+        release = asyncio.Event()
+
+        async def hedge():
+            return 'hedge'
+
+        backend = FakeBackend(self.blocked('primário', release), hedge)
+        self.assertEqual(await arun_hedged(backend, 'etapa', self.metrics), 'hedge')
+        await asyncio.wait_for(self.cancellation.wait(), WAIT)
+        self.assertEqual(self.cancelled, ['primário'])
+        self.assertEqual((self.metrics.hedged, self.metrics.hedge_wins), (1, 1))
+
+    async def test_primary_win_cancels_the_hedge(self):
+        hedge_started = asyncio.Event()
+
+        async def primary():
+            await asyncio.wait_for(hedge_started.wait(), WAIT)
+            return 'primário'
+
+        async def hedge():
+            hedge_started.set()
+            return await self.blocked('hedge', asyncio.Event())()
+
+        backend = FakeBackend(primary, hedge)
+        self.assertEqual(await arun_hedged(backend, 'etapa', self.metrics), 'primário')
+        await asyncio.wait_for(self.cancellation.wait(), WAIT)
+        self.assertEqual(self.cancelled, ['hedge'])
+        self.assertEqual(self.metrics.hedge_wins, 0)
+
+    async def test_deadline_raises_timeout_and_cancels(self):
+        backend = FakeBackend(self.blocked('primário', asyncio.Event()))
+        with self.assertRaises(LLMTimeoutError):
+            await arun_hedged(backend, 'etapa', self.metrics, Deadline(0.1))
+        await asyncio.wait_for(self.cancellation.wait(), WAIT)
+        self.assertEqual(self.cancelled, ['primário'])
+        self.assertEqual(self.metrics.timeouts, 1)
+
+    async def test_error_in_one_attempt_does_not_mask_a_later_success(self):
+        hedge_started = asyncio.Event()
+        release_hedge = asyncio.Event()
+
+        async def primary():
+            await asyncio.wait_for(hedge_started.wait(), WAIT)
+            release_hedge.set()
+            raise ConnectionError("backend caiu")
+
+        async def hedge():
+            hedge_started.set()
+            await asyncio.wait_for(release_hedge.wait(), WAIT)
+            return 'hedge'
+
+        self.assertEqual(await arun_hedged(FakeBackend(primary, hedge), 'etapa', self.metrics), 'hedge')
+        self.assertEqual(self.metrics.hedge_wins, 1)
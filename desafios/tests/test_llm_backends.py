@@ -0,0 +1,42 @@
+import threading
+
+from django.test import TestCase
+
+from desafios.services import AnalysisService
+from resolve_desafios.backend_pool import BackendConfig
+from resolve_desafios.fake_llm_adapter import FakeLLMAdapter
+from resolve_desafios.llm_adapter import OpenAILLMAdapter
+from resolve_desafios.stub_server import StubServer
+
+
+def start_stub(test, **options):
+    server = StubServer(('127.0.0.1', 0), latency=0, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test.addCleanup(server.server_close)
+    test.addCleanup(server.shutdown)
+    return server
+
+
+class ServedModelTests(TestCase):
+    def test_analysis_records_the_backend_that_answered(self):
+        failing = start_stub(self, fail_rate=1.0)
+        healthy = start_stub(self)
+        adapter = OpenAILLMAdapter(backends=[
+            BackendConfig(failing.base_url, 'chave', 'modelo-fora'),
+            BackendConfig(healthy.base_url, 'chave', 'modelo-no-ar'),
+        ])
+        service = AnalysisService(llm_adapter=adapter)
+        for i in range(3):
+            analysis = service.analyze_challenge(f"Two Sum {i}", "Ache o par com a soma")
+            self.assertEqual(analysis.model, 'modelo-no-ar')
+        self.assertEqual(analysis.raw_data['model'], 'modelo-no-ar')
+
+    def test_fake_adapter_reports_its_model(self):
+        analysis = AnalysisService(llm_adapter=FakeLLMAdapter(latency=0)).analyze_challenge("Two Sum", "Enunciado")
+        self.assertEqual(analysis.model, 'fake-0')
+
+    async def test_async_call_reports_the_model(self):
+        healthy = start_stub(self)
+        adapter = OpenAILLMAdapter(backends=[BackendConfig(healthy.base_url, 'chave', 'modelo-async')])
+        result = await adapter.aanalyze_challenge("Two Sum", "Enunciado", "", "", taxonomy_summary="")
+        self.assertEqual(result['model'], 'modelo-async')
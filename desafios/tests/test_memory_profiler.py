@@ -0,0 +1,75 @@
+import asyncio
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from desafios import memory_profiler
+
+PROFILING = {'ENABLED': True, 'SAMPLE_RATE': 1.0, 'MAX_ENDPOINTS': 2}
+
+
+@override_settings(MEMORY_PROFILING=PROFILING)
+class MemoryProfilerTests(SimpleTestCase):
+    def setUp(self):
+        memory_profiler.profile.reset()
+        self.addCleanup(memory_profiler.profile.reset)
+
+    def test_unresolved_paths_share_one_bucket(self):
+        for i in range(5):
+            self.client.get(f"/nao-existe-{i}/")
+        self.assertEqual(list(memory_profiler.profile.endpoints), [memory_profiler.UNRESOLVED_ENDPOINT])
+        self.assertEqual(memory_profiler.profile.endpoints[memory_profiler.UNRESOLVED_ENDPOINT]['sampled'], 5)
+
+    def test_resolved_endpoints_use_the_route(self):
+        self.client.get("/debug/memory/")
+        self.assertEqual(list(memory_profiler.profile.endpoints), ["GET /debug/memory/"])
+
+    @mock.patch.object(memory_profiler.profile, 'max_endpoints', 2)
+    def test_number_of_endpoints_is_capped(self):
+        for endpoint in ("GET /a/", "GET /b/", "GET /c/", "POST /d/"):
+            self.assertTrue(memory_profiler.profile.start(1))
+            memory_profiler.profile.stop(endpoint, memory_profiler.current_rss(), top=1)
+        self.assertEqual(
+            set(memory_profiler.profile.endpoints), {"GET /a/", "GET /b/", memory_profiler.OTHER_ENDPOINTS}
+        )
+        self.assertEqual(memory_profiler.profile.endpoints[memory_profiler.OTHER_ENDPOINTS]['sampled'], 2)
+
+    def test_overlapping_request_discards_the_sample(self):
+        profile = memory_profiler.profile
+        profile.enter()
+        self.assertTrue(profile.start(1))
+        # Outra requisição começa no meio da amostra
+        profile.enter()
+        self.assertFalse(profile.start(1))
+        profile.stop("GET /a/", memory_profiler.current_rss(), top=1)
+        profile.leave()
+        profile.leave()
+        self.assertEqual(profile.endpoints, {})
+        self.assertEqual(profile.report()['discarded'], 1)
+
+    def test_concurrent_async_requests_are_not_mixed(self):
+        started = []
+
+        async def view(request):
+            started.append(request.path)
+            # Segura as duas requisições em andamento ao mesmo tempo
+            while len(started) < 2:
+                await asyncio.sleep(0)
+            return HttpResponse()
+
+        async def lone_view(request):
+            return HttpResponse()
+
+        factory = RequestFactory()
+
+        async def requests():
+            middleware = memory_profiler.memory_profiling_middleware(view)
+            await asyncio.gather(middleware(factory.get("/a/")), middleware(factory.get("/b/")))
+            await memory_profiler.memory_profiling_middleware(lone_view)(factory.get("/c/"))
+
+        asyncio.run(requests())
+        profile = memory_profiler.profile
+        self.assertEqual(profile.discarded, 1)
+        self.assertEqual(profile.endpoints[memory_profiler.UNRESOLVED_ENDPOINT]['sampled'], 1)
+        self.assertEqual(profile.requests, 3)
@@ -0,0 +1,59 @@
+from django.test import SimpleTestCase
+
+from resolve_desafios.prompt_budget import PromptBudgeter, compact_section, count_tokens, normalize_whitespace
+
+CODE = """Implemente a função:
+
+```python
+def soma(a,  b):
+    if a:
+        return a  +  b
+    return b
+```"""
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def test_small_input_passes_through_unchanged(self):
+        sections = {
+            'description': "Dado   um array,\n\n\n\n  retorne  o par.\n",
+            'objectives': "",
+            'constraints': None,
+        }
+        compacted, pending, report = PromptBudgeter(10_000).compact(sections)
+        self.assertEqual(compacted['description'], sections['description'])
+        self.assertEqual(compacted['constraints'], "")
+        self.assertEqual(pending, {})
+        self.assertEqual(report['steps'], [])
+
+    def test_indentation_is_preserved(self):
+        text = "Passos:\n  - ler   a entrada\n    - ordenar\tos   valores"
+        self.assertEqual(normalize_whitespace(text), "Passos:\n  - ler a entrada\n    - ordenar os valores")
+
+    def test_fenced_code_is_kept_verbatim(self):
+        compacted, _ = compact_section(CODE + "\n\n\n\n" + CODE.replace("soma", "soma_dupla"))
+        self.assertEqual(compacted.count("    if a:\n        return a  +  b"), 2)
+
+    def test_repeated_examples_are_dropped(self):
+        example = "Exemplo 1:\nEntrada: 1 2\nSaída: 3"
+        text = f"Retorne a soma.\n\n{example}\n\n{example}\n\nRetorne a soma."
+        compacted, steps = compact_section(text)
+        self.assertEqual(compacted, f"Retorne a soma.\n\n{example}")
+        self.assertIn("bloco repetido", steps)
+        self.assertIn(f"exemplo repetido ({count_tokens(example)} tokens)", steps)
+
+    def test_distinct_examples_with_the_same_output_are_kept(self):
+        text = "Entrada: 1 2\n\nSaída: 3\n\nEntrada: 0 3\n\nSaída: 3"
+        compacted, steps = compact_section(text)
+        self.assertEqual(compacted, text)
+        self.assertEqual(steps, [])
+
+    def test_repeated_code_blocks_are_dropped(self):
+        compacted, steps = compact_section(CODE + "\n\n" + CODE.split("\n\n")[1])
+        self.assertEqual(compacted, CODE)
+        self.assertTrue(any(step.startswith("exemplo repetido") for step in steps))
+
+    def test_over_budget_input_is_compacted(self):
+        paragraph = "Texto   repetido do enunciado."
+        compacted, _, report = PromptBudgeter(5).compact({'description': "\n\n".join([paragraph] * 3)})
+        self.assertEqual(compacted['description'], "Texto repetido do enunciado.")
+        self.assertIn("description: bloco repetido", report['steps'])
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from desafios.models import Analysis, Challenge
+from desafios.services import RECENT_ANALYSES_CACHE_KEY, AnalysisService, analysis_cache_key
+
+
+class CacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.challenge = Challenge.objects.create(title="Two Sum", description="Enunciado")
+
+    def create_analysis(self):
+        return Analysis.objects.create(
+            challenge=self.challenge, title="Two Sum", summary="Resumo", difficulty='FACIL',
+            recommended_approach="Hash Map", complexity_time="O(n)", complexity_space="O(n)",
+        )
+
+    def test_recent_analyses_are_invalidated_after_commit(self):
+        cache.set(RECENT_ANALYSES_CACHE_KEY, ['antigo'])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.create_analysis()
+            # Antes do commit o histórico antigo continua lá: quem o reler não vê dados não commitados
+            self.assertEqual(cache.get(RECENT_ANALYSES_CACHE_KEY), ['antigo'])
+        self.assertTrue(callbacks)
+        self.assertIsNone(cache.get(RECENT_ANALYSES_CACHE_KEY))
+
+    def test_recent_analyses_are_invalidated_on_edit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analysis = self.create_analysis()
+        cache.set(RECENT_ANALYSES_CACHE_KEY, ['antigo'])
+        analysis.title = "Two Sum II"
+        with self.captureOnCommitCallbacks(execute=True):
+            analysis.save()
+            self.assertEqual(cache.get(RECENT_ANALYSES_CACHE_KEY), ['antigo'])
+        self.assertIsNone(cache.get(RECENT_ANALYSES_CACHE_KEY))
+
+    def test_deleted_analysis_is_invalidated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analysis = self.create_analysis()
+        key = analysis_cache_key(analysis.id)
+        cache.set(key, {'id': analysis.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            analysis.delete()
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+
+    def test_edited_analysis_is_read_back_fresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analysis = self.create_analysis()
+            Analysis.objects.filter(id=analysis.id).update(stage=Analysis.STAGE_COMPLETE)
+        service = AnalysisService(llm_adapter=object())
+        self.assertEqual(service.get_analysis(analysis.id).summary, "Resumo")
+        self.assertIsNotNone(cache.get(analysis_cache_key(analysis.id)))
+
+        # Edição pelo admin
+        edited = Analysis.objects.get(id=analysis.id)
+        edited.summary = "Resumo corrigido"
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.save()
+        self.assertEqual(service.get_analysis(analysis.id).summary, "Resumo corrigido")
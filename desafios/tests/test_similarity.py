@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from desafios import similarity
+from desafios.models import Analysis, Challenge, SimilarChallenge
+
+
+def create_analysis(title, categories=("Arrays", "Hash Table"), algorithms=("Hash Map",)):
+    challenge = Challenge.objects.create(title=title, description="Enunciado")
+    return Analysis.objects.create(
+        challenge=challenge, title=title, summary="Resumo", difficulty='MEDIO',
+        categories=list(categories), approaches=[{'name': "A", 'algorithms': list(algorithms)}],
+        recommended_approach="A", complexity_time="O(n)", complexity_space="O(n)",
+    )
+
+
+class SimilarityTests(TestCase):
+    def test_edges_are_computed_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = create_analysis("Two Sum")
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            second = create_analysis("Three Sum")
+        self.assertFalse(SimilarChallenge.objects.filter(challenge=second.challenge).exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(similarity.get_similar(second.challenge_id)[0].similar_id, first.challenge_id)
+        self.assertEqual(similarity.get_similar(first.challenge_id)[0].similar_id, second.challenge_id)
+
+    def test_query_count_does_not_grow_with_candidates(self):
+        def queries_for_new_analysis(title):
+            analysis = create_analysis(title)
+            with CaptureQueriesContext(connection) as context:
+                similarity.update_challenge(analysis)
+            return len(context.captured_queries)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                create_analysis(f"Base {i}")
+        few = queries_for_new_analysis("Com poucos candidatos")
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(40):
+                create_analysis(f"Mais {i}")
+        many = queries_for_new_analysis("Com muitos candidatos")
+        # Uma busca por banda mais um número fixo de leituras e escritas em lote
+        bound = similarity.BANDS + 16
+        self.assertLessEqual(few, bound)
+        self.assertLessEqual(many, bound)
+
+    def test_candidates_are_capped_per_bucket(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analyses = [create_analysis(f"Desafio {i}") for i in range(10)]
+        newest = analyses[-1]
+        keys = similarity.band_keys(similarity.analysis_features(newest))
+        with mock.patch.object(similarity, 'MAX_BUCKET_CANDIDATES', 3):
+            candidates = similarity._candidates(keys, newest.challenge_id)
+        self.assertEqual(candidates, {a.challenge_id for a in analyses[-4:-1]})
+
+    def test_incoming_edges_keep_only_top_k(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analyses = [create_analysis(f"Desafio {i}") for i in range(similarity.TOP_K + 3)]
+        for analysis in analyses:
+            self.assertEqual(
+                SimilarChallenge.objects.filter(challenge=analysis.challenge).count(), similarity.TOP_K
+            )
+        # Um desafio mais parecido (mesmas features) que os vizinhos atuais do primeiro entra no top-k dele
+        with self.captureOnCommitCallbacks(execute=True):
+            other = create_analysis("Diferente", categories=("Graphs",), algorithms=("BFS",))
+        self.assertFalse(SimilarChallenge.objects.filter(similar=other.challenge).exists())
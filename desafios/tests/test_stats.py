@@ -0,0 +1,67 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+
+from desafios import stats
+from desafios.models import Analysis, Challenge, StatCounter
+
+backfill_migration = import_module('desafios.migrations.0009_backfill_stat_counters')
+
+
+def create_analysis(title, difficulty='FACIL', categories=("Arrays",)):
+    challenge = Challenge.objects.create(title=title, description="Enunciado")
+    return Analysis.objects.create(
+        challenge=challenge, title=title, summary="Resumo", difficulty=difficulty,
+        categories=list(categories), recommended_approach="Hash Map",
+        complexity_time="O(n)", complexity_space="O(n)",
+    )
+
+
+def counters():
+    return {
+        (dimension, key): count
+        for dimension, key, count in StatCounter.objects.exclude(count=0).values_list('dimension', 'key', 'count')
+    }
+
+
+class StatCounterTests(TestCase):
+    def test_edit_moves_the_counts(self):
+        analysis = create_analysis("Two Sum")
+        create_analysis("Three Sum")
+        analysis.difficulty = 'DIFICIL'
+        analysis.categories = ["Arrays", "Two Pointers"]
+        analysis.save()
+
+        current = counters()
+        self.assertEqual(current[StatCounter.DIMENSION_DIFFICULTY, 'FACIL'], 1)
+        self.assertEqual(current[StatCounter.DIMENSION_DIFFICULTY, 'DIFICIL'], 1)
+        self.assertEqual(current[StatCounter.DIMENSION_CATEGORY, 'Arrays'], 2)
+        self.assertEqual(current[StatCounter.DIMENSION_CATEGORY, 'Two Pointers'], 1)
+
+        analysis.delete()
+        self.assertFalse(StatCounter.objects.filter(count__lt=0).exists())
+        self.assertNotIn((StatCounter.DIMENSION_DIFFICULTY, 'DIFICIL'), counters())
+
+    def test_edit_matches_a_rebuild(self):
+        analysis = create_analysis("Two Sum")
+        for difficulty in ('MEDIO', 'DIFICIL', 'FACIL'):
+            analysis.difficulty = difficulty
+            analysis.save()
+        analysis.delete()
+        create_analysis("Three Sum", difficulty='MEDIO')
+        incremental = counters()
+        stats.rebuild()
+        self.assertEqual(incremental, counters())
+
+    def test_migration_backfills_an_empty_table(self):
+        create_analysis("Two Sum")
+        create_analysis("Graph", difficulty='DIFICIL', categories=("Graphs", "BFS"))
+        expected = counters()
+        StatCounter.objects.all().delete()
+        backfill_migration.backfill_counters(apps, None)
+        self.assertEqual(counters(), expected)
+        # Com contadores já existentes a migração não mexe neles
+        StatCounter.objects.filter(dimension=StatCounter.DIMENSION_DIFFICULTY).update(count=99)
+        backfill_migration.backfill_counters(apps, None)
+        self.assertEqual(counters()[StatCounter.DIMENSION_DIFFICULTY, 'FACIL'], 99)
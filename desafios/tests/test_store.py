@@ -0,0 +1,52 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from resolve_desafios.store import SCHEMA_VERSION, STAGE_COMPLETE, AnalysisStore, SchemaVersionError
+
+# Formato da tabela "analyses" do data/resolve_desafios.db versionado no repositório
+LEGACY_SCHEMA = """
+CREATE TABLE analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    challenge_id INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+INSERT INTO analyses (challenge_id, summary, model, created_at) VALUES (1, 'Resumo', 'gpt-4o-mini', '2024-01-01');
+"""
+
+
+class AnalysisStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db_path = Path(directory.name) / "resolve_desafios.db"
+
+    def open_store(self):
+        store = AnalysisStore(self.db_path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_works_next_to_the_legacy_analyses_table(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+        store = self.open_store()
+        store.put("k1", "gpt-4o-mini", STAGE_COMPLETE, {"title": "Two Sum"})
+        self.assertEqual(store.get("k1"), {"stage": STAGE_COMPLETE, "result": {"title": "Two Sum"}})
+        self.assertEqual([entry["key"] for entry in store.recent()], ["k1"])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+    def test_reopening_keeps_the_entries(self):
+        self.open_store().put("k1", "gpt-4o-mini", STAGE_COMPLETE, {"title": "Two Sum"})
+        self.assertIsNotNone(self.open_store().get("k1"))
+
+    def test_newer_schema_is_refused(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        with self.assertRaises(SchemaVersionError):
+            AnalysisStore(self.db_path)
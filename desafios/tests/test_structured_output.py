@@ -0,0 +1,153 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from resolve_desafios.backend_pool import BackendConfig
+from resolve_desafios.llm_adapter import OpenAILLMAdapter
+from resolve_desafios.schemas import ClassificationOutput
+from resolve_desafios.structured_output import (
+    IncrementalJSONParser, StructuredOutputError, parse_partial_json, repair_output,
+)
+
+DOCUMENT = json.dumps({
+    "title": "Two \"Sum\"",
+    "summary": "Linha 1\nLinha 2 é \\ barra",
+    "scores": [12.5, -3, 1e3, True, None],
+    "nested": {"a": [], "b": {}},
+})
+
+
+def parse_in_chunks(chunks):
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.value()
+
+
+def classification(**overrides):
+    data = {
+        'title': "Two Sum", 'summary': "Resumo", 'categories': ["Arrays"], 'difficulty': "FACIL",
+        'approaches': [{
+            'name': "Hash Map", 'algorithms': ["Hash Map"], 'description': "Tabela hash",
+            'steps': ["Percorrer"], 'time_complexity': "O(n)", 'space_complexity': "O(n)",
+        }],
+        'recommended_approach': "Hash Map", 'complexity_time': "O(n)", 'complexity_space': "O(n)",
+        'assumptions': "",
+    }
+    data.update(overrides)
+    return data
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    def test_any_chunk_split_gives_the_same_value(self):
+        expected = json.loads(DOCUMENT)
+        for size in (1, 2, 3, 7):
+            with self.subTest(size=size):
+                chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+                self.assertEqual(parse_in_chunks(chunks), expected)
+
+    def test_splits_inside_strings_escapes_and_numbers(self):
+        cases = [
+            (['{"s": "ab', 'c"}'], {"s": "abc"}),
+            (['{"s": "a\\', 'nb"}'], {"s": "a\nb"}),
+            (['{"s": "\\u00', 'e9"}'], {"s": "é"}),
+            (['{"n": 1', '2.5}'], {"n": 12.5}),
+            (['{"n": -', '1e', '3}'], {"n": -1000}),
+            (['```json\n{"a"', ': 1}\n```'], {"a": 1}),
+        ]
+        for chunks, expected in cases:
+            with self.subTest(chunks=chunks):
+                self.assertEqual(parse_in_chunks(chunks), expected)
+
+    def test_truncated_documents_are_closed(self):
+        cases = [
+            ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+            ('{"a": {"b": [{"c": 1}', {"a": {"b": [{"c": 1}]}}),
+            ('{"resumo": "texto longo cort', {"resumo": "texto longo cort"}),
+            ('{"resumo": "barra \\', {"resumo": "barra "}),
+            ('{"resumo": "\\u00e', {"resumo": ""}),
+            ('{"a": 1, "b', {"a": 1}),
+            ('{"a": 1, "b":', {"a": 1}),
+            ('{"a": 12', {"a": 12}),
+            ('{"a": tru', {}),
+            ('{"a": ["x", "y', {"a": ["x"]}),
+            ('[1, 2, [3', [1, 2, [3]]),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_partial_json(text), expected)
+
+    def test_trailing_commas_and_unclosed_brackets(self):
+        cases = [
+            ('{"a": [1, 2,], "b": {"c": 1,},}', {"a": [1, 2], "b": {"c": 1}}),
+            ('{"a": "x, }",}', {"a": "x, }"}),
+            ('[1, 2,', [1, 2]),
+            ('{"a": [1, {"b": 2},', {"a": [1, {"b": 2}]}),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_partial_json(text), expected)
+
+    def test_nothing_parsed(self):
+        self.assertIsNone(parse_partial_json(""))
+        self.assertIsNone(parse_partial_json("Desculpe, não posso ajudar."))
+        self.assertFalse(IncrementalJSONParser().has_content)
+
+
+class RepairOutputTests(SimpleTestCase):
+    def test_coerces_towards_the_schema(self):
+        data, repairs = repair_output(ClassificationOutput, classification(
+            difficulty="Médio", categories="Arrays", assumptions=None,
+            approaches={'name': "A", 'description': "d", 'steps': "- ler\n- ordenar",
+                        'time_complexity': "O(n)", 'space_complexity': "O(1)"},
+        ))
+        self.assertEqual(data['difficulty'], "MEDIO")
+        self.assertEqual(data['categories'], ["Arrays"])
+        self.assertEqual(data['assumptions'], "")
+        self.assertEqual(data['approaches'][0]['steps'], ["ler", "ordenar"])
+        self.assertEqual(data['approaches'][0]['algorithms'], [])
+        self.assertTrue(repairs)
+        ClassificationOutput.model_validate(data)
+
+
+class FollowupTests(SimpleTestCase):
+    def setUp(self):
+        self.adapter = OpenAILLMAdapter(backends=[BackendConfig(None, 'chave', 'modelo')])
+
+    def test_missing_required_fields_are_asked_for(self):
+        partial = classification()
+        del partial['summary'], partial['recommended_approach']
+        calls = []
+
+        def call_hedged(schema, messages, deadline):
+            calls.append((schema, messages))
+            if len(calls) == 1:
+                return 'modelo', partial
+            return 'modelo', {'summary': "Resumo completo", 'recommended_approach': "Hash Map"}
+
+        with mock.patch.object(self.adapter, '_call_hedged', side_effect=call_hedged):
+            result, model = self.adapter._invoke_structured(ClassificationOutput, ["mensagem"])
+
+        self.assertEqual(result.summary, "Resumo completo")
+        self.assertEqual(model, 'modelo')
+        patch_schema, patch_messages = calls[1]
+        self.assertEqual(set(patch_schema.model_fields), {'summary', 'recommended_approach'})
+        self.assertEqual(patch_messages[0], "mensagem")
+        self.assertIn("recommended_approach, summary", patch_messages[-1].content)
+        self.assertEqual(self.adapter.output_stats['followup'], 1)
+
+    def test_fields_still_missing_after_the_followup_fail(self):
+        partial = classification()
+        del partial['summary']
+        responses = iter([('modelo', partial), ('modelo', {})])
+        with mock.patch.object(self.adapter, '_call_hedged', side_effect=lambda *args: next(responses)):
+            with self.assertRaises(StructuredOutputError) as raised:
+                self.adapter._invoke_structured(ClassificationOutput, ["mensagem"])
+        self.assertEqual(raised.exception.missing, ['summary'])
+
+    def test_complete_output_needs_no_followup(self):
+        with mock.patch.object(self.adapter, '_call_hedged', return_value=('modelo', classification())) as call:
+            self.adapter._invoke_structured(ClassificationOutput, ["mensagem"])
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(self.adapter.output_stats['ok'], 1)
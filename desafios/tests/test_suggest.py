@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from desafios import suggest
+from desafios.models import Analysis, Challenge
+
+
+def create_analysis(title, algorithms=("Hash Map",)):
+    challenge = Challenge.objects.create(title=title, description="Enunciado")
+    return Analysis.objects.create(
+        challenge=challenge, title=title, summary="Resumo", difficulty='MEDIO',
+        approaches=[{'name': "A", 'algorithms': list(algorithms)}],
+        recommended_approach="A", complexity_time="O(n)", complexity_space="O(n)",
+    )
+
+
+def labels(index, kind):
+    return {label for label_kind, label in index._refs if label_kind == kind}
+
+
+class SuggestionIndexTests(TestCase):
+    def test_build_loads_only_recent_analyses(self):
+        analyses = [create_analysis(f"Desafio {i}", algorithms=(f"Algoritmo {i}",)) for i in range(6)]
+        index = suggest.SuggestionIndex()
+        with mock.patch.object(suggest, 'MAX_LOAD_ANALYSES', 3):
+            index.build()
+        self.assertEqual(labels(index, suggest.KIND_TITLE), {a.title for a in analyses[-3:]})
+        self.assertNotIn((suggest.KIND_ALGORITHM, "Algoritmo 0"), index._refs)
+
+        newer = create_analysis("Desafio novo")
+        with mock.patch.object(suggest, 'MAX_LOAD_ANALYSES', 3):
+            index.refresh()
+        self.assertEqual(index.lookup("desafio novo")[0]['analysis_id'], newer.id)
+
+    def test_bound_applies_to_algorithms_too(self):
+        index = suggest.SuggestionIndex(max_labels=4)
+        index._add(suggest.KIND_CATEGORY, "Graphs", pinned=True)
+        index._add_analyses([
+            (i, f"Desafio {i}", [{'algorithms': [f"Algoritmo {i}"]}]) for i in range(1, 11)
+        ])
+        self.assertEqual(len(index._refs), 4)
+        self.assertEqual(
+            set(index._refs),
+            {(suggest.KIND_CATEGORY, "Graphs"), (suggest.KIND_TITLE, "Desafio 10"),
+             (suggest.KIND_ALGORITHM, "Algoritmo 10"), (suggest.KIND_ALGORITHM, "Algoritmo 9")},
+        )
+        self.assertEqual(index.lookup("algoritmo 1"), [{'label': "Algoritmo 10", 'kind': suggest.KIND_ALGORITHM}])
+        self.assertEqual(index.lookup("graphs"), [{'label': "Graphs", 'kind': suggest.KIND_CATEGORY}])
+
+    def test_seen_labels_stay_in_the_index(self):
+        index = suggest.SuggestionIndex(max_labels=2)
+        index._add_analyses([(1, "Two Sum", []), (2, "Three Sum", []), (3, "Two Sum", []), (4, "Four Sum", [])])
+        self.assertEqual(labels(index, suggest.KIND_TITLE), {"Two Sum", "Four Sum"})
+        self.assertEqual(index.lookup("two")[0]['analysis_id'], 3)
+
+
+class SuggestionPickTests(TestCase):
+    """O que o app.js busca em /analyses/?q= ao escolher uma categoria, técnica ou algoritmo"""
+
+    def search(self, term, **params):
+        response = self.client.get('/analyses/', {'q': term, 'limit': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return {item['title'] for item in response.json()}
+
+    def test_algorithm_and_technique_match_analyses_outside_the_recent_history(self):
+        older = create_analysis("Menor Caminho", algorithms=("Dijkstra",))
+        older.categories = ["Grafos"]
+        older.recommended_approach = "Busca em Largura"
+        older.save()
+        for i in range(25):
+            create_analysis(f"Recente {i}")
+        self.assertEqual(self.search("dijkstra"), {"Menor Caminho"})
+        self.assertEqual(self.search("busca em largura"), {"Menor Caminho"})
+        self.assertEqual(self.search("Grafos"), {"Menor Caminho"})
+
+    def test_accented_labels_match(self):
+        analysis = create_analysis("Mochila", algorithms=("Programação Dinâmica",))
+        analysis.categories = ["Otimização"]
+        analysis.save()
+        self.assertEqual(self.search("Programação Dinâmica"), {"Mochila"})
+        self.assertEqual(self.search("Otimização"), {"Mochila"})
+
+    def test_term_combines_with_complexity_filters(self):
+        create_analysis("Linear")
+        quadratic = create_analysis("Quadrática")
+        quadratic.complexity_time = "O(n^2)"
+        quadratic.save()
+        self.assertEqual(self.search("hash map", max_time="O(n)"), {"Linear"})
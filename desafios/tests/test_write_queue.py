@@ -0,0 +1,78 @@
+import tempfile
+import threading
+from pathlib import Path
+
+import fcntl
+from django.db import connections
+from django.test import TransactionTestCase
+
+from desafios.models import Challenge
+from desafios.write_queue import WriteQueue
+
+
+class WriteQueueTests(TransactionTestCase):
+    def setUp(self):
+        self.queue = WriteQueue()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def block_writer(self):
+        """Ocupa o writer até release: os jobs submetidos enquanto isso formam o próximo lote"""
+        def job():
+            self.started.set()
+            self.release.wait(5)
+            return 'bloqueio'
+        future = self.queue.submit(job)
+        self.assertTrue(self.started.wait(5))
+        return future
+
+    def test_concurrent_jobs_share_one_transaction(self):
+        def job():
+            return id(connections['default'].atomic_blocks[0])
+
+        blocker = self.block_writer()
+        futures = [self.queue.submit(job) for _ in range(3)]
+        self.release.set()
+        blocker.result(5)
+        transactions = {future.result(5) for future in futures}
+        self.assertEqual(len(transactions), 1)
+
+    def test_failing_job_does_not_roll_back_the_batch(self):
+        def create(title, fail=False):
+            def job():
+                challenge = Challenge.objects.create(title=title, description="Enunciado")
+                if fail:
+                    raise ValueError(f"falhou: {title}")
+                return challenge.id
+            return job
+
+        blocker = self.block_writer()
+        first = self.queue.submit(create("Primeiro"))
+        failing = self.queue.submit(create("Falha", fail=True))
+        last = self.queue.submit(create("Último"))
+        self.release.set()
+        blocker.result(5)
+
+        # O Future só é resolvido depois do commit do lote
+        first_id, last_id = first.result(5), last.result(5)
+        with self.assertRaisesMessage(ValueError, "falhou: Falha"):
+            failing.result(5)
+        self.assertEqual(Challenge.objects.get(title="Primeiro").id, first_id)
+        self.assertEqual(Challenge.objects.get(title="Último").id, last_id)
+        self.assertFalse(Challenge.objects.filter(title="Falha").exists())
+
+    def test_batches_wait_for_the_lock_file(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        lock_path = Path(directory.name) / "write-lock"
+        queue = WriteQueue(lock_path=str(lock_path))
+
+        # Outro processo (aqui, outro descritor) está escrevendo
+        with open(lock_path, 'a') as other_writer:
+            fcntl.flock(other_writer, fcntl.LOCK_EX)
+            future = queue.submit(lambda: 'gravado')
+            self.assertFalse(future.done())
+            with self.assertRaises(TimeoutError):
+                future.result(0.2)
+            fcntl.flock(other_writer, fcntl.LOCK_UN)
+        self.assertEqual(future.result(5), 'gravado')
@@ -2,17 +2,32 @@
 URLs do app desafios
 """
 
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
     path('', views.index, name='index'),
-    path('analyze/', views.analyze_challenge, name='analyze_challenge'),
+    path('analyze/',
+         views.analyze_challenge_async if settings.ANALYZE_ASYNC else views.analyze_challenge,
+         name='analyze_challenge'),
+    path('analyze/async/', views.analyze_challenge_async, name='analyze_challenge_async'),
     path('analyses/', views.list_analyses, name='list_analyses'),
-    path('analyses/<int:analysis_id>/', views.get_analysis, name='get_analysis'),
+    # Sem a barra também: evita o redirect do APPEND_SLASH (uma ida e volta a mais)
+    path('analyses', views.list_analyses),
+    path('analyses/export/',
+         views.export_analyses_async if settings.ANALYZE_ASYNC else views.export_analyses,
+         name='export_analyses'),
+    path('analyses/<int:analysis_id>/',
+         views.get_analysis_async if settings.ANALYZE_ASYNC else views.get_analysis,
+         name='get_analysis'),
     path('analysis/<int:analysis_id>/', views.analysis_detail, name='analysis_detail'),
     path('challenges/', views.challenge_list, name='challenge_list'),
     path('challenge/<int:challenge_id>/', views.challenge_detail, name='challenge_detail'),
     path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
+    path('stats/', views.stats_data, name='stats_data'),
+    path('dashboard/', views.stats_dashboard, name='stats_dashboard'),
     path('health/', views.health_check, name='health_check'),
+    path('debug/memory/', views.debug_memory, name='debug_memory'),
 ]
@@ -3,119 +3,198 @@ Views Django para análise de desafios - Arquitetura MTV
 """
 
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from django.db.models import Q
 import json
+import logging
 
+from resolve_desafios.hedging import Deadline, LLMTimeoutError
+from resolve_desafios.structured_output import StructuredOutputError
+from .circuit_breaker import CircuitOpenError, llm_breaker
 from .models import Challenge, Analysis
-from .services import AnalysisService
+from . import export, memory_profiler, similarity, stats, suggest
+from .complexity import ComplexityError
+from .services import COMPLEXITY_FILTERS, AnalysisService, llm_metrics
+
+logger = logging.getLogger(__name__)
 
 
 def index(request):
-    """Página principal"""
-    return render(request, 'desafios/index.html')
+    """Página principal (o histórico vem embutido, sem requisição extra)"""
+    return render(request, 'desafios/index.html', {
+        'recent_analyses': AnalysisService().recent_analyses(),
+    })
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def analyze_challenge(request):
     """Analisar desafio via AJAX"""
+    oversized = _oversized_body_response(request)
+    if oversized:
+        return oversized
+    
     try:
-        # Log environment variables
-        import os
-        from dotenv import load_dotenv
-        load_dotenv()
-        api_key = os.getenv('OPENAI_API_KEY')
-        print(f"WEB SERVER - API Key loaded: {api_key[:20] if api_key else 'None'}...")
-        
         data = json.loads(request.body)
-        print(f"WEB SERVER - Request data received")
         
-        # Test LLM adapter directly
-        import sys
-        from pathlib import Path
-        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+        service = AnalysisService()
+        analysis = service.analyze_challenge(
+            title=data.get('title'),
+            description=data.get('description'),
+            objectives=data.get('objectives'),
+            constraints=data.get('constraints'),
+            language=data.get('language', 'pt-BR'),
+            deadline=_llm_deadline(),
+        )
         
-        from resolve_desafios.llm_adapter import OpenAILLMAdapter
-        llm_adapter = OpenAILLMAdapter()
-        print(f"WEB SERVER - LLM Adapter created successfully")
+        return JsonResponse(_analysis_payload(analysis))
         
-        service = AnalysisService()
-        print(f"WEB SERVER - Service created successfully")
+    except Exception as e:
+        return _llm_error_response(e)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_challenge_async(request):
+    """Analisar desafio via AJAX sem bloquear o worker (ASGI)"""
+    oversized = _oversized_body_response(request)
+    if oversized:
+        return oversized
+    
+    try:
+        data = json.loads(request.body)
         
-        analysis = service.analyze_challenge(
+        service = AnalysisService()
+        analysis = await service.aanalyze_challenge(
             title=data.get('title'),
             description=data.get('description'),
             objectives=data.get('objectives'),
             constraints=data.get('constraints'),
-            language=data.get('language', 'pt-BR')
+            language=data.get('language', 'pt-BR'),
+            deadline=_llm_deadline(),
         )
-        print(f"WEB SERVER - Analysis completed successfully")
-        
-        return JsonResponse({
-            'id': analysis.id,
-            'title': analysis.title,
-            'summary': analysis.summary,
-            'categories': analysis.get_categories_list(),
-            'difficulty': analysis.get_difficulty_display(),
-            'approaches': analysis.get_approaches_list(),
-            'recommended_approach': analysis.recommended_approach,
-            'recommended_solution': analysis.recommended_solution,
-            'complexity_time': analysis.complexity_time,
-            'complexity_space': analysis.complexity_space,
-            'assumptions': analysis.assumptions,
-            'references': analysis.references,
-            'created_at': analysis.created_at.isoformat(),
-        })
+        
+        return JsonResponse(_analysis_payload(analysis))
         
     except Exception as e:
-        error_msg = str(e)
-        
-        if "401" in error_msg or "AuthenticationError" in error_msg:
-            return JsonResponse(
-                {'error': 'Chave da API OpenAI inválida. Verifique sua configuração.'},
-                status=400
-            )
-        elif "429" in error_msg:
-            return JsonResponse(
-                {'error': 'Limite de taxa excedido. Tente novamente em alguns minutos.'},
-                status=429
-            )
-        elif "quota" in error_msg.lower():
-            return JsonResponse(
-                {'error': 'Cota da API OpenAI esgotada. Adicione créditos à sua conta.'},
-                status=402
-            )
-        else:
-            return JsonResponse(
-                {'error': f'Erro interno: {error_msg}'},
-                status=500
-            )
+        return _llm_error_response(e)
+
+
+def _analysis_payload(analysis):
+    """Serializa uma análise recém-criada para a resposta de /analyze/"""
+    return {
+        'id': analysis.id,
+        'title': analysis.title,
+        'summary': analysis.summary,
+        'categories': analysis.get_categories_list(),
+        'difficulty': analysis.get_difficulty_display(),
+        'approaches': analysis.get_approaches_list(),
+        'recommended_approach': analysis.recommended_approach,
+        'complexity_time': analysis.complexity_time,
+        'complexity_space': analysis.complexity_space,
+        'assumptions': analysis.assumptions,
+        'created_at': analysis.created_at.isoformat(),
+        # Análise anterior servida enquanto o circuito do LLM está aberto
+        'degraded': getattr(analysis, 'degraded', False),
+        **_solution_payload(analysis),
+    }
+
+
+def _solution_payload(analysis):
+    """Campos da etapa de solução (nulos enquanto ela não foi gerada)"""
+    return {
+        'stage': analysis.stage,
+        'recommended_solution': analysis.recommended_solution if analysis.is_complete else None,
+        'references': analysis.references if analysis.is_complete else None,
+    }
+
+
+def _oversized_body_response(request):
+    """Recusa corpos grandes demais pelo Content-Length, antes de lê-los"""
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length <= settings.ANALYZE_MAX_BODY_BYTES:
+        return None
+    return JsonResponse(
+        {'error': f'Enunciado grande demais ({length // 1024} KB). '
+                  f'O limite é {settings.ANALYZE_MAX_BODY_BYTES // 1024} KB.'},
+        status=413
+    )
+
+
+def _llm_deadline():
+    """Prazo das chamadas ao LLM desta requisição"""
+    return Deadline(settings.LLM_DEADLINE)
+
+
+def _llm_error_response(e):
+    """Converte erros da análise em respostas JSON"""
+    error_msg = str(e)
+    
+    if isinstance(e, CircuitOpenError):
+        response = JsonResponse(
+            {'error': 'O serviço de análise está indisponível no momento. Tente novamente em instantes.'},
+            status=503
+        )
+        response['Retry-After'] = str(max(1, int(e.retry_after)))
+        return response
+    elif isinstance(e, LLMTimeoutError):
+        return JsonResponse(
+            {'error': 'O modelo demorou demais para responder. Tente novamente.'},
+            status=504
+        )
+    elif isinstance(e, StructuredOutputError):
+        return JsonResponse(
+            {'error': 'O modelo devolveu uma resposta incompleta. Tente novamente.'},
+            status=502
+        )
+    elif "401" in error_msg or "AuthenticationError" in error_msg:
+        return JsonResponse(
+            {'error': 'Chave da API OpenAI inválida. Verifique sua configuração.'},
+            status=400
+        )
+    elif "429" in error_msg:
+        return JsonResponse(
+            {'error': 'Limite de taxa excedido. Tente novamente em alguns minutos.'},
+            status=429
+        )
+    elif "quota" in error_msg.lower():
+        return JsonResponse(
+            {'error': 'Cota da API OpenAI esgotada. Adicione créditos à sua conta.'},
+            status=402
+        )
+    else:
+        return JsonResponse(
+            {'error': f'Erro interno: {error_msg}'},
+            status=500
+        )
 
 
 @require_http_methods(["GET"])
 def list_analyses(request):
-    """Listar análises via AJAX"""
+    """Listar análises via AJAX (?max_time=O(n log n)&order=time filtram e ordenam por complexidade,
+    ?q= filtra por título, categoria, técnica ou algoritmo)"""
     try:
         limit = int(request.GET.get('limit', 10))
         service = AnalysisService()
-        analyses = service.list_analyses(limit)
-        
-        return JsonResponse([
-            {
-                'id': analysis.id,
-                'challenge_id': analysis.challenge.id,
-                'title': analysis.title,
-                'difficulty': analysis.get_difficulty_display(),
-                'categories': analysis.get_categories_list(),
-                'summary': analysis.summary,
-                'created_at': analysis.created_at.isoformat(),
-            }
-            for analysis in analyses
-        ], safe=False)
+        filters = {param: request.GET[param] for param in COMPLEXITY_FILTERS if request.GET.get(param)}
+        order = request.GET.get('order') or None
+        term = request.GET.get('q', '').strip()[:100] or None
+        if filters or order or term:
+            try:
+                return JsonResponse(service.analyses_by_complexity(filters, order, limit, term), safe=False)
+            except ComplexityError as e:
+                return JsonResponse({'error': f'Complexidade inválida: {e}'}, status=400)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(service.recent_analyses(limit), safe=False)
         
     except Exception as e:
         return JsonResponse(
@@ -124,9 +203,66 @@ def list_analyses(request):
         )
 
 
+@require_http_methods(["GET"])
+def export_analyses(request):
+    """Exporta análises em CSV ou JSONL via streaming (?format=csv|jsonl&q=...&gzip=1, filtros e order do histórico)"""
+    return _export_response(request, asynchronous=False)
+
+
+@require_http_methods(["GET"])
+async def export_analyses_async(request):
+    """Exportação com iteradores async: no ASGI um iterador sync seria lido inteiro antes do envio"""
+    return _export_response(request, asynchronous=True)
+
+
+def _export_response(request, asynchronous):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'jsonl'):
+        return JsonResponse({'error': 'Formato inválido. Use csv ou jsonl.'}, status=400)
+    
+    try:
+        limit = int(request.GET['limit']) if request.GET.get('limit') else None
+    except ValueError:
+        return JsonResponse({'error': 'Parâmetro limit inválido'}, status=400)
+    
+    # Só monta os iteradores; o banco é lido enquanto a resposta é enviada
+    service = AnalysisService()
+    query = request.GET.get('q') or None
+    filters = {param: request.GET[param] for param in COMPLEXITY_FILTERS if request.GET.get(param)}
+    order = request.GET.get('order') or None
+    gzip = request.GET.get('gzip') in ('1', 'true')
+    try:
+        export_rows = service.aexport_rows if asynchronous else service.export_rows
+        rows = export_rows(query=query, limit=limit, filters=filters, order=order)
+    except ComplexityError as e:
+        return JsonResponse({'error': f'Complexidade inválida: {e}'}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if asynchronous:
+        lines = export.acsv_lines(rows) if export_format == 'csv' else export.ajsonl_lines(rows)
+        chunks = export.aencoded_chunks(lines)
+        if gzip:
+            chunks = export.agzip_chunks(chunks)
+    else:
+        lines = export.csv_lines(rows) if export_format == 'csv' else export.jsonl_lines(rows)
+        chunks = export.encoded_chunks(lines)
+        if gzip:
+            chunks = export.gzip_chunks(chunks)
+    
+    filename = f"analyses.{export_format}"
+    content_type = 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson; charset=utf-8'
+    if gzip:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @require_http_methods(["GET"])
 def get_analysis(request, analysis_id):
-    """Obter análise específica via AJAX"""
+    """Obter análise específica via AJAX (gera a solução na primeira consulta)"""
     try:
         service = AnalysisService()
         analysis = service.get_analysis(analysis_id)
@@ -134,22 +270,11 @@ def get_analysis(request, analysis_id):
         if not analysis:
             return JsonResponse({'error': 'Análise não encontrada'}, status=404)
         
-        return JsonResponse({
-            'id': analysis.id,
-            'challenge_id': analysis.challenge.id,
-            'title': analysis.title,
-            'difficulty': analysis.get_difficulty_display(),
-            'categories': analysis.get_categories_list(),
-            'summary': analysis.summary,
-            'recommended_approach': analysis.recommended_approach,
-            'recommended_solution': analysis.recommended_solution,
-            'complexity_time': analysis.complexity_time,
-            'complexity_space': analysis.complexity_space,
-            'assumptions': analysis.assumptions,
-            'references': analysis.references,
-            'created_at': analysis.created_at.isoformat(),
-        })
+        analysis = service.ensure_solution(analysis, deadline=_llm_deadline())
+        return JsonResponse(_analysis_detail_payload(analysis))
         
+    except (CircuitOpenError, LLMTimeoutError) as e:
+        return _llm_error_response(e)
     except Exception as e:
         return JsonResponse(
             {'error': f'Erro ao carregar análise: {str(e)}'},
@@ -157,12 +282,63 @@ def get_analysis(request, analysis_id):
         )
 
 
+@require_http_methods(["GET"])
+async def get_analysis_async(request, analysis_id):
+    """Obter análise específica via AJAX sem bloquear o worker (ASGI)"""
+    try:
+        service = AnalysisService()
+        analysis = await service.aget_analysis(analysis_id)
+        
+        if not analysis:
+            return JsonResponse({'error': 'Análise não encontrada'}, status=404)
+        
+        analysis = await service.aensure_solution(analysis, deadline=_llm_deadline())
+        return JsonResponse(_analysis_detail_payload(analysis))
+        
+    except (CircuitOpenError, LLMTimeoutError) as e:
+        return _llm_error_response(e)
+    except Exception as e:
+        return JsonResponse(
+            {'error': f'Erro ao carregar análise: {str(e)}'},
+            status=500
+        )
+
+
+def _analysis_detail_payload(analysis):
+    """Serializa uma análise para a resposta de /analyses/<id>/"""
+    return {
+        'id': analysis.id,
+        'challenge_id': analysis.challenge_id,
+        'title': analysis.title,
+        'difficulty': analysis.get_difficulty_display(),
+        'categories': analysis.get_categories_list(),
+        'summary': analysis.summary,
+        'recommended_approach': analysis.recommended_approach,
+        'complexity_time': analysis.complexity_time,
+        'complexity_space': analysis.complexity_space,
+        'assumptions': analysis.assumptions,
+        'created_at': analysis.created_at.isoformat(),
+        **_solution_payload(analysis),
+    }
+
+
 def analysis_detail(request, analysis_id):
     """Página de detalhes da análise"""
     try:
-        analysis = get_object_or_404(Analysis, id=analysis_id)
+        service = AnalysisService()
+        analysis = service.get_analysis(analysis_id)
+        if analysis is None:
+            raise Http404("Análise não encontrada")
+        
+        try:
+            analysis = service.ensure_solution(analysis, deadline=_llm_deadline())
+        except Exception:
+            # A classificação continua útil mesmo se a solução falhar agora
+            logger.exception("Falha ao gerar a solução da análise %s", analysis_id)
+        
         return render(request, 'desafios/analysis_result.html', {
-            'analysis': analysis
+            'analysis': analysis,
+            'similar': similarity.get_similar(analysis.challenge_id),
         })
         
     except Exception as e:
@@ -191,7 +367,8 @@ def challenge_detail(request, challenge_id):
     
     return render(request, 'desafios/challenge_detail.html', {
         'challenge': challenge,
-        'analyses': analyses
+        'analyses': analyses,
+        'similar': similarity.get_similar(challenge.id),
     })
 
 
@@ -210,7 +387,63 @@ def search(request):
     })
 
 
+@require_http_methods(["GET"])
+def search_suggest(request):
+    """Sugestões para a busca enquanto o usuário digita (índice em memória)"""
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+    except ValueError:
+        limit = 8
+    query = request.GET.get('q', '')[:100]
+    return JsonResponse({'query': query, 'suggestions': suggest.index.suggest(query, limit)})
+
+
+@require_http_methods(["GET"])
+def stats_data(request):
+    """Estatísticas agregadas via AJAX"""
+    try:
+        days = max(1, min(int(request.GET.get('days', 30)), 365))
+        top = max(1, min(int(request.GET.get('top', 10)), 100))
+        return JsonResponse(stats.get_dashboard(days=days, top=top))
+        
+    except Exception as e:
+        return JsonResponse(
+            {'error': f'Erro ao carregar estatísticas: {str(e)}'},
+            status=500
+        )
+
+
+def stats_dashboard(request):
+    """Página do painel de estatísticas"""
+    return render(request, 'desafios/stats.html', {
+        'stats': stats.get_dashboard()
+    })
+
+
 @require_http_methods(["GET"])
 def health_check(request):
     """Health check endpoint"""
-    return JsonResponse({'status': 'healthy', 'service': 'resolve-desafios-django'})
\ No newline at end of file
+    payload = {'status': 'healthy', 'service': 'resolve-desafios-django'}
+    if hasattr(cache, 'stats'):
+        payload['cache'] = cache.stats()
+    payload['circuit_breaker'] = llm_breaker.snapshot()
+    llm = llm_metrics()
+    if llm is not None:
+        payload['llm'] = llm
+    return JsonResponse(payload)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE"])
+def debug_memory(request):
+    """Perfil de memória deste worker (GET) ou zera o agregado (DELETE)"""
+    if not memory_profiler.is_authorized(request):
+        raise Http404
+    if request.method == 'DELETE':
+        memory_profiler.profile.reset()
+        return JsonResponse({'status': 'reset'})
+    try:
+        top = max(1, min(int(request.GET.get('top', 10)), 100))
+    except ValueError:
+        top = 10
+    return JsonResponse(memory_profiler.profile.report(top))
@@ -0,0 +1,139 @@
+"""
+Fila de escrita com um único writer por processo (e, com WRITE_QUEUE_LOCK_FILE,
+um único writer ativo entre os processos) - evita "database is locked" no SQLite
+"""
+
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from .db_router import pin_primary
+
+
+class WriteQueue:
+    """Serializa as escritas do processo em uma thread dedicada.
+
+    Os jobs enfileirados são agrupados em uma única transação (cada um em seu
+    próprio savepoint), então N submissões concorrentes custam um commit em
+    vez de N disputas pelo lock de escrita do SQLite.
+
+    Com lock_path, cada lote segura um flock exclusivo nesse arquivo: os
+    writers dos vários workers do gunicorn se revezam em fila no kernel em vez
+    de disputar o lock do SQLite com espera ativa (busy timeout), então há um
+    único writer ativo na máquina por vez.
+    """
+
+    def __init__(self, batch_size: int = 50, lock_path: Optional[str] = None):
+        self.batch_size = batch_size
+        self.lock_path = lock_path if fcntl is not None else None
+        self._lock_file = None
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="desafios-write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[[], Any]) -> Future:
+        """Enfileira uma função que escreve no banco; o Future recebe seu retorno"""
+        future = Future()
+        self._jobs.put((fn, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._jobs.get()]
+            # Junta ao lote tudo o que chegou enquanto o commit anterior rodava
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                pass
+            self._write_batch(batch)
+
+    def _acquire_process_lock(self) -> None:
+        if self.lock_path is None:
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.lock_path, 'a')
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _release_process_lock(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _write_batch(self, batch) -> None:
+        self._acquire_process_lock()
+        try:
+            self._commit_batch(batch)
+        finally:
+            self._release_process_lock()
+
+    def _commit_batch(self, batch) -> None:
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for fn, future in batch:
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, fn(), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # Falha no commit: nenhum job do lote foi gravado
+            connections['default'].close()
+            for fn, future in batch:
+                future.set_exception(e)
+            return
+
+        # Os resultados só são entregues depois do commit
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_write_queue = None
+_write_queue_pid = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """Retorna a fila do processo atual (threads não sobrevivem ao fork do gunicorn)"""
+    global _write_queue, _write_queue_pid
+    with _write_queue_lock:
+        if _write_queue is None or _write_queue_pid != os.getpid():
+            _write_queue = WriteQueue(
+                batch_size=settings.WRITE_QUEUE_BATCH_SIZE,
+                lock_path=getattr(settings, 'WRITE_QUEUE_LOCK_FILE', None),
+            )
+            _write_queue_pid = os.getpid()
+        return _write_queue
+
+
+def run_write(fn: Callable[[], Any]) -> Any:
+    """Executa uma escrita pela fila (se habilitada) e aguarda o resultado"""
+    # As leituras seguintes desta requisição precisam ver o que foi gravado
+    pin_primary()
+    if not settings.WRITE_QUEUE_ENABLED:
+        with transaction.atomic():
+            return fn()
+    return get_write_queue().submit(fn).result()
+
+
+async def arun_write(fn: Callable[[], Any]) -> Any:
+    """Versão assíncrona de run_write: aguarda o commit sem bloquear o event loop"""
+    pin_primary()
+    if not settings.WRITE_QUEUE_ENABLED:
+        return await sync_to_async(run_write)(fn)
+    return await asyncio.wrap_future(get_write_queue().submit(fn))
@@ -110,6 +110,9 @@ deploy_app() {
     # Atualizar dependências
     pip install -r requirements.txt
     
+    # Backup antes das migrações
+    backup_db
+    
     # Executar migrações
     python manage.py migrate
     
@@ -126,15 +129,15 @@ deploy_app() {
 backup_db() {
     print_status "Fazendo backup do banco de dados..."
     
-    DATE=$(date +%Y%m%d_%H%M%S)
     BACKUP_DIR="/opt/backups"
     DB_FILE="db.sqlite3"
     
-    mkdir -p $BACKUP_DIR
-    
     if [ -f "$DB_FILE" ]; then
-        cp "$DB_FILE" "$BACKUP_DIR/db_backup_$DATE.sqlite3"
-        print_status "Backup criado: $BACKUP_DIR/db_backup_$DATE.sqlite3"
+        source venv/bin/activate
+        # API de backup do SQLite: cópia consistente sem parar a aplicação
+        # (um cp com workers escrevendo pode gerar um arquivo corrompido)
+        python manage.py backup_sqlite --output "$BACKUP_DIR" --keep 7
+        print_status "Backup criado em $BACKUP_DIR"
     else
         print_error "Arquivo de banco de dados não encontrado!"
     fi
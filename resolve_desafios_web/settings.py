@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'desafios.db_router.replica_pinning_middleware',
+    'desafios.memory_profiler.memory_profiling_middleware',
 ]
 
 ROOT_URLCONF = 'resolve_desafios_web.urls'
@@ -74,14 +77,61 @@ WSGI_APPLICATION = 'resolve_desafios_web.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# WAL deixa leitores e escritores trabalharem em paralelo. Com BEGIN IMMEDIATE
+# a transação pega o lock de escrita logo no início e espera até `timeout`
+# segundos por ele, em vez de falhar com "database is locked" ao tentar
+# promover uma leitura para escrita.
+SQLITE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA temp_store=MEMORY;'
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA mmap_size=134217728;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
 
+# Réplicas de leitura (desafios.db_router.ReplicaRouter): URLs no formato do
+# DATABASE_URL separadas por vírgula, ex.
+#   DATABASE_REPLICA_URLS=sqlite:////srv/app/replica.sqlite3
+#   DATABASE_REPLICA_URLS=postgres://app@replica1/app,postgres://app@replica2/app
+# Listagens, busca e detalhes leem de uma réplica; escritas vão ao primário.
+# Depois de escrever, o cliente lê do primário por REPLICA_LAG_TOLERANCE
+# segundos (cookie), tempo em que a réplica deve ter alcançado o primário.
+
+def replica_databases(urls):
+    """Monta as entradas replica_1, replica_2... de DATABASES a partir das URLs"""
+    import dj_database_url
+
+    replicas = {}
+    for number, url in enumerate((u.strip() for u in urls.split(',') if u.strip()), start=1):
+        config = dj_database_url.parse(url)
+        if config['ENGINE'] == 'django.db.backends.sqlite3':
+            # Só leitura: a cópia é atualizada por fora (sync_replicas)
+            config['OPTIONS'] = {'init_command': 'PRAGMA query_only=ON;', 'timeout': 20}
+        # Nos testes a réplica aponta para o banco de teste do primário
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica_{number}'] = config
+    return replicas
+
+
+DATABASES.update(replica_databases(os.environ.get('DATABASE_REPLICA_URLS', '')))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['desafios.db_router.ReplicaRouter']
+REPLICA_LAG_TOLERANCE = float(os.environ.get('REPLICA_LAG_TOLERANCE', '5'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -125,3 +175,67 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Análise assíncrona
+# Com ANALYZE_ASYNC=true (deploy ASGI), /analyze/ e /analyses/<id>/ usam as
+# views async, que aguardam o LLM sem ocupar um worker inteiro por requisição,
+# e /analyses/export/ transmite a partir de iteradores async.
+
+ANALYZE_ASYNC = os.environ.get('ANALYZE_ASYNC', 'false').lower() in ('1', 'true', 'yes')
+
+
+# Fila de escrita: persiste Challenge/Analysis por uma única thread por
+# processo, agrupando as escritas concorrentes em uma transação. Com
+# WRITE_QUEUE_LOCK_FILE os lotes dos vários processos se revezam por um flock
+# nesse arquivo (um writer ativo por vez na máquina).
+
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_BATCH_SIZE = 50
+WRITE_QUEUE_LOCK_FILE = None
+
+
+# Prazo das chamadas ao LLM por requisição, em segundos. Fica abaixo do
+# --timeout 30 do gunicorn para responder 504 antes de o worker ser morto.
+
+LLM_DEADLINE = float(os.environ.get('LLM_DEADLINE', '25'))
+
+
+# Tamanho máximo do corpo de /analyze/ (o nginx aceita até 10 MB). Enunciados
+# maiores que o orçamento de tokens (PROMPT_TOKEN_BUDGET) são compactados pelo
+# adapter; acima deste limite a requisição é recusada antes de ler o corpo.
+
+ANALYZE_MAX_BODY_BYTES = int(os.environ.get('ANALYZE_MAX_BODY_BYTES', 256 * 1024))
+
+
+# Circuit breaker do LLM (desafios.circuit_breaker): depois de FAILURE_THRESHOLD
+# falhas de indisponibilidade em FAILURE_WINDOW segundos, /analyze/ deixa de
+# chamar o OpenAI por RECOVERY_TIMEOUT segundos e serve a última análise salva.
+
+CIRCUIT_BREAKER = {
+    'FAILURE_THRESHOLD': 5,
+    'FAILURE_WINDOW': 60,
+    'RECOVERY_TIMEOUT': 30,
+}
+
+
+# Perfil de memória por requisição (desafios.memory_profiler), desligado por
+# padrão: amostra SAMPLE_RATE das requisições com tracemalloc e agrega, por
+# endpoint, a memória retida e a variação de RSS. O relatório de cada worker
+# fica em /debug/memory/ (header X-Debug-Token: TOKEN) e, com DUMP_DIR, é
+# gravado em DUMP_DIR/memory-<pid>.json a cada DUMP_EVERY requisições.
+# Rotas não resolvidas entram em "<unresolved>" e, passados MAX_ENDPOINTS
+# endpoints distintos, os demais são somados em "<other>". O tracemalloc vê o
+# processo inteiro: só requisições sem outra em andamento são amostradas, e a
+# amostra é descartada ("discarded" no relatório) se outra começar no meio.
+
+MEMORY_PROFILING = {
+    'ENABLED': os.environ.get('MEMORY_PROFILING', 'false').lower() in ('1', 'true', 'yes'),
+    'SAMPLE_RATE': float(os.environ.get('MEMORY_PROFILING_SAMPLE_RATE', '0.01')),
+    'FRAMES': 1,
+    'TOP': 10,
+    'DUMP_DIR': os.environ.get('MEMORY_PROFILING_DUMP_DIR') or None,
+    'DUMP_EVERY': 50,
+    'MAX_ENDPOINTS': 100,
+    'TOKEN': os.environ.get('MEMORY_PROFILING_TOKEN') or None,
+}
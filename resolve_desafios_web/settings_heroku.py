@@ -25,6 +25,8 @@ DATABASES = {
         default=os.environ.get('DATABASE_URL', 'sqlite:///db.sqlite3')
     )
 }
+DATABASES.update(replica_databases(os.environ.get('DATABASE_REPLICA_URLS', '')))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
 
 # Static files configuration
 STATIC_URL = '/static/'
@@ -68,9 +70,11 @@ LOGGING = {
     },
 }
 
-# Cache configuration (usando memória para Heroku)
+# Cache configuration - LRU em memória + SQLite compartilhado pelos workers do dyno
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'desafios.cache.TwoTierCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'TIMEOUT': 3600,
     }
 }
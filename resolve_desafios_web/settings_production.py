@@ -25,8 +25,17 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
+DATABASES.update(replica_databases(os.environ.get('DATABASE_REPLICA_URLS', '')))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Os 3 workers escrevem no mesmo arquivo: cada processo serializa suas
+# escritas em uma única thread (desafios.write_queue) e os lotes dos
+# processos se revezam pelo flock do arquivo de trava
+WRITE_QUEUE_ENABLED = True
+WRITE_QUEUE_LOCK_FILE = os.path.join(BASE_DIR, 'db.sqlite3.write-lock')
 
 # Para usar PostgreSQL (descomente se preferir)
 # DATABASES = {
@@ -79,10 +88,16 @@ LOGGING = {
     },
 }
 
-# Cache configuration (optional - using database cache)
+# Cache configuration - LRU em memória + SQLite compartilhado pelos workers
+# (arquivo separado do banco principal para não disputar o lock de escrita)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'cache_table',
+        'BACKEND': 'desafios.cache.TwoTierCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'L1_MAX_SIZE': 16 * 1024 * 1024,
+            'MAX_SIZE': 256 * 1024 * 1024,
+        },
     }
 }
@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resolve_desafios_web.settings')
 
 application = get_wsgi_application()
+
+# Carrega a pilha do LLM uma única vez. Com gunicorn --preload isso acontece no
+# master e as páginas são compartilhadas copy-on-write entre os workers;
+# gc.freeze() evita que o coletor as toque (e copie) depois do fork.
+from desafios.services import warm_up  # noqa: E402
+
+warm_up()
+gc.freeze()
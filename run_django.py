@@ -4,11 +4,6 @@ Script para executar o servidor Django
 """
 
 import os
-import sys
-from pathlib import Path
-
-# Adiciona o diretório src ao path para importar os módulos
-sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 if __name__ == "__main__":
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resolve_desafios_web.settings')
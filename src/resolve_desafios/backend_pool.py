@@ -0,0 +1,237 @@
+"""
+Backend pool - vários endpoints/chaves compatíveis com OpenAI, escolhidos pelo
+menor número de requisições em andamento, ponderado pela saúde de cada um
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .hedging import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+# Peso das amostras novas nas médias móveis de latência e de erro
+EWMA_ALPHA = 0.2
+# Falhas seguidas que tiram o backend do pool
+EJECT_AFTER_FAILURES = 3
+# Taxa de erro (média móvel) que também ejeta, depois de MIN_REQUESTS_FOR_RATE chamadas
+EJECT_ERROR_RATE = 0.5
+MIN_REQUESTS_FOR_RATE = 10
+# Duração da ejeção: BASE * 2^(ejeções seguidas - 1), até MAX
+BASE_EJECTION = 5.0
+MAX_EJECTION = 120.0
+# Piso da latência no peso: abaixo disso a diferença é ruído
+MIN_LATENCY = 0.05
+# Latência assumida enquanto nenhum backend do pool tem amostras
+INITIAL_LATENCY = 1.0
+
+
+@dataclass(frozen=True)
+class BackendConfig:
+    """One OpenAI-compatible endpoint: base_url (None = OpenAI), key and model"""
+
+    base_url: Optional[str]
+    api_key: Optional[str]
+    model: str
+    name: str = ''
+
+    @property
+    def label(self) -> str:
+        return self.name or f"{self.base_url or 'openai'}/{self.model}"
+
+
+def backend_configs(settings) -> List[BackendConfig]:
+    """Backends from LLM_BACKENDS, or the single OPENAI_API_KEY backend when it is empty"""
+    if not settings.llm_backends:
+        return [BackendConfig(None, settings.openai_api_key, settings.openai_model)]
+    configs = []
+    for i, entry in enumerate(settings.llm_backends):
+        # api_key_env lê a chave de outra variável, sem colocá-la no JSON
+        api_key = entry.get('api_key') or (
+            os.getenv(entry['api_key_env']) if entry.get('api_key_env') else settings.openai_api_key
+        )
+        configs.append(BackendConfig(
+            base_url=entry.get('base_url') or None,
+            api_key=api_key,
+            model=entry.get('model') or settings.openai_model,
+            name=entry.get('name') or f"backend-{i + 1}",
+        ))
+    return configs
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Whether an error says something about the backend's health"""
+    # Cancelamento (hedge perdedor) não é falha
+    if not isinstance(error, Exception):
+        return False
+    # 4xx é problema da requisição, exceto timeout e rate limit
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class Backend:
+    """A backend's client plus the counters the router uses"""
+
+    def __init__(self, config: BackendConfig, client: Any):
+        self.config = config
+        self.client = client
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+        self.consecutive_failures = 0
+        self.ejection_streak = 0
+        self.ejected_until = 0.0
+        self.error_rate = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.latency = LatencyTracker()
+
+    def weight(self, default_latency: float = INITIAL_LATENCY) -> float:
+        """Health: lower for slow or failing backends (never zero)"""
+        latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+        return max(1.0 - self.error_rate, 0.05) ** 2 / max(latency, MIN_LATENCY)
+
+    def ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+
+class BackendPool:
+    """Least-outstanding-requests router weighted by recent latency and error rate.
+
+    A backend that fails EJECT_AFTER_FAILURES times in a row (or whose error
+    rate passes EJECT_ERROR_RATE) leaves the pool for an exponentially growing
+    period; a failed call is retried once on another backend.
+    """
+
+    def __init__(self, backends: Sequence[Backend], max_attempts: int = 2):
+        if not backends:
+            raise ValueError("O pool precisa de pelo menos um backend")
+        self.backends = list(backends)
+        self.max_attempts = max(1, min(max_attempts, len(self.backends)))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def acquire(self, exclude: Sequence[Backend] = ()) -> Backend:
+        """Pick a backend and count the request as outstanding"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [b for b in self.backends if b not in exclude] or self.backends
+            available = [b for b in candidates if not b.ejected(now)]
+            if not available:
+                # Todos ejetados: tenta o que volta primeiro em vez de falhar sem chamar
+                available = [min(candidates, key=lambda b: b.ejected_until)]
+            default = self._default_latency()
+            scores = [(b.outstanding + 1) / b.weight(default) for b in available]
+            best = min(scores)
+            # Empates (pool novo, sem amostras) são sorteados para não concentrar no primeiro
+            backend = random.choice([b for b, score in zip(available, scores) if score <= best * 1.0001])
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _default_latency(self) -> float:
+        # Backend sem amostras entra com a latência média dos outros, nem melhor nem pior
+        samples = [b.latency_ewma for b in self.backends if b.latency_ewma is not None]
+        return sum(samples) / len(samples) if samples else INITIAL_LATENCY
+
+    def release(self, backend: Backend, elapsed: float, failed: bool) -> None:
+        """Record the outcome of a request started with acquire()"""
+        with self._lock:
+            backend.outstanding -= 1
+            backend.error_rate += EWMA_ALPHA * (float(failed) - backend.error_rate)
+            if not failed:
+                backend.consecutive_failures = 0
+                backend.ejection_streak = 0
+                backend.latency_ewma = elapsed if backend.latency_ewma is None else (
+                    backend.latency_ewma + EWMA_ALPHA * (elapsed - backend.latency_ewma)
+                )
+                backend.latency.record(elapsed)
+                return
+            backend.errors += 1
+            backend.consecutive_failures += 1
+            too_many = backend.consecutive_failures >= EJECT_AFTER_FAILURES or (
+                backend.requests >= MIN_REQUESTS_FOR_RATE and backend.error_rate >= EJECT_ERROR_RATE
+            )
+            if too_many and not backend.ejected(time.monotonic()):
+                self._eject(backend)
+
+    def _eject(self, backend: Backend) -> None:
+        backend.ejection_streak += 1
+        backend.ejections += 1
+        duration = min(MAX_EJECTION, BASE_EJECTION * 2 ** (backend.ejection_streak - 1))
+        backend.ejected_until = time.monotonic() + duration
+        # Na volta, uma única falha já ejeta de novo (por mais tempo)
+        backend.consecutive_failures = EJECT_AFTER_FAILURES - 1
+        logger.warning("Backend %s ejetado por %.0fs (taxa de erro %.0f%%)",
+                       backend.config.label, duration, backend.error_rate * 100)
+
+    def run(self, call: Callable[[Backend], Any], deadline=None) -> Any:
+        """Run call(backend) on the best backend, retrying on another one if it fails"""
+        tried = []
+        while True:
+            backend = self.acquire(exclude=tried)
+            started = time.monotonic()
+            try:
+                result = call(backend)
+            except BaseException as error:
+                failed = is_backend_failure(error)
+                self.release(backend, time.monotonic() - started, failed)
+                tried.append(backend)
+                if not failed or len(tried) >= self.max_attempts or (deadline and deadline.expired()):
+                    raise
+                logger.warning("Backend %s falhou (%s); tentando outro", backend.config.label, error)
+                continue
+            self.release(backend, time.monotonic() - started, failed=False)
+            return result
+
+    async def arun(self, call: Callable[[Backend], Awaitable[Any]], deadline=None) -> Any:
+        """Async version of run"""
+        tried = []
+        while True:
+            backend = self.acquire(exclude=tried)
+            started = time.monotonic()
+            try:
+                result = await call(backend)
+            except BaseException as error:
+                failed = is_backend_failure(error)
+                self.release(backend, time.monotonic() - started, failed)
+                tried.append(backend)
+                if not failed or len(tried) >= self.max_attempts or (deadline and deadline.expired()):
+                    raise
+                logger.warning("Backend %s falhou (%s); tentando outro", backend.config.label, error)
+                continue
+            self.release(backend, time.monotonic() - started, failed=False)
+            return result
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-backend metrics (no API keys)"""
+        with self._lock:
+            now = time.monotonic()
+            default = self._default_latency()
+            return [
+                {
+                    'name': b.config.label,
+                    'base_url': b.config.base_url,
+                    'model': b.config.model,
+                    'outstanding': b.outstanding,
+                    'requests': b.requests,
+                    'errors': b.errors,
+                    'error_rate': round(b.error_rate, 3),
+                    'latency_ewma': b.latency_ewma,
+                    'p50': b.latency.percentile(50),
+                    'p95': b.latency.percentile(95),
+                    'weight': round(b.weight(default), 3),
+                    'ejected_for': round(b.ejected_until - now, 1) if b.ejected(now) else 0.0,
+                    'ejections': b.ejections,
+                }
+                for b in self.backends
+            ]
@@ -0,0 +1,228 @@
+"""
+CLI - análise de desafios sem o Django, com cache local em Settings.db_path
+"""
+
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import typer
+
+from .config import get_settings
+from .store import STAGE_CLASSIFIED, STAGE_COMPLETE, AnalysisStore, SchemaVersionError, challenge_key
+
+# A pilha do LLM (langchain/OpenAI) só é importada quando há desafio fora do
+# cache, para a consulta de resultados já salvos iniciar rápido. O rich (~40ms
+# de import) também fica para quando algo é impresso, e o --help usa o
+# formatador do click em vez do rich (rich_markup_mode=None).
+
+CHALLENGE_SUFFIXES = {".md", ".txt", ".json", ".jsonl"}
+CHALLENGE_FIELDS = ("title", "description", "objectives", "constraints")
+
+app = typer.Typer(help="Análise de desafios de programação com IA", add_completion=False, rich_markup_mode=None)
+
+
+@lru_cache(maxsize=None)
+def _console(stderr: bool = False):
+    from rich.console import Console
+
+    return Console(stderr=stderr)
+
+
+def _read_text_challenge(path: Path) -> Dict[str, str]:
+    """Primeira linha não vazia é o título (sem '#'); o resto é o enunciado"""
+    lines = path.read_text(encoding="utf-8").strip().splitlines()
+    if not lines:
+        raise ValueError(f"{path}: arquivo vazio")
+    return {"title": lines[0].lstrip("#").strip(), "description": "\n".join(lines[1:]).strip()}
+
+
+def _normalize_challenge(data, source: str) -> Dict[str, str]:
+    if not isinstance(data, dict) or not data.get("title") or not data.get("description"):
+        raise ValueError(f"{source}: desafio precisa de 'title' e 'description'")
+    return {field: str(data.get(field) or "") for field in CHALLENGE_FIELDS}
+
+
+def load_challenges(path: Path) -> List[Dict[str, str]]:
+    """Desafios de um arquivo .md/.txt/.json/.jsonl ou dos arquivos de um diretório"""
+    if path.is_dir():
+        challenges = []
+        for child in sorted(path.iterdir()):
+            if child.is_file() and child.suffix in CHALLENGE_SUFFIXES:
+                challenges.extend(load_challenges(child))
+        return challenges
+    if path.suffix == ".jsonl":
+        return [
+            _normalize_challenge(json.loads(line), f"{path}:{number}")
+            for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1)
+            if line.strip()
+        ]
+    if path.suffix == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        items = data if isinstance(data, list) else [data]
+        return [_normalize_challenge(item, str(path)) for item in items]
+    return [_normalize_challenge(_read_text_challenge(path), str(path))]
+
+
+def _build_adapter(fake: Optional[float]):
+    if fake is not None:
+        from .fake_llm_adapter import FakeLLMAdapter
+
+        return FakeLLMAdapter(fake)
+    from .llm_adapter import OpenAILLMAdapter
+
+    return OpenAILLMAdapter()
+
+
+def _analyze_one(adapter, taxonomy_summary: str, challenge: Dict[str, str],
+                 cached: Optional[Dict], solution: bool) -> Dict:
+    """Roda só as etapas que faltam no cache"""
+    if cached is not None:
+        result = cached["result"]
+    else:
+        result = adapter.analyze_challenge(
+            title=challenge["title"],
+            description=challenge["description"],
+            objectives=challenge["objectives"],
+            constraints=challenge["constraints"],
+            taxonomy_summary=taxonomy_summary,
+        )
+    if solution:
+        result = {**result, **adapter.generate_solution(
+            title=challenge["title"],
+            description=challenge["description"],
+            objectives=challenge["objectives"],
+            constraints=challenge["constraints"],
+            classification=result,
+        )}
+    return result
+
+
+def _print_table(rows: List[Dict]) -> None:
+    from rich.table import Table
+
+    table = Table(show_lines=False)
+    table.add_column("Desafio", overflow="fold")
+    table.add_column("Dificuldade")
+    table.add_column("Categorias", overflow="fold")
+    table.add_column("Tempo")
+    table.add_column("Origem")
+    for row in rows:
+        result = row.get("result") or {}
+        table.add_row(
+            row["title"],
+            result.get("difficulty", "-"),
+            ", ".join(result.get("categories", [])),
+            result.get("complexity_time", "-"),
+            row["source"] if not row.get("error") else f"[red]erro: {row['error']}[/red]",
+        )
+    _console().print(table)
+
+
+def _open_store(db_path) -> AnalysisStore:
+    try:
+        return AnalysisStore(db_path)
+    except SchemaVersionError as e:
+        _console(stderr=True).print(f"[red]{e}[/red]")
+        raise typer.Exit(2)
+
+
+@app.command()
+def analyze(
+    paths: List[Path] = typer.Argument(..., exists=True, help="Arquivos .md/.txt/.json/.jsonl ou diretórios"),
+    workers: int = typer.Option(4, "--workers", "-w", min=1, help="Chamadas ao LLM em paralelo"),
+    solution: bool = typer.Option(False, "--solution", help="Também gera a solução recomendada"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignora o cache e analisa de novo"),
+    as_json: bool = typer.Option(False, "--json", help="Imprime um JSON por linha em vez da tabela"),
+    fake: Optional[float] = typer.Option(None, "--fake", help="Usa o LLM simulado com esta latência (s)"),
+):
+    """Analisa desafios, reaproveitando o cache local"""
+    settings = get_settings()
+    model = f"fake-{fake}" if fake is not None else settings.openai_model
+    try:
+        challenges = [challenge for path in paths for challenge in load_challenges(path)]
+    except (OSError, ValueError) as e:
+        _console(stderr=True).print(f"[red]{e}[/red]")
+        raise typer.Exit(2)
+
+    store = _open_store(settings.db_path)
+    rows, pending = [], []
+    for challenge in challenges:
+        key = challenge_key(challenge, model, settings.app_language)
+        cached = None if refresh else store.get(key)
+        row = {"title": challenge["title"], "key": key, "source": "cache",
+               "result": cached and cached["result"]}
+        rows.append(row)
+        if cached is None or (solution and cached["stage"] != STAGE_COMPLETE):
+            pending.append((row, challenge, cached))
+
+    if pending:
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        try:
+            adapter = _build_adapter(fake)
+        except RuntimeError as e:
+            _console(stderr=True).print(f"[red]{e}[/red]")
+            raise typer.Exit(1)
+        from .taxonomy_adapter import FileTaxonomyAdapter
+
+        taxonomy_summary = FileTaxonomyAdapter().summarize_taxonomy_for_prompt()
+        with ThreadPoolExecutor(max_workers=workers) as executor, _console(stderr=True).status(
+            f"Analisando {len(pending)} desafio(s)..."
+        ):
+            futures = {
+                executor.submit(_analyze_one, adapter, taxonomy_summary, challenge, cached, solution): row
+                for row, challenge, cached in pending
+            }
+            # Grava na thread principal: uma única conexão com o SQLite
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    row["result"] = future.result()
+                except Exception as e:
+                    row["error"] = str(e) or type(e).__name__
+                    continue
+                # Com vários backends, o modelo que de fato respondeu
+                row["source"] = row["result"].get("model") or model
+                store.put(row["key"], row["source"], STAGE_COMPLETE if solution else STAGE_CLASSIFIED, row["result"])
+    store.close()
+
+    if as_json:
+        for row in rows:
+            sys.stdout.write(json.dumps(
+                {"title": row["title"], "source": row["source"], "result": row.get("result"),
+                 "error": row.get("error")},
+                ensure_ascii=False,
+            ) + "\n")
+    else:
+        _print_table(rows)
+    if any(row.get("error") for row in rows):
+        raise typer.Exit(1)
+
+
+@app.command()
+def history(limit: int = typer.Option(20, "--limit", "-n", min=1, help="Quantidade de análises")):
+    """Lista as análises mais recentes do cache local"""
+    store = _open_store(get_settings().db_path)
+    entries = store.recent(limit)
+    store.close()
+    _print_table([
+        {"title": entry["result"].get("title", ""), "source": f"{entry['model']} ({entry['stage']})",
+         "result": entry["result"]}
+        for entry in entries
+    ])
+
+
+@app.command("clear-cache")
+def clear_cache():
+    """Apaga todas as análises do cache local"""
+    store = _open_store(get_settings().db_path)
+    removed = store.clear()
+    store.close()
+    _console().print(f"{removed} análise(s) removida(s)")
+
+
+def main() -> None:
+    app()
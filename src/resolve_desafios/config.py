@@ -1,9 +1,8 @@
+import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-
-from dotenv import load_dotenv
+from typing import List, Optional
 
 
 @dataclass
@@ -12,6 +11,9 @@ class Settings:
     openai_model: str
     db_path: Path
     app_language: str
+    prompt_token_budget: int = 6000
+    # Pool de backends compatíveis com OpenAI (ver backend_pool); vazio = só OPENAI_API_KEY
+    llm_backends: List[dict] = field(default_factory=list)
 
 
 _CACHED_SETTINGS: Optional[Settings] = None
@@ -31,12 +33,17 @@ def get_settings() -> Settings:
     if _CACHED_SETTINGS is not None:
         return _CACHED_SETTINGS
 
+    # Import tardio: o python-dotenv pesa na partida do CLI
+    from dotenv import load_dotenv
+
     load_dotenv(override=False)
 
     openai_api_key = _coalesce_env_str("OPENAI_API_KEY")
     openai_model = _coalesce_env_str("OPENAI_MODEL", "gpt-4o-mini") or "gpt-4o-mini"
     db_path_env = _coalesce_env_str("RESOLVE_DB_PATH", "./data/resolve_desafios.db") or "./data/resolve_desafios.db"
     app_language = _coalesce_env_str("APP_LANGUAGE", "pt-BR") or "pt-BR"
+    prompt_token_budget = int(_coalesce_env_str("PROMPT_TOKEN_BUDGET", "6000"))
+    llm_backends = _parse_backends(_coalesce_env_str("LLM_BACKENDS"))
 
     db_path = Path(db_path_env).expanduser().resolve()
     ensure_app_dirs(db_path)
@@ -46,10 +53,25 @@ def get_settings() -> Settings:
         openai_model=openai_model,
         db_path=db_path,
         app_language=app_language,
+        prompt_token_budget=prompt_token_budget,
+        llm_backends=llm_backends,
     )
     return _CACHED_SETTINGS
 
 
+def _parse_backends(raw: Optional[str]) -> List[dict]:
+    # LLM_BACKENDS='[{"base_url": "http://localhost:8000/v1", "api_key": "local", "model": "qwen"}, ...]'
+    if not raw:
+        return []
+    try:
+        backends = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"LLM_BACKENDS não é um JSON válido: {e}") from e
+    if not isinstance(backends, list) or not all(isinstance(backend, dict) for backend in backends):
+        raise RuntimeError("LLM_BACKENDS deve ser uma lista de objetos {base_url, api_key, model}")
+    return backends
+
+
 def ensure_app_dirs(db_path: Path) -> None:
     data_dir = db_path.parent
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,96 @@
+"""
+Fake LLM Adapter - Implementação local para benchmarks e testes de carga
+"""
+
+import asyncio
+import time
+
+
+class FakeLLMAdapter:
+    """Adapter que simula a latência do OpenAI sem chamadas de rede"""
+
+    def __init__(self, latency: float = 1.0):
+        self.latency = latency
+
+    def analyze_challenge(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        taxonomy_summary: str,
+        deadline=None,
+    ):
+        """Simulate a blocking LLM call"""
+        time.sleep(self.latency)
+        return self._build_classification(title)
+
+    async def aanalyze_challenge(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        taxonomy_summary: str,
+        deadline=None,
+    ):
+        """Simulate a non-blocking LLM call"""
+        await asyncio.sleep(self.latency)
+        return self._build_classification(title)
+
+    def generate_solution(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        classification: dict,
+        deadline=None,
+    ):
+        """Simulate a blocking solution-stage call"""
+        time.sleep(self.latency)
+        return self._build_solution()
+
+    async def agenerate_solution(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        classification: dict,
+        deadline=None,
+    ):
+        """Simulate a non-blocking solution-stage call"""
+        await asyncio.sleep(self.latency)
+        return self._build_solution()
+
+    def _build_classification(self, title: str) -> dict:
+        """Build a deterministic classification result"""
+        return {
+            'title': title,
+            'summary': f"Resumo simulado para {title}",
+            'categories': ["Arrays", "Hash Table"],
+            'difficulty': "MEDIO",
+            'approaches': [
+                {
+                    'name': "Hash Map",
+                    'algorithms': ["Hash Map"],
+                    'description': "Indexa os elementos em uma tabela hash.",
+                    'steps': ["Percorrer o vetor", "Consultar a tabela"],
+                    'time_complexity': "O(n)",
+                    'space_complexity': "O(n)",
+                }
+            ],
+            'recommended_approach': "Hash Map",
+            'complexity_time': "O(n)",
+            'complexity_space': "O(n)",
+            'assumptions': "Entrada cabe em memória.",
+            'model': f"fake-{self.latency}",
+        }
+
+    def _build_solution(self) -> dict:
+        """Build a deterministic solution result"""
+        return {
+            'recommended_solution': "def solve(nums):\n    return sorted(nums)\n",
+            'references': "Cormen et al., Introduction to Algorithms.",
+        }
@@ -0,0 +1,237 @@
+"""
+Hedging - prazos por requisição e chamadas duplicadas depois do p95
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Abaixo disso não vale a pena disparar uma segunda chamada
+MIN_HEDGE_BUDGET = 1.0
+# Atraso do hedge enquanto não há amostras suficientes para estimar o p95
+DEFAULT_HEDGE_DELAY = 8.0
+MIN_SAMPLES = 20
+
+
+class LLMTimeoutError(TimeoutError):
+    """The LLM did not answer before the request deadline"""
+
+    def __init__(self, stage: str, budget: float):
+        self.stage = stage
+        self.budget = budget
+        super().__init__(f"Prazo de {budget:.1f}s esgotado aguardando o LLM ({stage})")
+
+
+class Deadline:
+    """Absolute deadline for a request, measured on the monotonic clock"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))]
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            enough = len(self._samples) >= MIN_SAMPLES
+        return self.percentile(95) if enough else DEFAULT_HEDGE_DELAY
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgeMetrics:
+    """Per-process counters: how often we hedge and how often the hedge wins"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.latency: Dict[str, LatencyTracker] = {}
+
+    def tracker(self, stage: str) -> LatencyTracker:
+        with self._lock:
+            return self.latency.setdefault(stage, LatencyTracker())
+
+    def count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = dict(self.latency)
+            data = {
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'timeouts': self.timeouts,
+            }
+        data['hedge_rate'] = data['hedged'] / data['calls'] if data['calls'] else 0.0
+        data['win_rate'] = data['hedge_wins'] / data['hedged'] if data['hedged'] else 0.0
+        data['latency'] = {
+            stage: {'samples': len(tracker), 'p50': tracker.percentile(50), 'p95': tracker.percentile(95)}
+            for stage, tracker in stages.items()
+        }
+        return data
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Threads não sobrevivem ao fork do gunicorn
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def run_hedged(
+    call: Callable[[], Any],
+    stage: str,
+    metrics: HedgeMetrics,
+    deadline: Optional[Deadline] = None,
+) -> Any:
+    """Run call(), firing a second attempt once the first exceeds the stage p95.
+
+    The first successful attempt wins. A losing attempt cannot be interrupted
+    in a thread; it is abandoned and ends on its own HTTP timeout.
+    """
+    tracker = metrics.tracker(stage)
+    remaining = deadline.remaining if deadline else (lambda: None)
+    if deadline and deadline.expired():
+        metrics.count(calls=1, timeouts=1)
+        raise LLMTimeoutError(stage, deadline.budget)
+
+    executor = _get_executor()
+    metrics.count(calls=1)
+    started = {}
+
+    def submit():
+        future = executor.submit(call)
+        started[future] = time.monotonic()
+        return future
+
+    primary = submit()
+    pending = {primary}
+    delay = tracker.hedge_delay()
+    budget = remaining()
+    done, pending = wait(pending, timeout=delay if budget is None else min(delay, budget))
+    if not done and (budget is None or remaining() > MIN_HEDGE_BUDGET):
+        metrics.count(hedged=1)
+        pending.add(submit())
+
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                tracker.record(time.monotonic() - started[future])
+                if future is not primary:
+                    metrics.count(hedge_wins=1)
+                return future.result()
+            error = error or future.exception()
+        if not pending:
+            raise error
+        budget = remaining()
+        if budget is not None and budget <= 0:
+            break
+        done, pending = wait(pending, timeout=budget, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+
+    for loser in pending:
+        loser.cancel()
+    metrics.count(timeouts=1)
+    raise LLMTimeoutError(stage, deadline.budget)
+
+
+async def arun_hedged(
+    call: Callable[[], Awaitable[Any]],
+    stage: str,
+    metrics: HedgeMetrics,
+    deadline: Optional[Deadline] = None,
+) -> Any:
+    """Async version of run_hedged; the losing attempt is cancelled"""
+    tracker = metrics.tracker(stage)
+    remaining = deadline.remaining if deadline else (lambda: None)
+    if deadline and deadline.expired():
+        metrics.count(calls=1, timeouts=1)
+        raise LLMTimeoutError(stage, deadline.budget)
+
+    metrics.count(calls=1)
+    started = {}
+
+    def submit():
+        task = asyncio.ensure_future(call())
+        started[task] = time.monotonic()
+        return task
+
+    primary = submit()
+    pending = {primary}
+    try:
+        delay = tracker.hedge_delay()
+        budget = remaining()
+        done, pending = await asyncio.wait(pending, timeout=delay if budget is None else min(delay, budget))
+        if not done and (budget is None or remaining() > MIN_HEDGE_BUDGET):
+            metrics.count(hedged=1)
+            pending.add(submit())
+
+        error = None
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    tracker.record(time.monotonic() - started[task])
+                    if task is not primary:
+                        metrics.count(hedge_wins=1)
+                    return task.result()
+                error = error or task.exception()
+            if not pending:
+                raise error
+            budget = remaining()
+            if budget is not None and budget <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=budget, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+
+        metrics.count(timeouts=1)
+        raise LLMTimeoutError(stage, deadline.budget)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -2,27 +2,62 @@
 LLM Adapter - Implementação para análise com OpenAI
 """
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .backend_pool import Backend, BackendPool, backend_configs
 from .config import get_settings
+from .hedging import HedgeMetrics, arun_hedged, run_hedged
+from .prompt_budget import PromptBudgeter
+from .structured_output import IncrementalJSONParser, StructuredOutputError, invalid_fields, repair_output
+
+logger = logging.getLogger(__name__)
+
+
+def import_llm_stack() -> None:
+    """Import the langchain/OpenAI stack eagerly (before forking workers)"""
+    import langchain_core.messages  # noqa: F401
+    import langchain_openai  # noqa: F401
+
+    from . import schemas  # noqa: F401
 
 
 class OpenAILLMAdapter:
     """Adapter para OpenAI LLM operations"""
 
-    def __init__(self):
+    def __init__(self, backends=None):
         self.settings = get_settings()
-        
-        if not self.settings.openai_api_key:
-            raise RuntimeError(
-                "OPENAI_API_KEY não definido. Configure o arquivo .env (veja env.example)."
-            )
+        # backends: lista de BackendConfig; por padrão vem de LLM_BACKENDS / OPENAI_API_KEY
+        configs = backends if backends is not None else backend_configs(self.settings)
+        for config in configs:
+            if not config.api_key:
+                raise RuntimeError(
+                    f"Sem chave de API para o backend {config.label}. "
+                    "Configure OPENAI_API_KEY ou LLM_BACKENDS no arquivo .env (veja env.example)."
+                )
 
-        self.llm = ChatOpenAI(
-            api_key=self.settings.openai_api_key,
-            model=self.settings.openai_model,
-            temperature=0.2,
-        )
+        from langchain_openai import ChatOpenAI
+
+        pooled = len(configs) > 1
+        self.pool = BackendPool([
+            Backend(config, ChatOpenAI(
+                api_key=config.api_key,
+                base_url=config.base_url,
+                model=config.model,
+                temperature=0.2,
+                # Com mais de um backend o pool refaz a chamada em outro, não no mesmo
+                **({'max_retries': 0} if pooled else {}),
+            ))
+            for config in configs
+        ])
+        # ok / repaired / followup / failed - quantas saídas precisaram de reparo
+        self.output_stats = Counter()
+        self.hedge_metrics = HedgeMetrics()
+        self.budgeter = PromptBudgeter(self.settings.prompt_token_budget)
+        self.prompt_stats = Counter()
 
     def analyze_challenge(
         self,
@@ -31,11 +66,95 @@ class OpenAILLMAdapter:
         objectives: str,
         constraints: str,
         taxonomy_summary: str,
+        deadline=None,
+    ):
+        """Analyze a challenge using OpenAI (classification stage only)"""
+        description, objectives, constraints = self._fit_budget(description, objectives, constraints, deadline)
+        schema, messages = self._prepare_classification_request(
+            title=title,
+            description=description,
+            objectives=objectives,
+            constraints=constraints,
+            taxonomy_summary=taxonomy_summary,
+        )
+        result, model = self._invoke_structured(schema, messages, deadline)
+        return self._classification_to_dict(result, model)
+
+    async def aanalyze_challenge(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        taxonomy_summary: str,
+        deadline=None,
     ):
-        """Analyze a challenge using OpenAI"""
-        from .schemas import AnalysisOutput
+        """Analyze a challenge using OpenAI without blocking the event loop"""
+        description, objectives, constraints = await self._afit_budget(description, objectives, constraints, deadline)
+        schema, messages = self._prepare_classification_request(
+            title=title,
+            description=description,
+            objectives=objectives,
+            constraints=constraints,
+            taxonomy_summary=taxonomy_summary,
+        )
+        result, model = await self._ainvoke_structured(schema, messages, deadline)
+        return self._classification_to_dict(result, model)
 
-        structured_llm = self.llm.with_structured_output(AnalysisOutput)
+    def generate_solution(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        classification: dict,
+        deadline=None,
+    ):
+        """Generate the recommended solution and references for a classified challenge"""
+        description, objectives, constraints = self._fit_budget(description, objectives, constraints, deadline)
+        schema, messages = self._prepare_solution_request(
+            title=title,
+            description=description,
+            objectives=objectives,
+            constraints=constraints,
+            classification=classification,
+        )
+        result, _ = self._invoke_structured(schema, messages, deadline)
+        return self._solution_to_dict(result)
+
+    async def agenerate_solution(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        classification: dict,
+        deadline=None,
+    ):
+        """Generate the solution stage without blocking the event loop"""
+        description, objectives, constraints = await self._afit_budget(description, objectives, constraints, deadline)
+        schema, messages = self._prepare_solution_request(
+            title=title,
+            description=description,
+            objectives=objectives,
+            constraints=constraints,
+            classification=classification,
+        )
+        result, _ = await self._ainvoke_structured(schema, messages, deadline)
+        return self._solution_to_dict(result)
+
+    def _prepare_classification_request(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        taxonomy_summary: str,
+    ):
+        """Build the output schema and the message list for the classification stage"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        from .schemas import ClassificationOutput
 
         system_msg = SystemMessage(content=self._build_system_prompt(taxonomy_summary))
         human_msg = HumanMessage(
@@ -46,10 +165,248 @@ class OpenAILLMAdapter:
                 constraints=constraints,
             )
         )
+        return ClassificationOutput, [system_msg, human_msg]
+
+    def _prepare_solution_request(
+        self,
+        title: str,
+        description: str,
+        objectives: str,
+        constraints: str,
+        classification: dict,
+    ):
+        """Build the output schema and the message list for the solution stage"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        from .schemas import SolutionOutput
+
+        system_msg = SystemMessage(content=self._build_solution_system_prompt())
+        human_msg = HumanMessage(
+            content=self._build_human_prompt(
+                title=title,
+                description=description,
+                objectives=objectives,
+                constraints=constraints,
+            )
+            + "\n\n"
+            + self._build_classification_context(classification)
+        )
+        return SolutionOutput, [system_msg, human_msg]
+
+    def _fit_budget(self, description, objectives, constraints, deadline=None):
+        """Compact the user-provided sections to the prompt token budget"""
+        sections, pending, report = self.budgeter.compact(
+            {'description': description, 'objectives': objectives, 'constraints': constraints}
+        )
+        if pending:
+            # Seções longas demais são resumidas pelo modelo, em paralelo
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                futures = {
+                    name: pool.submit(self._summarize_section, sections[name], target, deadline)
+                    for name, target in pending.items()
+                }
+            for name, future in futures.items():
+                self._apply_summary(sections, name, future.exception() or future.result(), report)
+        return self._finish_budget(sections, report)
+
+    async def _afit_budget(self, description, objectives, constraints, deadline=None):
+        """Async version of _fit_budget"""
+        sections, pending, report = self.budgeter.compact(
+            {'description': description, 'objectives': objectives, 'constraints': constraints}
+        )
+        if pending:
+            summaries = await asyncio.gather(
+                *(self._asummarize_section(sections[name], target, deadline) for name, target in pending.items()),
+                return_exceptions=True,
+            )
+            for name, summary in zip(pending, summaries):
+                self._apply_summary(sections, name, summary, report)
+        return self._finish_budget(sections, report)
+
+    def _apply_summary(self, sections, name, summary, report) -> None:
+        """Use a section summary, or keep the section (truncated later) if it failed"""
+        if isinstance(summary, Exception):
+            logger.warning("Falha ao resumir a seção %s; ela será truncada", name, exc_info=summary)
+            return
+        sections[name] = summary
+        report['steps'].append(f"{name}: resumo")
+        self.prompt_stats['summarized'] += 1
+
+    def _finish_budget(self, sections, report):
+        sections, report = self.budgeter.finalize(sections, report)
+        self.prompt_stats['requests'] += 1
+        self.prompt_stats['tokens_before'] += report['tokens_before']
+        self.prompt_stats['tokens_saved'] += report['tokens_saved']
+        if report['tokens_saved']:
+            self.prompt_stats['compacted'] += 1
+            logger.info(
+                "Prompt compactado de %d para %d tokens (%s)",
+                report['tokens_before'], report['tokens_after'], "; ".join(report['steps']),
+            )
+        return sections['description'], sections['objectives'], sections['constraints']
+
+    def _summarize_section(self, text: str, target_tokens: int, deadline=None) -> str:
+        """Summarize one oversized section of the statement"""
+        messages = self._summary_messages(text, target_tokens)
+        response = self.pool.run(
+            lambda backend: backend.client.invoke(messages, **self._request_options(deadline)), deadline,
+        )
+        return response.content
+
+    async def _asummarize_section(self, text: str, target_tokens: int, deadline=None) -> str:
+        """Async version of _summarize_section"""
+        messages = self._summary_messages(text, target_tokens)
+        response = await self.pool.arun(
+            lambda backend: backend.client.ainvoke(messages, **self._request_options(deadline)), deadline,
+        )
+        return response.content
+
+    def _summary_messages(self, text: str, target_tokens: int):
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        return [
+            SystemMessage(content=(
+                "Resuma o trecho de enunciado de um problema de programação a seguir em no máximo "
+                f"{target_tokens} tokens. Preserve limites numéricos, formato de entrada e saída, "
+                "casos de borda e um exemplo curto. Não resolva o problema. Responda em PT-BR."
+            )),
+            HumanMessage(content=text),
+        ]
+
+    def _invoke_structured(self, schema, messages, deadline=None):
+        """Call the model and validate its output; returns (output, model that served the call)"""
+        model, raw = self._call_hedged(schema, messages, deadline)
+        data, missing = self._repair(schema, raw)
+        if missing:
+            patch_schema, patch_messages = self._prepare_followup(schema, data, missing, messages)
+            patch, _ = self._repair(patch_schema, self._call_hedged(patch_schema, patch_messages, deadline)[1])
+            data.update(patch)
+        return self._validate(schema, data, followup=bool(missing)), model
+
+    async def _ainvoke_structured(self, schema, messages, deadline=None):
+        """Async version of _invoke_structured"""
+        model, raw = await self._acall_hedged(schema, messages, deadline)
+        data, missing = self._repair(schema, raw)
+        if missing:
+            patch_schema, patch_messages = self._prepare_followup(schema, data, missing, messages)
+            patch, _ = self._repair(
+                patch_schema, (await self._acall_hedged(patch_schema, patch_messages, deadline))[1]
+            )
+            data.update(patch)
+        return self._validate(schema, data, followup=bool(missing)), model
+
+    def _call_hedged(self, schema, messages, deadline):
+        """One structured call, hedged after the stage p95 and bounded by the deadline"""
+        return run_hedged(
+            lambda: self._stream_arguments(schema, messages, deadline),
+            schema.__name__, self.hedge_metrics, deadline,
+        )
 
-        result: AnalysisOutput = structured_llm.invoke([system_msg, human_msg])
+    async def _acall_hedged(self, schema, messages, deadline):
+        """Async version of _call_hedged"""
+        return await arun_hedged(
+            lambda: self._astream_arguments(schema, messages, deadline),
+            schema.__name__, self.hedge_metrics, deadline,
+        )
+
+    def _request_options(self, deadline) -> dict:
+        """Per-request HTTP timeout so an abandoned attempt ends with the deadline"""
+        return {'timeout': deadline.remaining()} if deadline else {}
+
+    def _stream_arguments(self, schema, messages, deadline=None):
+        """Stream the tool-call arguments from the best backend in the pool: (model, arguments)"""
+        # O modelo vai junto do resultado: com hedge e retry, só a tentativa que
+        # venceu sabe qual backend respondeu
+        return self.pool.run(
+            lambda backend: (backend.config.model, self._stream_from(backend, schema, messages, deadline)),
+            deadline,
+        )
 
-        # Convert to simple dict structure
+    async def _astream_arguments(self, schema, messages, deadline=None):
+        """Async version of _stream_arguments"""
+        async def call(backend):
+            return backend.config.model, await self._astream_from(backend, schema, messages, deadline)
+
+        return await self.pool.arun(call, deadline)
+
+    def _stream_from(self, backend, schema, messages, deadline=None):
+        """Stream the tool-call arguments through the incremental parser"""
+        parser = IncrementalJSONParser()
+        llm = backend.client.bind_tools([schema], tool_choice=schema.__name__)
+        try:
+            for chunk in llm.stream(messages, **self._request_options(deadline)):
+                self._feed_tool_chunks(parser, chunk)
+        except Exception:
+            # Sem conteúdo não há o que reparar: propaga o erro original
+            if not parser.has_content:
+                raise
+            logger.warning("Streaming de %s interrompido; reparando saída parcial", schema.__name__, exc_info=True)
+        return parser.value()
+
+    async def _astream_from(self, backend, schema, messages, deadline=None):
+        """Async version of _stream_from"""
+        parser = IncrementalJSONParser()
+        llm = backend.client.bind_tools([schema], tool_choice=schema.__name__)
+        try:
+            async for chunk in llm.astream(messages, **self._request_options(deadline)):
+                self._feed_tool_chunks(parser, chunk)
+        except Exception:
+            if not parser.has_content:
+                raise
+            logger.warning("Streaming de %s interrompido; reparando saída parcial", schema.__name__, exc_info=True)
+        return parser.value()
+
+    def _feed_tool_chunks(self, parser, chunk) -> None:
+        """Feed the arguments of the first tool call in a streamed chunk"""
+        for call in getattr(chunk, 'tool_call_chunks', None) or []:
+            if call.get('index') in (0, None) and call.get('args'):
+                parser.feed(call['args'])
+
+    def _repair(self, schema, raw):
+        """Repair a parsed payload; returns (valid fields, fields still invalid)"""
+        data, repairs = repair_output(schema, raw)
+        data = {name: data[name] for name in schema.model_fields if name in data}
+        missing = invalid_fields(schema, data)
+        if repairs:
+            self.output_stats['repaired'] += 1
+            logger.info("Saída de %s reparada localmente: %s", schema.__name__, "; ".join(repairs))
+        for name in missing:
+            data.pop(name, None)
+        return data, missing
+
+    def _prepare_followup(self, schema, data, missing, messages):
+        """Build a follow-up request asking only for the fields still missing"""
+        from langchain_core.messages import HumanMessage
+        from pydantic import create_model
+
+        patch_schema = create_model(
+            f"{schema.__name__}Complement",
+            __doc__=f"Campos faltantes de {schema.__name__}",
+            **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in missing},
+        )
+        followup = HumanMessage(
+            content=(
+                "A resposta estruturada anterior veio incompleta. Campos já obtidos:\n"
+                f"{json.dumps(data, ensure_ascii=False)}\n\n"
+                f"Gere apenas os campos faltantes: {', '.join(missing)}."
+            )
+        )
+        self.output_stats['followup'] += 1
+        logger.info("Pedindo ao modelo só os campos faltantes de %s: %s", schema.__name__, ", ".join(missing))
+        return patch_schema, messages + [followup]
+
+    def _validate(self, schema, data, followup: bool = False):
+        """Validate the final payload or raise StructuredOutputError"""
+        missing = invalid_fields(schema, data)
+        if missing:
+            self.output_stats['failed'] += 1
+            raise StructuredOutputError(schema.__name__, missing)
+        if not followup:
+            self.output_stats['ok'] += 1
+        return schema.model_validate(data)
+
+    def _classification_to_dict(self, result, model: str) -> dict:
+        """Convert the classification output into a simple dict structure"""
         approaches = [
             {
                 'name': approach.name,
@@ -69,30 +426,46 @@ class OpenAILLMAdapter:
             'difficulty': result.difficulty,
             'approaches': approaches,
             'recommended_approach': result.recommended_approach,
-            'recommended_solution': result.recommended_solution,
             'complexity_time': result.complexity_time,
             'complexity_space': result.complexity_space,
             'assumptions': result.assumptions,
+            'model': model,
+        }
+
+    def _solution_to_dict(self, result) -> dict:
+        """Convert the solution output into a simple dict structure"""
+        return {
+            'recommended_solution': result.recommended_solution,
             'references': result.references,
         }
 
     def _build_system_prompt(self, taxonomy_summary: str) -> str:
-        """Build system prompt for LLM"""
+        """Build system prompt for the classification stage"""
         return (
             "Você é um assistente especialista em algoritmos e estruturas de dados, ajudando candidatos a entrevistas e competidores de programação.\n"
-            "Tarefas: classificar o desafio por categoria e dificuldade, listar abordagens plausíveis, avaliar complexidades em notação Big O, recomendar a melhor estratégia e fornecer uma solução completa.\n"
+            "Tarefas: classificar o desafio por categoria e dificuldade, listar abordagens plausíveis, avaliar complexidades em notação Big O e recomendar a melhor estratégia.\n"
             "Responda sempre em PT-BR, de forma concisa porém completa.\n\n"
             "Regras:\n"
             "- Use categorias e técnicas inspiradas em fontes canônicas (McDowell, Halim, Skiena, EPI, LeetCode).\n"
             "- Seja específico na análise de complexidade (tempo e espaço).\n"
             "- Considere restrições e objetivos antes de recomendar.\n"
             "- Mencione suposições quando necessário.\n"
-            "- Para a solução recomendada, forneça código limpo e bem comentado, seguido de explicação detalhada do algoritmo.\n"
-            "- Para as referências, inclua sempre: teoria do algoritmo, links da Wikipedia, livros clássicos da bibliografia (como 'Introduction to Algorithms' de Cormen, 'Algorithm Design Manual' de Skiena, 'Elements of Programming Interviews' de Aziz), e outras fontes relevantes para estudo aprofundado.\n\n"
+            "- Não escreva código: a solução completa é gerada em uma etapa posterior.\n\n"
             "Taxonomia (resumo):\n"
             f"{taxonomy_summary}\n"
         )
 
+    def _build_solution_system_prompt(self) -> str:
+        """Build system prompt for the solution stage"""
+        return (
+            "Você é um assistente especialista em algoritmos e estruturas de dados, ajudando candidatos a entrevistas e competidores de programação.\n"
+            "Tarefa: a partir da análise já feita, fornecer a solução completa da abordagem recomendada e referências de estudo.\n"
+            "Responda sempre em PT-BR, de forma concisa porém completa.\n\n"
+            "Regras:\n"
+            "- Para a solução recomendada, forneça código limpo e bem comentado, seguido de explicação detalhada do algoritmo.\n"
+            "- Para as referências, inclua sempre: teoria do algoritmo, links da Wikipedia, livros clássicos da bibliografia (como 'Introduction to Algorithms' de Cormen, 'Algorithm Design Manual' de Skiena, 'Elements of Programming Interviews' de Aziz), e outras fontes relevantes para estudo aprofundado.\n"
+        )
+
     def _build_human_prompt(
         self,
         title: str,
@@ -109,3 +482,14 @@ class OpenAILLMAdapter:
             "Produza a saída estruturada seguindo o esquema fornecido."
         )
 
+    def _build_classification_context(self, classification: dict) -> str:
+        """Summarize the classification stage for the solution prompt"""
+        return (
+            f"Análise prévia:\n"
+            f"Categorias: {', '.join(classification.get('categories') or [])}\n"
+            f"Dificuldade: {classification.get('difficulty', '-')}\n"
+            f"Abordagem recomendada: {classification.get('recommended_approach', '-')}\n"
+            f"Complexidade esperada: tempo {classification.get('complexity_time', '-')}, "
+            f"espaço {classification.get('complexity_space', '-')}\n"
+            f"Suposições: {classification.get('assumptions') or '-'}"
+        )
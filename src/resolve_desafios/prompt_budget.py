@@ -0,0 +1,220 @@
+"""
+Prompt budget - contagem local de tokens e compactação das entradas do prompt
+"""
+
+import re
+import threading
+from typing import Dict, List, Tuple
+
+# Blocos de exemplo (entrada/saída) maiores que isso são cortados no meio
+MAX_EXAMPLE_TOKENS = 200
+EXAMPLE_KEEP_LINES = 6
+# Nenhuma seção é reduzida abaixo disso pelo rateio do orçamento
+MIN_SECTION_TOKENS = 200
+
+TRUNCATION_MARK = "[... truncado para caber no orçamento de tokens]"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def _get_encoding():
+    # O tiktoken baixa o vocabulário na primeira vez; sem rede, usa a estimativa
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = None
+            _encoding_loaded = True
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate them when it is unavailable"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Estimativa: palavras longas viram vários tokens, pontuação conta um
+    return sum(max(1, len(token) // 4) for token in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, marking the cut"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip() + "\n" + TRUNCATION_MARK
+    # Sem tokenizer: busca binária no número de caracteres
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + "\n" + TRUNCATION_MARK
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces inside lines and runs of blank lines"""
+    lines, fenced = [], False
+    for line in text.splitlines():
+        if line.strip().startswith("```"):
+            fenced = not fenced
+        elif not fenced:
+            # A indentação do começo da linha é preservada (código, listas aninhadas)
+            indent = line[:len(line) - len(line.lstrip())]
+            line = indent + re.sub(r"[ \t\u00a0]+", " ", line.lstrip())
+        lines.append(line.rstrip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip("\n")
+
+
+def _split_blocks(text: str) -> List[str]:
+    # Blocos separados por linha em branco; blocos ``` ficam inteiros
+    blocks, current, fenced = [], [], False
+    for line in text.split("\n"):
+        if line.strip().startswith("```"):
+            fenced = not fenced
+        if not line.strip() and not fenced:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _looks_like_sample(block: str) -> bool:
+    """Sample I/O: fenced, labelled, or mostly digits/punctuation"""
+    head = block.lstrip().lower()
+    if head.startswith(("```", "exemplo", "example", "entrada", "input", "saída", "saida", "output")):
+        return True
+    letters = sum(char.isalpha() for char in block)
+    return len(block) > 80 and letters < len(block) * 0.3
+
+
+def _shorten_sample(block: str) -> str:
+    lines = block.split("\n")
+    if len(lines) <= 2 * EXAMPLE_KEEP_LINES:
+        return truncate_to_tokens(block, MAX_EXAMPLE_TOKENS)
+    fence = [lines[-1]] if lines[-1].strip().startswith("```") and lines[0].strip().startswith("```") else []
+    body = lines[:-1] if fence else lines
+    omitted = len(body) - 2 * EXAMPLE_KEEP_LINES
+    kept = body[:EXAMPLE_KEEP_LINES] + [f"... [{omitted} linhas omitidas] ..."] + body[-EXAMPLE_KEEP_LINES:]
+    return truncate_to_tokens("\n".join(kept + fence), MAX_EXAMPLE_TOKENS)
+
+
+def _opens_sample(block: str) -> bool:
+    return block.lstrip().lower().startswith(("```", "exemplo", "example"))
+
+
+def _segments(blocks: List[str]) -> List[Tuple[bool, List[str]]]:
+    # (é exemplo?, blocos). Um rótulo "Exemplo" ou uma cerca ``` abre um exemplo;
+    # blocos soltos de entrada/saída logo depois pertencem a ele
+    segments = []
+    for block in blocks:
+        is_sample = _looks_like_sample(block)
+        if is_sample and segments and segments[-1][0] and not _opens_sample(block):
+            segments[-1][1].append(block)
+        else:
+            segments.append((is_sample, [block]))
+    return segments
+
+
+def compact_section(text: str) -> Tuple[str, List[str]]:
+    """Local, deterministic compaction: whitespace, repeated blocks, large samples"""
+    steps = []
+    compacted = normalize_whitespace(text)
+    if compacted != text.strip("\n"):
+        steps.append("espaços")
+
+    seen, seen_samples, blocks, saved = set(), set(), [], 0
+    for is_sample, segment in _segments(_split_blocks(compacted)):
+        if is_sample:
+            # Só exemplos idênticos byte a byte (com a entrada) são removidos:
+            # exemplos distintos com a mesma saída são legítimos
+            key = "\n\n".join(segment)
+            if key in seen_samples:
+                saved += count_tokens(key)
+                continue
+            seen_samples.add(key)
+            for block in segment:
+                if count_tokens(block) > MAX_EXAMPLE_TOKENS:
+                    block = _shorten_sample(block)
+                    steps.append("exemplo grande")
+                blocks.append(block)
+            continue
+        block = segment[0]
+        key = block.strip().lower()
+        if key in seen:
+            steps.append("bloco repetido")
+            continue
+        seen.add(key)
+        blocks.append(block)
+    if saved:
+        steps.append(f"exemplo repetido ({saved} tokens)")
+    return "\n\n".join(blocks), steps
+
+
+class PromptBudgeter:
+    """Fits the user-provided sections of a prompt into a token budget.
+
+    compact() does the local work and tells which sections still need to be
+    summarized; finalize() hard-truncates whatever is still over its share.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+
+    def targets(self, sections: Dict[str, str]) -> Dict[str, int]:
+        """Budget share of each section, proportional to its size"""
+        sizes = {name: count_tokens(text) for name, text in sections.items()}
+        total = sum(sizes.values())
+        if total <= self.max_tokens:
+            return sizes
+        return {
+            name: max(MIN_SECTION_TOKENS, int(self.max_tokens * size / total)) if size else 0
+            for name, size in sizes.items()
+        }
+
+    def compact(self, sections: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, int], Dict]:
+        """Return (compacted sections, sections still over their share -> target, report)"""
+        report = {
+            'tokens_before': sum(count_tokens(text) for text in sections.values()),
+            'steps': [],
+        }
+        if report['tokens_before'] <= self.max_tokens:
+            # Dentro do orçamento o texto do usuário segue intacto
+            return {name: text or "" for name, text in sections.items()}, {}, report
+        compacted = {}
+        for name, text in sections.items():
+            compacted[name], steps = compact_section(text or "")
+            report['steps'].extend(f"{name}: {step}" for step in sorted(set(steps)))
+
+        pending = {}
+        if sum(count_tokens(text) for text in compacted.values()) > self.max_tokens:
+            for name, target in self.targets(compacted).items():
+                if count_tokens(compacted[name]) > target:
+                    pending[name] = target
+        return compacted, pending, report
+
+    def finalize(self, sections: Dict[str, str], report: Dict) -> Tuple[Dict[str, str], Dict]:
+        """Truncate sections still over budget and fill in the token counts"""
+        if sum(count_tokens(text) for text in sections.values()) > self.max_tokens:
+            targets = self.targets(sections)
+            sections = {name: truncate_to_tokens(text, targets[name]) for name, text in sections.items()}
+            report['steps'].append("truncado")
+        report['tokens_after'] = sum(count_tokens(text) for text in sections.values())
+        report['tokens_saved'] = max(0, report['tokens_before'] - report['tokens_after'])
+        return sections, report
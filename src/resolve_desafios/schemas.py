@@ -16,16 +16,24 @@ class Approach(BaseModel):
     space_complexity: str = Field(description="Complexidade espacial")
 
 
-class AnalysisOutput(BaseModel):
-    """Saída estruturada da análise"""
+class ClassificationOutput(BaseModel):
+    """Primeira etapa da análise: classificação, resumo e abordagens"""
     title: str = Field(description="Título do desafio")
     summary: str = Field(description="Resumo da análise")
     categories: List[str] = Field(description="Categorias do desafio")
     difficulty: Literal["FACIL", "MEDIO", "DIFICIL"] = Field(description="Nível de dificuldade")
     approaches: List[Approach] = Field(description="Abordagens possíveis")
     recommended_approach: str = Field(description="Abordagem recomendada")
-    recommended_solution: str = Field(description="Solução recomendada com código e explicação detalhada")
     complexity_time: str = Field(description="Complexidade temporal geral")
     complexity_space: str = Field(description="Complexidade espacial geral")
     assumptions: str = Field(description="Suposições feitas")
+
+
+class SolutionOutput(BaseModel):
+    """Segunda etapa da análise: solução e referências, geradas sob demanda"""
+    recommended_solution: str = Field(description="Solução recomendada com código e explicação detalhada")
     references: str = Field(description="Referências completas incluindo: teoria do algoritmo, links da Wikipedia, livros da bibliografia clássica de algoritmos, e outras fontes relevantes para estudo aprofundado")
+
+
+class AnalysisOutput(SolutionOutput, ClassificationOutput):
+    """Saída estruturada da análise completa"""
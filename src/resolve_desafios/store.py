@@ -0,0 +1,111 @@
+"""
+Analysis store - cache local das análises em SQLite (Settings.db_path)
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+STAGE_CLASSIFIED = "classified"
+STAGE_COMPLETE = "complete"
+
+# O arquivo padrão (data/resolve_desafios.db) já tem uma tabela "analyses" de
+# outro formato: as tabelas do cache levam o prefixo cli_. A versão do esquema
+# fica em PRAGMA user_version; cada migração leva o arquivo à versão seguinte.
+SCHEMA_VERSION = 1
+
+_MIGRATIONS = {
+    1: """
+CREATE TABLE IF NOT EXISTS cli_analyses (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    model TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cli_analyses_updated_at ON cli_analyses (updated_at DESC);
+""",
+}
+
+
+class SchemaVersionError(RuntimeError):
+    """The cache file was written by a newer version of the CLI"""
+
+
+def challenge_key(challenge: Dict[str, str], model: str, language: str) -> str:
+    """Content hash of a challenge; the same text with the same model hits the cache"""
+    parts = [model, language] + [
+        (challenge.get(field) or "").strip()
+        for field in ("title", "description", "objectives", "constraints")
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnalysisStore:
+    """Análises indexadas pelo hash do desafio, em um arquivo SQLite"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=20)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._migrate()
+        except Exception:
+            self._conn.close()
+            raise
+
+    def _migrate(self) -> None:
+        """Bring the file up to SCHEMA_VERSION"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise SchemaVersionError(
+                f"{self.db_path} usa o esquema {version}; esta versão conhece até o {SCHEMA_VERSION}"
+            )
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            # O user_version é transacional: a migração e a versão entram juntas
+            self._conn.executescript(
+                f"BEGIN IMMEDIATE;\n{_MIGRATIONS[target]}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT stage, result FROM cli_analyses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"stage": row[0], "result": json.loads(row[1])}
+
+    def put(self, key: str, model: str, stage: str, result: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO cli_analyses (key, title, model, stage, result, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET stage = excluded.stage, result = excluded.result, "
+                "updated_at = excluded.updated_at",
+                (key, result.get("title", ""), model, stage, json.dumps(result, ensure_ascii=False), now, now),
+            )
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT key, model, stage, result, updated_at FROM cli_analyses ORDER BY updated_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [
+            {"key": key, "model": model, "stage": stage, "result": json.loads(result), "updated_at": updated_at}
+            for key, model, stage, result, updated_at in rows
+        ]
+
+    def clear(self) -> int:
+        with self._conn:
+            return self._conn.execute("DELETE FROM cli_analyses").rowcount
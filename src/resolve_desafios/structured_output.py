@@ -0,0 +1,274 @@
+"""
+Structured output - parsing tolerante e reparo local da saída do LLM
+"""
+
+import json
+import typing
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+# Sinônimos aceitos para o campo difficulty (comparados sem acento/caixa)
+DIFFICULTY_SYNONYMS = {
+    "FACIL": ["facil", "easy", "simples", "simple", "beginner", "iniciante", "basico", "basic"],
+    "MEDIO": ["medio", "medium", "moderate", "moderado", "intermediate", "intermediario", "normal"],
+    "DIFICIL": ["dificil", "hard", "difficult", "advanced", "avancado", "expert", "complexo"],
+}
+
+# Campos que podem faltar sem pedir nada ao modelo
+OPTIONAL_DEFAULTS = {
+    "assumptions": "",
+    "references": "",
+    "algorithms": [],
+    "steps": [],
+}
+
+
+class StructuredOutputError(Exception):
+    """The model output could not be repaired into the expected schema"""
+
+    def __init__(self, schema_name: str, missing: List[str]):
+        self.schema_name = schema_name
+        self.missing = missing
+        super().__init__(f"Saída estruturada inválida em {schema_name}: {', '.join(missing)}")
+
+
+class IncrementalJSONParser:
+    """Incremental JSON scanner that can close a truncated document.
+
+    Chunks are scanned once as they arrive; close() returns the longest
+    valid prefix with open strings and containers closed, dropping only
+    a dangling key or unfinished literal (and trailing commas).
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._length = 0
+        self._stack: List[List[str]] = []  # [tipo do container, o que se espera a seguir]
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = 0
+        self._escape_start = 0
+        self._literal_start: Optional[int] = None
+        self._safe: Tuple[int, Tuple[str, ...]] = (0, ())
+        # Vírgulas seguidas de } ou ] (JSON inválido que modelos às vezes geram)
+        self._trailing_comma: Optional[int] = None
+        self._dropped: List[int] = []
+
+    @property
+    def has_content(self) -> bool:
+        return self._started
+
+    def feed(self, chunk: str) -> None:
+        pos = self._length
+        for char in chunk:
+            self._step(char, pos)
+            pos += 1
+        self._chunks.append(chunk)
+        self._length = pos
+
+    def _step(self, char: str, pos: int) -> None:
+        if self._done:
+            return
+        if not self._started and char not in "{[":
+            # Ignora texto antes do JSON (ex.: cercas ```json)
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = (4 if char == "u" else 0) if self._escape == -1 else self._escape - 1
+            elif char == "\\":
+                self._escape, self._escape_start = -1, pos
+            elif char == '"':
+                self._in_string = False
+                self._after_value(pos + 1, key=self._string_is_key)
+            return
+
+        if self._literal_start is not None:
+            if char not in "}],: \t\r\n":
+                return
+            self._literal_start = None
+            self._after_value(pos)
+
+        if char in " \t\r\n":
+            return
+        if char in "}]" and self._trailing_comma is not None:
+            self._dropped.append(self._trailing_comma)
+        self._trailing_comma = pos if char == "," else None
+        if char == '"':
+            frame = self._stack[-1] if self._stack else None
+            self._in_string = True
+            self._string_is_key = frame is not None and frame[0] == "{" and frame[1] == "key"
+        elif char in "{[":
+            self._started = True
+            self._stack.append([char, "key" if char == "{" else "value"])
+            self._mark_safe(pos + 1)
+        elif char in "}]":
+            if self._stack:
+                self._stack.pop()
+            self._after_value(pos + 1)
+        elif char == ":":
+            if self._stack:
+                self._stack[-1][1] = "value"
+        elif char == ",":
+            if self._stack:
+                self._stack[-1][1] = "key" if self._stack[-1][0] == "{" else "value"
+        else:
+            self._literal_start = pos
+
+    def _after_value(self, end: int, key: bool = False) -> None:
+        if not self._stack:
+            self._done = True
+            self._mark_safe(end)
+            return
+        if key:
+            self._stack[-1][1] = "colon"
+            return
+        self._stack[-1][1] = "comma"
+        self._mark_safe(end)
+
+    def _mark_safe(self, end: int) -> None:
+        self._safe = (end, tuple(frame[0] for frame in self._stack))
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join("}" if kind == "{" else "]" for kind in reversed(stack))
+
+    def close(self) -> Optional[str]:
+        """Return the repaired JSON text, or None if nothing was parsed"""
+        if not self._started:
+            return None
+        text = "".join(self._chunks)
+        if self._dropped:
+            # Troca as vírgulas sobrando por espaço: as posições continuam valendo
+            chars = list(text)
+            for pos in self._dropped:
+                chars[pos] = " "
+            text = "".join(chars)
+        if self._done:
+            return self._strip_prefix(text[:self._safe[0]])
+
+        stack = [frame[0] for frame in self._stack]
+        if self._in_string and not self._string_is_key and stack and stack[-1] == "{":
+            # Texto longo truncado (resumo, solução) ainda é útil: fecha as aspas,
+            # sem deixar um escape pela metade. Itens de lista parciais são descartados.
+            end = self._escape_start if self._escape else len(text)
+            return self._strip_prefix(text[:end]) + '"' + self._closers(stack)
+        if self._literal_start is not None and self._is_literal(text[self._literal_start:]):
+            return self._strip_prefix(text) + self._closers(stack)
+
+        cut, safe_stack = self._safe
+        return self._strip_prefix(text[:cut]) + self._closers(safe_stack)
+
+    @staticmethod
+    def _strip_prefix(text: str) -> str:
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+        return text[min(starts):] if starts else text
+
+    @staticmethod
+    def _is_literal(token: str) -> bool:
+        try:
+            json.loads(token)
+        except ValueError:
+            return False
+        return True
+
+    def value(self) -> Any:
+        """Parsed (possibly repaired) value, or None"""
+        text = self.close()
+        if text is None:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+
+def parse_partial_json(text: str) -> Any:
+    """Parse a complete or truncated JSON document"""
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    return parser.value()
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return text.strip().lower()
+
+
+def coerce_difficulty(value: Any) -> Any:
+    """Map difficulty synonyms (easy, Médio, hard...) to FACIL/MEDIO/DIFICIL"""
+    normalized = _normalize(value)
+    for canonical, synonyms in DIFFICULTY_SYNONYMS.items():
+        if normalized == canonical.lower() or normalized in synonyms:
+            return canonical
+    for canonical, synonyms in DIFFICULTY_SYNONYMS.items():
+        if any(synonym in normalized for synonym in synonyms):
+            return canonical
+    return value
+
+
+def repair_output(schema: Type[BaseModel], data: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """Coerce a parsed payload towards the schema; returns (data, repairs applied)"""
+    repairs: List[str] = []
+    return _repair_model(schema, data, repairs, ""), repairs
+
+
+def _repair_model(schema, data, repairs, path):
+    if not isinstance(data, dict):
+        return {}
+    data = dict(data)
+    for name, field in schema.model_fields.items():
+        if name not in data or data[name] is None:
+            if name in OPTIONAL_DEFAULTS:
+                data[name] = _copy(OPTIONAL_DEFAULTS[name])
+                repairs.append(f"{path}{name}: padrão")
+            continue
+        repaired = _repair_value(field.annotation, data[name], name, repairs, f"{path}{name}")
+        if repaired != data[name]:
+            repairs.append(f"{path}{name}: convertido")
+        data[name] = repaired
+    return data
+
+
+def _repair_value(annotation, value, name, repairs, path):
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Literal:
+        if value in args:
+            return value
+        return coerce_difficulty(value) if name == "difficulty" else value
+    if origin in (list, List):
+        item_type = args[0] if args else Any
+        if isinstance(value, str):
+            value = [line.strip(" -*\t") for line in value.splitlines() if line.strip()] if name == "steps" else [value]
+        elif isinstance(value, dict):
+            value = [value]
+        if not isinstance(value, list):
+            return value
+        return [_repair_value(item_type, item, name, repairs, f"{path}[{i}].") for i, item in enumerate(value)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _repair_model(annotation, value, repairs, path)
+    if annotation is str:
+        if isinstance(value, list):
+            return "\n".join(str(item) for item in value)
+        if isinstance(value, (int, float)):
+            return str(value)
+    return value
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def invalid_fields(schema: Type[BaseModel], data: Dict[str, Any]) -> List[str]:
+    """Top-level fields that still fail validation"""
+    try:
+        schema.model_validate(data)
+    except ValidationError as e:
+        return sorted({str(error["loc"][0]) for error in e.errors() if error["loc"]})
+    return []
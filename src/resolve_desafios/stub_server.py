@@ -0,0 +1,166 @@
+"""
+Stub server - servidor local compatível com a API de chat do OpenAI, para
+testar o pool de backends e medir vazão sem chamadas pagas
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from .fake_llm_adapter import FakeLLMAdapter
+
+# Tamanho dos pedaços dos argumentos no streaming, como nas respostas reais
+CHUNK_SIZE = 64
+
+
+class StubServer(ThreadingHTTPServer):
+    """POST /v1/chat/completions answered with FakeLLMAdapter's payloads.
+
+    `capacity` requests are served at a time (the rest wait, like a rate
+    limit), each takes `latency` seconds and `fail_rate` of them get a 500.
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency: float = 0.1, capacity: int = 4, fail_rate: float = 0.0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.slots = threading.Semaphore(capacity)
+        self.requests = 0
+        self._lock = threading.Lock()
+        fake = FakeLLMAdapter(0)
+        self.payload = {**fake._build_classification("Desafio"), **fake._build_solution()}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def handle_error(self, request, client_address):
+        # O cliente desistiu (hedge perdedor, timeout): não é erro do stub
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        server = self.server
+        with server.slots:
+            server.count()
+            time.sleep(server.latency)
+            if random.random() < server.fail_rate:
+                self._send_json(500, {'error': {'message': "stub: falha simulada", 'type': 'server_error'}})
+                return
+            tools = body.get('tools') or []
+            if tools:
+                function = tools[0]['function']
+                properties = function.get('parameters', {}).get('properties', {})
+                arguments = json.dumps({k: v for k, v in server.payload.items() if k in properties})
+                name, content = function['name'], None
+            else:
+                name, arguments = None, None
+                content = server.payload['summary']
+            if body.get('stream'):
+                self._stream(body.get('model', 'stub'), name, arguments, content)
+            else:
+                self._send_json(200, self._completion(body.get('model', 'stub'), name, arguments, content))
+
+    def _completion(self, model, name, arguments, content):
+        message = {'role': 'assistant', 'content': content}
+        if name:
+            message['tool_calls'] = [
+                {'id': 'call_stub', 'type': 'function', 'function': {'name': name, 'arguments': arguments}}
+            ]
+        return {
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+            'choices': [{'index': 0, 'message': message, 'finish_reason': 'tool_calls' if name else 'stop'}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+
+    def _stream(self, model, name, arguments, content):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        def send(delta, finish_reason=None):
+            chunk = {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        if name:
+            send({'role': 'assistant', 'content': None, 'tool_calls': [
+                {'index': 0, 'id': 'call_stub', 'type': 'function', 'function': {'name': name, 'arguments': ''}}
+            ]})
+            for start in range(0, len(arguments), CHUNK_SIZE):
+                send({'tool_calls': [{'index': 0, 'function': {'arguments': arguments[start:start + CHUNK_SIZE]}}]})
+            send({}, 'tool_calls')
+        else:
+            send({'role': 'assistant', 'content': content})
+            send({}, 'stop')
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, status, data):
+        encoded = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def start_stub_server(latency: float = 0.1, capacity: int = 4, fail_rate: float = 0.0) -> Tuple[subprocess.Popen, str]:
+    """Start a stub server in its own process (so it does not share the client's GIL); returns (process, base_url)"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'resolve_desafios.stub_server', '--port', '0', '--latency', str(latency),
+         '--capacity', str(capacity), '--fail-rate', str(fail_rate)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("Stub server não iniciou")
+    return process, base_url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor local compatível com OpenAI para testes do pool")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--capacity', type=int, default=4)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubServer((args.host, args.port), latency=args.latency, capacity=args.capacity,
+                        fail_rate=args.fail_rate)
+    # A primeira linha traz a URL (útil com --port 0, que escolhe uma porta livre)
+    print(server.base_url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
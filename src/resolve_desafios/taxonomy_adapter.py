@@ -3,9 +3,48 @@ Taxonomy Adapter - Implementação para carregar taxonomia de algoritmos
 """
 
 import json
+import re
+import unicodedata
 from pathlib import Path
 from typing import Dict, Any
 
+# Nomes em inglês que o modelo costuma devolver, mapeados para a taxonomia
+CATEGORY_ALIASES = {
+    "array": "Arrays",
+    "string": "Strings",
+    "linked list": "Listas Ligadas",
+    "stack": "Pilhas e Filas",
+    "queue": "Pilhas e Filas",
+    "tree": "Árvores",
+    "binary tree": "Árvores",
+    "graph": "Grafos",
+    "dynamic programming": "Programação Dinâmica",
+    "dp": "Programação Dinâmica",
+    "greedy": "Guloso",
+    "sorting": "Ordenação e Busca",
+    "searching": "Ordenação e Busca",
+    "bit manipulation": "Bitmask",
+    "math": "Matemática/Teoria dos Números",
+    "number theory": "Matemática/Teoria dos Números",
+    "geometry": "Geometria Computacional",
+    "two pointers": "Dois ponteiros",
+    "sliding window": "Janela deslizante",
+    "binary search": "Busca binária em resposta",
+    "union find": "Union-Find",
+    "bfs": "DFS/BFS",
+    "dfs": "DFS/BFS",
+    "topological sort": "Topological sort",
+}
+
+
+def normalize_key(term: str) -> str:
+    """Lowercase, accent-free, punctuation-free form of a term"""
+    text = unicodedata.normalize("NFKD", str(term)).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    # Plural simples: "graphs" e "graph" viram a mesma chave
+    return " ".join(word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+                    for word in text.split())
+
 
 class FileTaxonomyAdapter:
     """Adapter para carregar taxonomia de arquivo JSON"""
@@ -13,6 +52,7 @@ class FileTaxonomyAdapter:
     def __init__(self):
         self.taxonomy_path = Path(__file__).parent.parent.parent / "data" / "taxonomy.json"
         self._taxonomy = None
+        self._canonical = None
 
     def load_taxonomy(self) -> Dict[str, Any]:
         """Load taxonomy from JSON file"""
@@ -36,6 +76,29 @@ class FileTaxonomyAdapter:
                 }
         return self._taxonomy
 
+    def canonical_terms(self) -> Dict[str, str]:
+        """Map of normalized key -> canonical taxonomy name (categories and techniques)"""
+        if self._canonical is None:
+            taxonomy = self.load_taxonomy()
+            categories = taxonomy.get("categories", [])
+            names = list(categories)
+            if isinstance(categories, dict):
+                names += [technique for techniques in categories.values() for technique in techniques]
+            names += taxonomy.get("algorithms", [])
+
+            canonical = {}
+            for alias, name in CATEGORY_ALIASES.items():
+                canonical[normalize_key(alias)] = name
+            for name in names:
+                canonical[normalize_key(name)] = name
+            self._canonical = canonical
+        return self._canonical
+
+    def normalize_term(self, term: str) -> str:
+        """Canonical taxonomy name for a term, or its normalized key if unknown"""
+        key = normalize_key(term)
+        return self.canonical_terms().get(key, key)
+
     def summarize_taxonomy_for_prompt(self) -> str:
         """Summarize taxonomy for LLM prompt"""
         taxonomy = self.load_taxonomy()
@@ -9,11 +9,16 @@ const loading = document.getElementById('loading');
 const results = document.getElementById('results');
 const historyList = document.getElementById('historyList');
 
+// Recent analyses embedded by the index view (saves a request on page load)
+const embeddedHistory = document.getElementById('recent-analyses');
+let historyData = embeddedHistory ? JSON.parse(embeddedHistory.textContent) : null;
+
 // Initialize app
 document.addEventListener('DOMContentLoaded', function() {
     initializeNavigation();
     initializeForm();
-    loadHistory();
+    initializeSearch();
+    loadHistory(false);
 });
 
 // Navigation functionality
@@ -37,7 +42,7 @@ function switchTab(tabName) {
     
     // Load content if needed
     if (tabName === 'history') {
-        loadHistory();
+        loadHistory(false);
     }
 }
 
@@ -74,12 +79,18 @@ async function analyzeChallenge() {
         });
 
         if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.error || `HTTP error! status: ${response.status}`);
         }
 
         const result = await response.json();
         displayResults(result);
-        showToast('Análise concluída com sucesso!', 'success');
+        if (result.degraded) {
+            // Circuito do LLM aberto: o servidor devolveu a última análise deste desafio
+            showToast('Serviço de análise indisponível: exibindo a análise anterior deste desafio.', 'error');
+        } else {
+            showToast('Análise concluída com sucesso!', 'success');
+        }
         
         // Refresh history
         loadHistory();
@@ -135,7 +146,7 @@ function displayResults(result) {
                 </button>
             </div>
             <div class="solution-content">
-                <pre><code id="solution-code-${result.id}">${result.recommended_solution}</code></pre>
+                <pre><code id="solution-code-${result.id}">${result.recommended_solution || 'Gerando solução...'}</code></pre>
             </div>
         </div>
 
@@ -182,18 +193,51 @@ function displayResults(result) {
             </div>
         ` : ''}
 
-        ${result.references ? `
-            <div class="result-card">
-                <h4><i class="fas fa-book"></i> Referências</h4>
-                <p>${result.references}</p>
-            </div>
-        ` : ''}
+        <div class="result-card ${result.references ? '' : 'hidden'}" id="references-${result.id}">
+            <h4><i class="fas fa-book"></i> Referências</h4>
+            <p>${result.references || ''}</p>
+        </div>
     `;
 
     showResults();
+
+    if (result.stage !== 'COMPLETA') {
+        loadSolution(result.id);
+    }
+}
+
+// The solution stage is generated on demand by GET /analyses/<id>/
+async function loadSolution(analysisId) {
+    const codeElement = document.getElementById(`solution-code-${analysisId}`);
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/analyses/${analysisId}/`);
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const analysis = await response.json();
+        codeElement.textContent = analysis.recommended_solution;
+
+        if (analysis.references) {
+            const referencesCard = document.getElementById(`references-${analysisId}`);
+            referencesCard.querySelector('p').textContent = analysis.references;
+            referencesCard.classList.remove('hidden');
+        }
+
+    } catch (error) {
+        console.error('Error loading solution:', error);
+        codeElement.textContent = 'Não foi possível gerar a solução agora. Abra os detalhes da análise para tentar novamente.';
+    }
 }
 
-async function loadHistory() {
+async function loadHistory(refresh = true) {
+    if (!refresh && historyData) {
+        displayHistory(historyData);
+        return;
+    }
+
     historyList.innerHTML = `
         <div class="loading">
             <div class="spinner"></div>
@@ -202,14 +246,14 @@ async function loadHistory() {
     `;
 
     try {
-        const response = await fetch(`${API_BASE_URL}/analyses?limit=20`);
+        const response = await fetch(`${API_BASE_URL}/analyses/?limit=20`);
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const analyses = await response.json();
-        displayHistory(analyses);
+        historyData = await response.json();
+        displayHistory(historyData);
         
     } catch (error) {
         console.error('Error loading history:', error);
@@ -256,6 +300,158 @@ function displayHistory(analyses) {
     `).join('');
 }
 
+// Search suggestions (typeahead)
+const SUGGESTION_KINDS = {
+    category: 'categoria',
+    technique: 'técnica',
+    algorithm: 'algoritmo',
+    title: 'desafio'
+};
+let suggestionItems = [];
+let suggestionIndex = -1;
+let suggestionTimer = null;
+let suggestionController = null;
+
+function initializeSearch() {
+    const input = document.getElementById('searchInput');
+    if (!input) {
+        return;
+    }
+    input.addEventListener('input', function() {
+        clearTimeout(suggestionTimer);
+        suggestionTimer = setTimeout(() => fetchSuggestions(input.value), 80);
+    });
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            suggestionIndex = Math.max(-1, Math.min(suggestionItems.length - 1, suggestionIndex + step));
+            renderSuggestions();
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            if (suggestionIndex >= 0) {
+                selectSuggestion(suggestionIndex);
+            } else {
+                searchHistory(input.value);
+                hideSuggestions();
+            }
+        } else if (e.key === 'Escape') {
+            hideSuggestions();
+        }
+    });
+    document.addEventListener('click', function(e) {
+        if (!e.target.closest('.search-box')) {
+            hideSuggestions();
+        }
+    });
+}
+
+async function fetchSuggestions(query) {
+    if (suggestionController) {
+        suggestionController.abort();
+    }
+    if (!query.trim()) {
+        suggestionItems = [];
+        hideSuggestions();
+        filterHistory('');
+        return;
+    }
+    suggestionController = new AbortController();
+    try {
+        const response = await fetch(
+            `${API_BASE_URL}/search/suggest/?q=${encodeURIComponent(query)}`,
+            { signal: suggestionController.signal }
+        );
+        if (!response.ok) {
+            return;
+        }
+        const data = await response.json();
+        suggestionItems = data.suggestions;
+        suggestionIndex = -1;
+        renderSuggestions();
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('Error loading suggestions:', error);
+        }
+    }
+}
+
+function renderSuggestions() {
+    const list = document.getElementById('suggestions');
+    if (suggestionItems.length === 0) {
+        hideSuggestions();
+        return;
+    }
+    list.innerHTML = suggestionItems.map((item, i) => `
+        <li class="${i === suggestionIndex ? 'active' : ''}" onmousedown="selectSuggestion(${i})">
+            <span>${escapeHtml(item.label)}</span>
+            <span class="suggestion-kind">${SUGGESTION_KINDS[item.kind] || item.kind}</span>
+        </li>
+    `).join('');
+    list.classList.remove('hidden');
+}
+
+function hideSuggestions() {
+    document.getElementById('suggestions').classList.add('hidden');
+    suggestionIndex = -1;
+}
+
+function selectSuggestion(i) {
+    const item = suggestionItems[i];
+    if (!item) {
+        return;
+    }
+    if (item.kind === 'title') {
+        showAnalysisDetails(item.analysis_id);
+        return;
+    }
+    document.getElementById('searchInput').value = item.label;
+    searchHistory(item.label);
+    hideSuggestions();
+}
+
+// Categorias, técnicas e algoritmos não estão no histórico embutido (só as 20
+// análises mais recentes, sem as abordagens): a busca vai ao servidor
+async function searchHistory(term) {
+    if (!term.trim()) {
+        filterHistory('');
+        return;
+    }
+    try {
+        const response = await fetch(
+            `${API_BASE_URL}/analyses/?q=${encodeURIComponent(term.trim())}&limit=50`
+        );
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        displayHistory(await response.json());
+    } catch (error) {
+        console.error('Error searching history:', error);
+        filterHistory(term);
+    }
+}
+
+function filterHistory(term) {
+    if (!historyData) {
+        return;
+    }
+    const needle = term.trim().toLowerCase();
+    if (!needle) {
+        displayHistory(historyData);
+        return;
+    }
+    displayHistory(historyData.filter(analysis =>
+        analysis.title.toLowerCase().includes(needle) ||
+        analysis.categories.some(category => category.toLowerCase().includes(needle))
+    ));
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
 async function showAnalysisDetails(analysisId) {
     try {
         // Redirect to Django template view